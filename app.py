@@ -1,20 +1,41 @@
 # app.py - Multi-Model Semantic Search Backend
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, g, send_from_directory
 import os
+import hmac
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import chromadb
-from sentence_transformers import SentenceTransformer
+import numpy as np
 
 # LangChain imports for Q&A functionality
 from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain.schema import Document
 import torch
 
+from embedding_cache import QueryEmbeddingCache, normalize_query
+from micro_batcher import MicroBatcher, BatcherClosedError
+from fanout import run_fanout
+from search_backends import ExactSearchIndex, build_search_index, backend_name, normalize_rows
+from result_cache import ResultCache
+from model_manager import ModelManager
+from encoder_utils import (parse_precision_config, precision_for, load_sentence_transformer,
+                           parse_max_seq_length_config, max_seq_length_for)
+from embedding_adapters import SentenceTransformerEmbeddings
+from embedding_store import default_store, model_revision
+from bulk_loader import bulk_insert
+from collection_sync import (QA_COLLECTION_NAME, QA_MODEL_ID, qa_metadata, plan_qa_sync, plan_is_empty,
+                             apply_qa_sync)
+from db_paths import resolve_db_dir
+from profiling import profile_calls
+from metrics import (MetricsRegistry, install_request_metrics, install_server_timing, cache_collector,
+                     memory_collector, debug_requested, elapsed_ms)
+
 app = Flask(__name__)
 
 # ChromaDB setup
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_DIR = os.path.join(BASE_DIR, "db")
+# Aktif veritabanı: db_builds/CURRENT işaretçisinin gösterdiği build (yoksa eski db/ dizini)
+active_db_dir = resolve_db_dir(BASE_DIR)
 
 # Desteklenen modellerin tanımı (rebuild_database.py ile aynı)
 SUPPORTED_MODELS = {
@@ -27,6 +48,9 @@ SUPPORTED_MODELS = {
 loaded_models = {}
 word_collections = {}
 sentence_collections = {}
+# Aramada kullanılan indeksler: küçük koleksiyonlar için bellek içi NumPy, diğerleri için ChromaDB
+word_indexes = {}
+sentence_indexes = {}
 client = None
 metinler = None
 kelimeler = None
@@ -38,6 +62,92 @@ qa_retriever = None
 qa_chain = None
 qa_embeddings = None
 
+# Sorgu vektörü önbelleği (model başına LRU)
+EMBEDDING_CACHE_SIZE = int(os.environ.get("EMBEDDING_CACHE_SIZE", "1024"))
+query_embedding_cache = QueryEmbeddingCache(max_entries_per_model=EMBEDDING_CACHE_SIZE)
+
+# Çoklu model aramaları için thread havuzu: beklenen eşzamanlı istek sayısı x model sayısı kadar işçi.
+# Süre sınırı model araması çalışmaya başladığında işler; havuzda bu kadar bekleyen arama iptal edilir
+SEARCH_MAX_CONCURRENCY = int(os.environ.get("SEARCH_MAX_CONCURRENCY", "32"))
+SEARCH_MAX_WORKERS = int(os.environ.get("SEARCH_MAX_WORKERS", str(SEARCH_MAX_CONCURRENCY * len(SUPPORTED_MODELS))))
+SEARCH_TIMEOUT_SECONDS = float(os.environ.get("SEARCH_TIMEOUT_SECONDS", "10"))
+SEARCH_QUEUE_TIMEOUT_SECONDS = float(os.environ.get("SEARCH_QUEUE_TIMEOUT_SECONDS", str(SEARCH_TIMEOUT_SECONDS)))
+search_executor = ThreadPoolExecutor(max_workers=SEARCH_MAX_WORKERS, thread_name_prefix="model-search")
+# /search/batch ayrı havuzda çalışır; büyük toplu işler tekil aramaları bekletmez
+SEARCH_BATCH_MAX_WORKERS = int(os.environ.get("SEARCH_BATCH_MAX_WORKERS", str(len(SUPPORTED_MODELS))))
+batch_search_executor = ThreadPoolExecutor(max_workers=SEARCH_BATCH_MAX_WORKERS, thread_name_prefix="batch-search")
+SEARCH_BATCH_MAX_QUERIES = int(os.environ.get("SEARCH_BATCH_MAX_QUERIES", "5000"))
+# İstekte verilen top_k bu değere indirilir
+SEARCH_MAX_TOP_K = int(os.environ.get("SEARCH_MAX_TOP_K", "100"))
+
+# Eşzamanlı encode çağrılarını birleştiren model bazlı mikro-batch zamanlayıcıları
+MICROBATCH_ENABLED = os.environ.get("MICROBATCH_ENABLED", "1") == "1"
+MICROBATCH_MAX_BATCH_SIZE = int(os.environ.get("MICROBATCH_MAX_BATCH_SIZE", "32"))
+MICROBATCH_MAX_WAIT_MS = float(os.environ.get("MICROBATCH_MAX_WAIT_MS", "5"))
+micro_batchers = {}
+micro_batchers_lock = threading.Lock()
+
+# Bu boyuta kadar olan koleksiyonlar bellekte NumPy ile kesin aranır (0 = her zaman ChromaDB)
+EXACT_SEARCH_MAX_ITEMS = int(os.environ.get("EXACT_SEARCH_MAX_ITEMS", "50000"))
+
+# /search yanıt önbelleği - rebuild_database.py'nin yazdığı generation damgasına bağlı
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", "2048"))
+RESULT_CACHE_TTL_SECONDS = float(os.environ.get("RESULT_CACHE_TTL_SECONDS", "600"))
+GENERATION_CHECK_INTERVAL = float(os.environ.get("GENERATION_CHECK_INTERVAL", "5"))
+search_result_cache = ResultCache(max_entries=RESULT_CACHE_SIZE, ttl_seconds=RESULT_CACHE_TTL_SECONDS)
+database_generation = None
+generation_checked_at = 0.0
+generation_lock = threading.Lock()
+# Yerinde (--in-place) rebuild sonrası indeksleri yeniden kuran arka plan thread'i
+index_refresh_requested = threading.Event()
+index_refresh_lock = threading.Lock()
+index_refresh_thread = None
+
+# Blue/green geçiş: işaretçi değişince koleksiyonlar arka planda yeni dizine taşınır (0 = kapalı)
+DB_WATCH_INTERVAL = float(os.environ.get("DB_WATCH_INTERVAL", "5"))
+database_state = {'active_dir': active_db_dir, 'reloads': 0, 'last_reload_seconds': None, 'last_error': None}
+reload_lock = threading.Lock()
+
+# Arka plan açılışı: bileşen ve model bazlı hazır olma durumları
+# Durumlar: 'pending' / 'loading' / 'ready' / 'failed'
+MODEL_LOAD_WORKERS = int(os.environ.get("MODEL_LOAD_WORKERS", str(len(SUPPORTED_MODELS))))
+startup_state = {'chromadb': 'pending', 'text_data': 'pending', 'qa': 'pending'}
+model_states = {}
+state_lock = threading.Lock()
+
+# Model yöneticisi: tembel yükleme ve bellek/model sayısı bütçesiyle LRU çıkarma (0 = sınırsız)
+LAZY_MODEL_LOADING = os.environ.get("LAZY_MODEL_LOADING", "0") == "1"
+MAX_LOADED_MODELS = int(os.environ.get("MAX_LOADED_MODELS", "0"))
+MODEL_MEMORY_BUDGET_MB = float(os.environ.get("MODEL_MEMORY_BUDGET_MB", "0"))
+
+# Model bazlı çıkarım hassasiyeti: "int8" veya "dbmdz_bert=int8,turkcell_roberta=bf16"
+MODEL_PRECISION = parse_precision_config(os.environ.get("MODEL_PRECISION", ""))
+
+# Model bazlı tokenizer kesme uzunluğu: "128" veya "dbmdz_bert=128,multilingual_mpnet=256"
+MODEL_MAX_SEQ_LENGTH = parse_max_seq_length_config(os.environ.get("MODEL_MAX_SEQ_LENGTH", ""))
+
+# Ingest sırasında hesaplanan vektörlerin kalıcı deposu (EMBEDDING_STORE_DIR="" kapatır)
+embedding_store = default_store()
+
+# Prometheus metinsel metrikleri (/metrics)
+metrics_registry = MetricsRegistry(prefix="semantic_search_")
+search_stage_seconds = metrics_registry.histogram(
+    "stage_duration_seconds", "Model ve arama tipine göre aşama süresi (encode, query, format, retrieve, answer)",
+    ("stage", "model", "type"))
+install_request_metrics(app, metrics_registry)
+# Yanıtlarda model/aşama bazlı Server-Timing başlığı
+install_server_timing(app)
+
+# Yönetici profil endpoint'i (/admin/profile): ADMIN_TOKEN boşsa kapalı
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(BASE_DIR, "profiles"))
+PROFILE_MAX_CALLS = int(os.environ.get("PROFILE_MAX_CALLS", "2000"))
+# Yanıttaki en pahalı fonksiyon listesinin üst sınırı
+PROFILE_MAX_LIMIT = 200
+profiling_lock = threading.Lock()
+# Profil çalışan thread'de encode'u doğrudan (mikro-batch ve önbellek olmadan) yapmak için
+profiling_context = threading.local()
+
 def load_relationships():
     """Kelime ilişkilerini yükle"""
     global iliskiler
@@ -74,17 +184,24 @@ def load_relationships():
         print(f"❌ İlişki yükleme hatası: {e}")
         return False
 
-def setup_chromadb():
-    """ChromaDB bağlantısını kur ve çoklu modeller için koleksiyonları yükle"""
-    global client, word_collections, sentence_collections
+def setup_chromadb(db_dir=None):
+    """ChromaDB bağlantısını kur ve çoklu modeller için koleksiyonları yükle.
+    
+    Yeni yapılar önce yerel sözlüklerde hazırlanır, sonra global değişkenlere atanır;
+    böylece çalışan uygulamada veritabanı değiştirilirken istekler yarım durum görmez.
+    """
+    global client, word_collections, sentence_collections, word_indexes, sentence_indexes, active_db_dir
     
+    db_dir = db_dir or active_db_dir
     try:
         # ChromaDB client oluştur
-        client = chromadb.PersistentClient(path=DB_DIR)
+        new_client = chromadb.PersistentClient(path=db_dir)
+        new_word_collections, new_sentence_collections = {}, {}
+        new_word_indexes, new_sentence_indexes = {}, {}
         
         # Tüm koleksiyonları listele
-        all_collections = client.list_collections()
-        print(f"🔍 Bulunan koleksiyonlar: {len(all_collections)}")
+        all_collections = new_client.list_collections()
+        print(f"🔍 Bulunan koleksiyonlar: {len(all_collections)} ({db_dir})")
         
         # Her desteklenen model için koleksiyonları yükle
         for model_id in SUPPORTED_MODELS.keys():
@@ -92,29 +209,46 @@ def setup_chromadb():
             sentence_collection_name = f"metin_vektorleri_{model_id}"
             
             try:
-                # Kelime koleksiyonu
-                word_collections[model_id] = client.get_collection(word_collection_name)
-                word_count = word_collections[model_id].count()
+                # Kelime ve cümle koleksiyonları
+                word_collection = new_client.get_collection(word_collection_name)
+                sentence_collection = new_client.get_collection(sentence_collection_name)
+                word_count = word_collection.count()
+                sentence_count = sentence_collection.count()
                 
-                # Cümle koleksiyonu
-                sentence_collections[model_id] = client.get_collection(sentence_collection_name)
-                sentence_count = sentence_collections[model_id].count()
+                # Koleksiyon boyutuna göre arama arka ucunu seç
+                new_word_indexes[model_id] = build_search_index(word_collection, EXACT_SEARCH_MAX_ITEMS)
+                new_sentence_indexes[model_id] = build_search_index(sentence_collection, EXACT_SEARCH_MAX_ITEMS)
+                new_word_collections[model_id] = word_collection
+                new_sentence_collections[model_id] = sentence_collection
                 
-                print(f"✅ {model_id}: Kelimeler={word_count}, Cümleler={sentence_count}")
+                print(f"✅ {model_id}: Kelimeler={word_count} ({backend_name(new_word_indexes[model_id])}), "
+                      f"Cümleler={sentence_count} ({backend_name(new_sentence_indexes[model_id])})")
+                
+                # İndeks ile sorgu hassasiyeti farklıysa uyar
+                index_precision = (word_collection.metadata or {}).get("precision", "fp32")
+                query_precision = precision_for(model_id, MODEL_PRECISION)
+                if index_precision != query_precision:
+                    print(f"⚠️  {model_id}: indeks {index_precision}, sorgu {query_precision} hassasiyetinde")
                 
             except Exception as e:
+                # Model koleksiyonları yoksa sözlüklere eklenmez
                 print(f"⚠️  {model_id} koleksiyonları bulunamadı: {e}")
-                # Model koleksiyonları yoksa sözlüklerden çıkar
-                word_collections.pop(model_id, None)
-                sentence_collections.pop(model_id, None)
+                new_word_indexes.pop(model_id, None)
+                new_sentence_indexes.pop(model_id, None)
         
-        available_models = list(word_collections.keys())
+        available_models = list(new_word_collections.keys())
         print(f"🎯 Aktif modeller: {available_models}")
         
         if not available_models:
             print("❌ Hiçbir model koleksiyonu bulunamadı!")
             return False
-            
+        
+        # Önce indeksler, sonra koleksiyonlar ve client değiştirilir
+        word_indexes, sentence_indexes = new_word_indexes, new_sentence_indexes
+        word_collections, sentence_collections = new_word_collections, new_sentence_collections
+        client = new_client
+        active_db_dir = db_dir
+        database_state['active_dir'] = db_dir
         return True
         
     except Exception as e:
@@ -142,28 +276,113 @@ def load_text_data():
         print(f"❌ Metin veri yükleme hatası: {e}")
         return False
 
-def load_models():
-    """Aktif koleksiyonlara sahip modelleri yükle"""
-    global loaded_models
-    
+def set_model_state(model_id, state, **details):
+    """Modelin yükleme durumunu güncelle"""
+    with state_lock:
+        model_states[model_id] = dict(details, state=state)
+
+def set_startup_state(component, state):
+    """Açılış bileşeninin durumunu güncelle"""
+    with state_lock:
+        startup_state[component] = state
+
+def create_model(model_id):
+    """Model id'sine karşılık gelen SentenceTransformer'ı ayarlı hassasiyetle oluştur"""
+    return load_sentence_transformer(
+        SUPPORTED_MODELS[model_id],
+        precision_for(model_id, MODEL_PRECISION),
+        max_seq_length=max_seq_length_for(model_id, MODEL_MAX_SEQ_LENGTH)
+    )
+
+def on_model_loaded(model_id, model):
+    """Yeni yüklenen model için eski önbellek ve zamanlayıcıları bırak"""
+    query_embedding_cache.invalidate(model_id)
+    close_micro_batcher(model_id)
+
+def on_model_evicted(model_id):
+    """Bellekten çıkarılan modelin önbellek ve zamanlayıcılarını bırak"""
+    query_embedding_cache.invalidate(model_id)
+    close_micro_batcher(model_id)
+
+model_manager = ModelManager(
+    loader=create_model,
+    models=loaded_models,
+    max_models=MAX_LOADED_MODELS,
+    max_memory_mb=MODEL_MEMORY_BUDGET_MB,
+    on_load=on_model_loaded,
+    on_evict=on_model_evicted,
+    on_state=set_model_state
+)
+
+metrics_registry.add_collector(cache_collector(
+    "query_embedding_cache", "Sorgu vektörü önbelleği", query_embedding_cache.stats, per_model=True))
+metrics_registry.add_collector(cache_collector(
+    "result_cache", "Arama sonucu önbelleği", search_result_cache.stats))
+metrics_registry.add_collector(cache_collector(
+    "embedding_store", "Kalıcı embedding deposu", lambda: embedding_store.stats() if embedding_store else None))
+metrics_registry.add_collector(memory_collector(model_manager))
+metrics_registry.add_collector(lambda: [(
+    "microbatch_queue_depth", "gauge", "Mikro-batch kuyruğunda encode bekleyen metin sayısı",
+    [({'model': model_id}, values['queue_depth']) for model_id, values in micro_batching_stats()['models'].items()]
+)])
+
+def load_model(model_id):
+    """Tek bir modeli yükle; hazır olduğu anda aramalarda kullanılabilir"""
+    print(f"   📡 Yükleniyor: {SUPPORTED_MODELS[model_id]}")
     try:
-        available_model_ids = list(word_collections.keys())
-        print(f"🤖 Modeller yükleniyor: {available_model_ids}")
-        
-        for model_id in available_model_ids:
-            if model_id in SUPPORTED_MODELS:
-                model_name = SUPPORTED_MODELS[model_id]
-                print(f"   📡 Yükleniyor: {model_name}")
-                loaded_models[model_id] = SentenceTransformer(model_name)
-                print(f"   ✅ Başarılı: {model_id}")
-        
-        print(f"🎉 Yüklenen modeller: {list(loaded_models.keys())}")
+        model_manager.get(model_id)
+        print(f"   ✅ Başarılı: {model_id} ({model_states[model_id].get('load_seconds')} saniye)")
         return True
-        
     except Exception as e:
-        print(f"❌ Model yükleme hatası: {e}")
+        print(f"   ❌ {model_id} yüklenemedi: {e}")
         return False
 
+def available_model_ids():
+    """Aramada kullanılabilecek modeller: yüklü olanlar ve tembel modda koleksiyonu olup başarısız olmayanlar"""
+    if not LAZY_MODEL_LOADING:
+        return [mid for mid in SUPPORTED_MODELS if mid in loaded_models]
+    return [
+        mid for mid in SUPPORTED_MODELS
+        if mid in word_collections and model_states.get(mid, {}).get('state') != 'failed'
+    ]
+
+def get_model(model_id):
+    """Modeli döndür; tembel modda ilk istekte yükler, kullanılamıyorsa None"""
+    if model_id not in loaded_models and not (LAZY_MODEL_LOADING and model_id in word_collections):
+        return None
+    try:
+        return model_manager.get(model_id)
+    except Exception as e:
+        print(f"❌ Model yüklenemedi: {model_id} - {e}")
+        return None
+
+def load_models():
+    """Aktif koleksiyonlara sahip modelleri paralel yükle (tembel modda sadece kaydet)"""
+    available_model_ids = [mid for mid in word_collections.keys() if mid in SUPPORTED_MODELS]
+    
+    if LAZY_MODEL_LOADING:
+        for model_id in available_model_ids:
+            set_model_state(model_id, 'unloaded')
+        print(f"💤 Tembel yükleme açık, modeller ilk istekte yüklenecek: {available_model_ids}")
+        return bool(available_model_ids)
+    
+    # Bütçe varsa sadece sığan kadar modeli önceden yükle
+    if MAX_LOADED_MODELS:
+        available_model_ids = available_model_ids[:MAX_LOADED_MODELS]
+    print(f"🤖 Modeller yükleniyor: {available_model_ids}")
+    
+    for model_id in available_model_ids:
+        set_model_state(model_id, 'pending')
+    
+    with ThreadPoolExecutor(max_workers=max(1, MODEL_LOAD_WORKERS), thread_name_prefix="model-load") as pool:
+        results = list(pool.map(load_model, available_model_ids))
+    
+    # Artık yüklü olmayan modellerin önbelleklerini bırak
+    query_embedding_cache.retain(list(loaded_models.keys()))
+    
+    print(f"🎉 Yüklenen modeller: {list(loaded_models.keys())}")
+    return any(results)
+
 def setup_qa_system():
     """Q&A sistemi için LangChain VectorStore ve RetrievalQA kurulumu"""
     global qa_vectorstore, qa_retriever, qa_chain, qa_embeddings
@@ -171,34 +390,44 @@ def setup_qa_system():
     try:
         print("🤖 Q&A sistemi yükleniyor...")
         
-        # HuggingFace Embeddings kurulumu
-        qa_embeddings = HuggingFaceEmbeddings(
-            model_name="dbmdz/bert-base-turkish-cased",
-            model_kwargs={'device': 'cpu'},
-            encode_kwargs={'normalize_embeddings': True}
+        qa_precision = precision_for(QA_MODEL_ID, MODEL_PRECISION)
+        if QA_MODEL_ID in word_collections:
+            # Arama tarafında yüklenen dbmdz modelini paylaş (ağırlıklar ikinci kez yüklenmez)
+            model_provider = lambda: model_manager.get(QA_MODEL_ID)
+        else:
+            # Arama tarafında dbmdz yoksa ayrı bir model örneği yükle
+            qa_model = load_sentence_transformer(
+                SUPPORTED_MODELS[QA_MODEL_ID], qa_precision, device='cpu',
+                max_seq_length=max_seq_length_for(QA_MODEL_ID, MODEL_MAX_SEQ_LENGTH)
+            )
+            model_provider = lambda: qa_model
+        
+        qa_embeddings = SentenceTransformerEmbeddings(
+            model_provider,
+            normalize_embeddings=True,
+            store=embedding_store,
+            model_id=QA_MODEL_ID,
+            revision=model_revision(
+                SUPPORTED_MODELS[QA_MODEL_ID], qa_precision, max_seq_length_for(QA_MODEL_ID, MODEL_MAX_SEQ_LENGTH)
+            )
         )
         
-        # ChromaDB client
-        qa_client = chromadb.PersistentClient(path=DB_DIR)
+        # Arama tarafıyla aynı ChromaDB client
+        qa_client = client or chromadb.PersistentClient(path=active_db_dir)
         
-        # LangChain Chroma VectorStore
-        qa_vectorstore = Chroma(
+        # LangChain Chroma VectorStore (doldurulana kadar aktif depo değiştirilmez)
+        vectorstore = Chroma(
             client=qa_client,
-            collection_name="qa_documents",
+            collection_name=QA_COLLECTION_NAME,
             embedding_function=qa_embeddings,
-            persist_directory=DB_DIR
+            persist_directory=active_db_dir
         )
         
-        # Eğer collection yoksa metinler.txt'den oluştur
-        try:
-            # Collection mevcut mu kontrol et
-            collection_count = qa_vectorstore._collection.count()
-            if collection_count == 0:
-                print("📚 Q&A vektör deposu boş, metinler.txt'den doldurluyor...")
-                populate_qa_vectorstore()
-        except:
-            print("📚 Q&A vektör deposu oluşturuluyor...")
-            populate_qa_vectorstore()
+        # Depo boş değilse de metinler.txt ile karşılaştırılır (build kopyasından gelen eski
+        # cümleler sunulmasın); eşitlenemezse önceki depo kullanılmaya devam eder
+        if not populate_qa_vectorstore(vectorstore):
+            return False
+        qa_vectorstore = vectorstore
         
         # VectorStore Retriever oluştur
         qa_retriever = qa_vectorstore.as_retriever(
@@ -218,9 +447,29 @@ def setup_qa_system():
         print(f"❌ Q&A sistem kurulum hatası: {e}")
         return False
 
-def populate_qa_vectorstore():
-    """metinler.txt'den Q&A vektör deposunu doldur"""
-    global qa_vectorstore
+def load_existing_sentence_embeddings(model_id):
+    """Arama koleksiyonundaki cümle vektörlerini {cümle: normalize vektör} olarak getir"""
+    collection = sentence_collections.get(model_id)
+    if collection is None:
+        return {}
+    
+    index = sentence_indexes.get(model_id)
+    if isinstance(index, ExactSearchIndex):
+        # Bellekteki NumPy indeksi zaten normalize vektörleri tutuyor
+        documents, vectors = index.documents, index.matrix
+    else:
+        data = collection.get(include=["embeddings", "documents"])
+        documents, vectors = data["documents"], normalize_rows(data["embeddings"])
+    
+    existing = {}
+    for document, vector in zip(documents, vectors):
+        existing.setdefault(document, vector)
+    return existing
+
+def populate_qa_vectorstore(vectorstore=None):
+    """Q&A vektör deposunu metinler.txt ile eşitle: içerik hash'ine göre silinen cümleler
+    kaldırılır, yeniler eklenir. Mevcut dbmdz cümle vektörleri yeniden kullanılır"""
+    vectorstore = vectorstore or qa_vectorstore
     
     try:
         if not os.path.exists("metinler.txt"):
@@ -231,31 +480,40 @@ def populate_qa_vectorstore():
         with open("metinler.txt", "r", encoding="utf-8") as f:
             sentences = [line.strip() for line in f if line.strip()]
         
-        # Document objeleri oluştur
-        documents = []
-        for i, sentence in enumerate(sentences):
-            doc = Document(
-                page_content=sentence,
-                metadata={
-                    "source": "metinler.txt",
-                    "sentence_id": i,
-                    "type": "sentence"
-                }
-            )
-            documents.append(doc)
+        collection = vectorstore._collection
+        plan = plan_qa_sync(collection, sentences)
+        if plan_is_empty(plan):
+            print(f"✅ Q&A vektör deposu güncel: {len(sentences)} cümle")
+            return True
+        print(f"📚 Q&A vektör deposu eşitleniyor: +{len(plan['add'])} / -{len(plan['delete'])} / "
+              f"~{len(plan['reindex'])} yeniden sıralama")
         
-        # Batch halinde vektör deposuna ekle
-        batch_size = 50
-        for i in range(0, len(documents), batch_size):
-            batch = documents[i:i+batch_size]
-            qa_vectorstore.add_documents(batch)
-            print(f"   📦 {min(i+batch_size, len(documents))}/{len(documents)} cümle işlendi...")
+        # Arama koleksiyonundaki dbmdz cümle vektörleri aynı uzaydadır
+        added = [sentences[j] for j in plan['add']]
+        existing = load_existing_sentence_embeddings(QA_MODEL_ID) if added else {}
         
-        print(f"✅ {len(sentences)} cümle Q&A vektör deposuna eklendi")
+        # Sadece koleksiyonda olmayan cümleler encode edilir (önce kalıcı embedding deposuna bakılır)
+        missing = list(dict.fromkeys(sentence for sentence in added if sentence not in existing))
+        computed = dict(zip(missing, qa_embeddings.embed_documents(missing))) if missing else {}
+        print(f"   ♻️  {len(added) - len(missing)} cümle vektörü yeniden kullanıldı, "
+              f"{len(missing)} cümle encode edildi")
+        vectors = np.array(
+            [computed[sentence] if sentence in computed else existing[sentence] for sentence in added],
+            dtype=np.float32
+        ).reshape(len(added), -1)
+        
+        if len(added) == len(sentences) and not plan['delete']:
+            # Boş depo: tek matris halinde toplu ekleme
+            bulk_insert(collection, plan['ids'], sentences, vectors,
+                        [qa_metadata(j) for j in range(len(sentences))], client=client, label=QA_COLLECTION_NAME)
+        else:
+            apply_qa_sync(collection, sentences, plan, vectors, client=client)
+        
+        print(f"✅ Q&A vektör deposu eşitlendi: {collection.count()} cümle")
         return True
         
     except Exception as e:
-        print(f"❌ Q&A vektör deposu doldurma hatası: {e}")
+        print(f"❌ Q&A vektör deposu eşitleme hatası: {e}")
         return False
 
 def answer_question(question, context_docs):
@@ -292,28 +550,43 @@ def answer_question(question, context_docs):
         "source_sentences": [doc.page_content for doc in context_docs] if context_docs else []
     }
 
+def setup_qa_system_tracked():
+    """Q&A sistemini kur ve açılış durumunu güncelle"""
+    set_startup_state('qa', 'loading')
+    set_startup_state('qa', 'ready' if setup_qa_system() else 'failed')
+
 def load_data():
-    """Tüm verileri ve bağlantıları yükle"""
+    """Tüm verileri ve bağlantıları yükle; modeller ve Q&A sistemi paralel yüklenir"""
     try:
         print("📡 Multi-model sistem yükleniyor...")
         
         # ChromaDB setup
+        set_startup_state('chromadb', 'loading')
         if not setup_chromadb():
+            set_startup_state('chromadb', 'failed')
             return False
-        
-        # Modelleri yükle
-        if not load_models():
-            return False
+        set_startup_state('chromadb', 'ready')
         
         # Text data yükle
+        set_startup_state('text_data', 'loading')
         if not load_text_data():
+            set_startup_state('text_data', 'failed')
             return False
+        set_startup_state('text_data', 'ready')
         
         # İlişkileri yükle
         load_relationships()
         
-        # Q&A sistemini yükle
-        setup_qa_system()
+        # Q&A sistemi modellerle aynı anda arka planda yüklenir
+        qa_thread = threading.Thread(target=setup_qa_system_tracked, name="qa-loader", daemon=True)
+        qa_thread.start()
+        
+        # Modelleri yükle (her model hazır olduğu anda aramaya açılır)
+        models_ok = load_models()
+        qa_thread.join()
+        
+        if not models_ok:
+            return False
         
         print(f"✅ Multi-model sistem yüklendi!")
         return True
@@ -322,101 +595,394 @@ def load_data():
         print(f"❌ Sistem yükleme hatası: {e}")
         return False
 
-def search_in_sentences(query, model_id, top_k=5):
+def reload_database(db_dir):
+    """Yeni build dizinine geç: koleksiyonlar, indeksler, metinler ve Q&A deposu arka planda yenilenir.
+    
+    Eski yapılar yenileri hazır olana kadar istekleri karşılamaya devam eder.
+    """
+    global database_generation, generation_checked_at
+    
+    with reload_lock:
+        print(f"🔀 Veritabanı değişti, yeni build yükleniyor: {db_dir}")
+        started = time.time()
+        if not setup_chromadb(db_dir):
+            database_state['last_error'] = f"{db_dir} yüklenemedi"
+            print(f"❌ Yeni build yüklenemedi, eski veritabanı kullanılmaya devam ediyor")
+            return False
+        
+        # Veri dosyaları rebuild ile birlikte değişmiş olabilir
+        load_text_data()
+        load_relationships()
+        
+        # Sonuç önbelleğini yeni nesle bağla
+        with generation_lock:
+            database_generation = None
+            generation_checked_at = 0.0
+        current_database_generation()
+        
+        # Q&A deposu yeni client üzerinde yeniden kurulur (cümle vektörleri yeni koleksiyondan alınır)
+        setup_qa_system_tracked()
+        
+        database_state['reloads'] += 1
+        database_state['last_reload_seconds'] = round(time.time() - started, 2)
+        database_state['last_error'] = None
+        print(f"✅ Veritabanı geçişi tamamlandı: {database_state['last_reload_seconds']} saniye")
+        return True
+
+def watch_database_pointer():
+    """db_builds/CURRENT işaretçisini izle, değişince reload_database çağır"""
+    while True:
+        time.sleep(DB_WATCH_INTERVAL)
+        try:
+            db_dir = resolve_db_dir(BASE_DIR)
+            if os.path.abspath(db_dir) != os.path.abspath(active_db_dir):
+                reload_database(db_dir)
+        except Exception as e:
+            database_state['last_error'] = str(e)
+            print(f"⚠️  Veritabanı izleme hatası: {e}")
+
+def start_background_loading():
+    """Yüklemeyi arka planda başlat; sunucu bu sırada bağlantı kabul eder"""
+    def run():
+        if load_data():
+            print("🚀 Sistem hazır!")
+            if DB_WATCH_INTERVAL > 0:
+                threading.Thread(target=watch_database_pointer, name="db-watcher", daemon=True).start()
+        else:
+            print("❌ Sistem başlatılamadı!")
+            print("💡 Önce 'python rebuild_database.py' komutunu çalıştırın")
+    
+    loader = threading.Thread(target=run, name="startup-loader", daemon=True)
+    loader.start()
+    return loader
+
+def readiness_snapshot():
+    """Açılış bileşenlerinin ve modellerin anlık hazır olma durumu"""
+    with state_lock:
+        components = dict(startup_state)
+        models = {model_id: dict(state) for model_id, state in model_states.items()}
+    ready_models = [model_id for model_id, state in models.items() if state['state'] == 'ready']
+    return {
+        'ready': components['chromadb'] == 'ready' and (bool(ready_models) or (LAZY_MODEL_LOADING and bool(models))),
+        'components': components,
+        'models': models,
+        'ready_models': ready_models
+    }
+
+def get_encode_fn(model_id, model):
+    """Model için encode fonksiyonunu döndür (mikro-batch açıksa ortak kuyruk üzerinden)"""
+    if not MICROBATCH_ENABLED:
+        return model.encode
+    
+    with micro_batchers_lock:
+        batcher = micro_batchers.get(model_id)
+        if batcher is None or batcher.encode_fn != model.encode:
+            # Model değiştiyse eski zamanlayıcıyı kapat
+            if batcher is not None:
+                batcher.close()
+            batcher = MicroBatcher(
+                model_id,
+                model.encode,
+                max_batch_size=MICROBATCH_MAX_BATCH_SIZE,
+                max_wait_ms=MICROBATCH_MAX_WAIT_MS
+            )
+            micro_batchers[model_id] = batcher
+        submit = batcher.submit
+    
+    def encode(texts):
+        try:
+            return submit(texts)
+        except BatcherClosedError:
+            # Model bu arada çıkarıldı veya yenilendi: kuyruktakiler yine işlenir, kapanıştan sonra
+            # gelen istek elindeki modelle doğrudan encode eder (çıkarılan model için yeni kuyruk açılmaz)
+            return model.encode(list(texts))
+    return encode
+
+def close_micro_batcher(model_id):
+    """Modelin mikro-batch zamanlayıcısını kapat; kuyruktaki istekler kapanmadan önce encode edilir"""
+    with micro_batchers_lock:
+        batcher = micro_batchers.pop(model_id, None)
+    if batcher is not None:
+        batcher.close()
+
+def micro_batching_stats():
+    """Mikro-batch zamanlayıcılarının model bazlı metrikleri"""
+    with micro_batchers_lock:
+        batchers = dict(micro_batchers)
+    return {
+        'enabled': MICROBATCH_ENABLED,
+        'models': {model_id: batcher.stats() for model_id, batcher in batchers.items()}
+    }
+
+def encode_queries(model_id, queries, store_in_cache=True):
+    """Sorguları model bazlı önbellek üzerinden vektörleştir"""
+    model = get_model(model_id)
+    if model is None:
+        raise KeyError(f"Model yüklenmemiş: {model_id}")
+    
+    if getattr(profiling_context, 'direct_encode', False):
+        # Profil altında: encode mikro-batch thread'i yerine bu thread'de çalışır ve önbellekten gelmez
+        return list(np.asarray(model.encode(list(queries)), dtype=np.float32))
+    
+    encode_fn = get_encode_fn(model_id, model)
+    return query_embedding_cache.encode(model_id, model, queries, encode_fn, store=store_in_cache)
+
+def read_database_generation():
+    """Aktif koleksiyonların metadata'sındaki generation damgalarını oku"""
+    stamps = set()
+    for model_id in list(word_collections.keys()):
+        for name in (f"kelime_vektorleri_{model_id}", f"metin_vektorleri_{model_id}"):
+            metadata = client.get_collection(name).metadata or {}
+            stamps.add(str(metadata.get("generation", "unknown")))
+    return "|".join(sorted(stamps)) or "unknown"
+
+def current_database_generation():
+    """Veritabanı neslini döndür; en fazla GENERATION_CHECK_INTERVAL saniyede bir yeniden oku"""
+    global database_generation, generation_checked_at
+    
+    with generation_lock:
+        now = time.monotonic()
+        if database_generation is None or now - generation_checked_at >= GENERATION_CHECK_INTERVAL:
+            generation_checked_at = now
+            try:
+                generation = read_database_generation()
+            except Exception as e:
+                print(f"⚠️  Veritabanı nesli okunamadı: {e}")
+                generation = database_generation or "unknown"
+            if generation != database_generation:
+                if database_generation is not None:
+                    print(f"🔄 Veritabanı nesli değişti: {database_generation} -> {generation}")
+                    # Aynı dizinde yerinde rebuild: NumPy kopyaları eski vektörleri tutar
+                    refresh_search_indexes()
+                database_generation = generation
+                search_result_cache.set_generation(generation)
+        return database_generation
+
+def fall_back_to_chromadb():
+    """NumPy indekslerini aynı isimli güncel ChromaDB koleksiyonlarıyla değiştir (eski vektörler bırakılır)"""
+    global word_indexes, sentence_indexes
+    
+    new_word_indexes, new_sentence_indexes = dict(word_indexes), dict(sentence_indexes)
+    for indexes, prefix in ((new_word_indexes, "kelime_vektorleri_"), (new_sentence_indexes, "metin_vektorleri_")):
+        for model_id, index in list(indexes.items()):
+            if backend_name(index) == "chromadb":
+                continue
+            try:
+                indexes[model_id] = client.get_collection(prefix + model_id)
+            except Exception as e:
+                # Koleksiyon artık yoksa eski kopya ile aranmaz
+                print(f"⚠️  {prefix}{model_id} bulunamadı: {e}")
+                indexes.pop(model_id)
+    word_indexes, sentence_indexes = new_word_indexes, new_sentence_indexes
+
+def refresh_search_indexes():
+    """Yerinde rebuild sonrası: hemen ChromaDB'ye düş, koleksiyonları ve NumPy indekslerini arka planda yeniden kur.
+    
+    Kurulum sürerken nesil yine değişirse thread bir tur daha çalışır.
+    """
+    global index_refresh_thread
+    
+    try:
+        fall_back_to_chromadb()
+    except Exception as e:
+        print(f"⚠️  NumPy indeksleri bırakılamadı: {e}")
+    
+    def run():
+        global index_refresh_thread
+        while True:
+            with index_refresh_lock:
+                if not index_refresh_requested.is_set():
+                    index_refresh_thread = None
+                    return
+                index_refresh_requested.clear()
+            with reload_lock:
+                print(f"🔁 Arama indeksleri yeni nesil için yeniden kuruluyor: {active_db_dir}")
+                setup_chromadb(active_db_dir)
+    
+    with index_refresh_lock:
+        index_refresh_requested.set()
+        if index_refresh_thread is None:
+            index_refresh_thread = threading.Thread(target=run, name="index-refresh", daemon=True)
+            index_refresh_thread.start()
+
+def observe_stage(stage, model_id, search_type, started, timings=None):
+    """Aşama süresini histograma (ve verilirse istek bazlı timings sözlüğüne, ms) yaz; bitiş zamanını döndür"""
+    finished = time.perf_counter()
+    search_stage_seconds.observe(finished - started, stage=stage, model=model_id, type=search_type)
+    if timings is not None:
+        timings[stage] = round((finished - started) * 1000, 3)
+    return finished
+
+def result_index(results, row, position, doc_id):
+    """Sonucun veri dosyasındaki sırasını döndür (metadata 'index', yoksa eski sayısal ID)"""
+    metadatas = results.get('metadatas')
+    if metadatas and metadatas[row]:
+        metadata = metadatas[row][position] or {}
+        if 'index' in metadata:
+            return int(metadata['index'])
+    return int(doc_id)
+
+def format_sentence_results(results, row=0):
+    """ChromaDB sorgu sonucunun belirtilen satırını cümle sonuçlarına çevir"""
+    formatted_results = []
+    if results['documents'] and results['documents'][row]:
+        documents = results['documents'][row]
+        distances = results['distances'][row]
+        ids = results['ids'][row]
+        
+        for i, (doc, distance, doc_id) in enumerate(zip(documents, distances, ids)):
+            # Cosine distance'ı cosine similarity'ye çevir
+            similarity = max(0, 1 - distance)
+            
+            formatted_results.append({
+                'rank': i + 1,
+                'sentence': doc,
+                'similarity': similarity,
+                'similarity_percent': round(similarity * 100, 1),
+                'index': result_index(results, row, i, doc_id)
+            })
+    
+    return formatted_results
+
+def format_word_results(results, row=0):
+    """ChromaDB sorgu sonucunun belirtilen satırını kelime sonuçlarına çevir"""
+    formatted_results = []
+    if results['documents'] and results['documents'][row]:
+        documents = results['documents'][row]
+        distances = results['distances'][row]
+        ids = results['ids'][row]
+        
+        for i, (doc, distance, doc_id) in enumerate(zip(documents, distances, ids)):
+            # Cosine distance'ı cosine similarity'ye çevir
+            similarity = max(0, 1 - distance)
+            
+            # İlişkileri al
+            relationships = iliskiler.get(doc.lower(), {})
+            
+            formatted_results.append({
+                'rank': i + 1,
+                'word': doc,
+                'similarity': similarity,
+                'similarity_percent': round(similarity * 100, 1),
+                'index': result_index(results, row, i, doc_id),
+                'relationships': relationships
+            })
+    
+    return formatted_results
+
+class SearchError(Exception):
+    """Model araması tamamlanamadı (model/koleksiyon yok veya arama sırasında hata)"""
+
+def search_in_sentences(query, model_id, top_k=5, timings=None):
     """Belirtilen model ile cümlelerde arama"""
     
     # Dinamik olarak doğru modeli ve koleksiyonu seç
-    model = loaded_models.get(model_id)
-    collection = sentence_collections.get(model_id)
+    model = get_model(model_id)
+    collection = sentence_indexes.get(model_id)
     
-    if not model or not collection:
+    if model is None or collection is None:
         print(f"❌ Model veya koleksiyon bulunamadı: {model_id}")
-        return []
+        raise SearchError(f"Model veya koleksiyon bulunamadı: {model_id}")
     
     try:
         # Sorgu vektörü oluştur
-        query_vector = model.encode([query])[0].tolist()
+        started = time.perf_counter()
+        query_vector = encode_queries(model_id, [query])[0].tolist()
+        started = observe_stage("encode", model_id, "sentences", started, timings)
         
-        # ChromaDB'de arama yap
+        # Seçili arka uçta (NumPy veya ChromaDB) arama yap
         results = collection.query(
             query_embeddings=[query_vector],
             n_results=min(top_k, collection.count())
         )
+        started = observe_stage("query", model_id, "sentences", started, timings)
         
         # Sonuçları formatla
-        formatted_results = []
-        if results['documents'] and results['documents'][0]:
-            documents = results['documents'][0]
-            distances = results['distances'][0]
-            ids = results['ids'][0]
-            
-            for i, (doc, distance, doc_id) in enumerate(zip(documents, distances, ids)):
-                # Cosine distance'ı cosine similarity'ye çevir
-                similarity = max(0, 1 - distance)
-                
-                formatted_results.append({
-                    'rank': i + 1,
-                    'sentence': doc,
-                    'similarity': similarity,
-                    'similarity_percent': round(similarity * 100, 1),
-                    'index': int(doc_id)
-                })
-        
-        return formatted_results
+        formatted = format_sentence_results(results)
+        observe_stage("format", model_id, "sentences", started, timings)
+        return formatted
         
     except Exception as e:
+        # Hata boş sonuç gibi görünmesin (önbelleğe alınmamalı)
         print(f"❌ {model_id} cümle arama hatası: {e}")
-        return []
+        raise SearchError(f"{model_id} cümle arama hatası: {e}") from e
 
-def search_in_words(query, model_id, top_k=5):
+def search_in_words(query, model_id, top_k=5, timings=None):
     """Belirtilen model ile kelimelerde arama"""
     
     # Dinamik olarak doğru modeli ve koleksiyonu seç
-    model = loaded_models.get(model_id)
-    collection = word_collections.get(model_id)
+    model = get_model(model_id)
+    collection = word_indexes.get(model_id)
     
-    if not model or not collection:
+    if model is None or collection is None:
         print(f"❌ Model veya koleksiyon bulunamadı: {model_id}")
-        return []
+        raise SearchError(f"Model veya koleksiyon bulunamadı: {model_id}")
     
     try:
         # Sorgu vektörü oluştur
-        query_vector = model.encode([query])[0].tolist()
+        started = time.perf_counter()
+        query_vector = encode_queries(model_id, [query])[0].tolist()
+        started = observe_stage("encode", model_id, "words", started, timings)
         
-        # ChromaDB'de arama yap
+        # Seçili arka uçta (NumPy veya ChromaDB) arama yap
         results = collection.query(
             query_embeddings=[query_vector],
             n_results=min(top_k, collection.count())
         )
+        started = observe_stage("query", model_id, "words", started, timings)
         
         # Sonuçları formatla
-        formatted_results = []
-        if results['documents'] and results['documents'][0]:
-            documents = results['documents'][0]
-            distances = results['distances'][0]
-            ids = results['ids'][0]
-            
-            for i, (doc, distance, doc_id) in enumerate(zip(documents, distances, ids)):
-                # Cosine distance'ı cosine similarity'ye çevir
-                similarity = max(0, 1 - distance)
-                
-                # İlişkileri al
-                relationships = iliskiler.get(doc.lower(), {})
-                
-                formatted_results.append({
-                    'rank': i + 1,
-                    'word': doc,
-                    'similarity': similarity,
-                    'similarity_percent': round(similarity * 100, 1),
-                    'index': int(doc_id),
-                    'relationships': relationships
-                })
-        
-        return formatted_results
+        formatted = format_word_results(results)
+        observe_stage("format", model_id, "words", started, timings)
+        return formatted
         
     except Exception as e:
+        # Hata boş sonuç gibi görünmesin (önbelleğe alınmamalı)
         print(f"❌ {model_id} kelime arama hatası: {e}")
-        return []
+        raise SearchError(f"{model_id} kelime arama hatası: {e}") from e
+
+def search_batch(queries, model_id, search_type, top_k=5, timings=None):
+    """Birden fazla sorguyu tek encode ve tek ChromaDB sorgusu ile ara"""
+    
+    model = get_model(model_id)
+    if search_type == 'sentences':
+        collection = sentence_indexes.get(model_id)
+        formatter = format_sentence_results
+    else:
+        collection = word_indexes.get(model_id)
+        formatter = format_word_results
+    
+    if model is None or collection is None:
+        print(f"❌ Model veya koleksiyon bulunamadı: {model_id}")
+        raise SearchError(f"Model veya koleksiyon bulunamadı: {model_id}")
+    
+    try:
+        # Tüm sorgu vektörlerini tek forward pass ile oluştur
+        started = time.perf_counter()
+        query_vectors = [vector.tolist() for vector in encode_queries(model_id, queries, store_in_cache=False)]
+        started = observe_stage("encode", model_id, f"batch_{search_type}", started, timings)
+        
+        # Tek çağrı ile tüm sorguları ara
+        results = collection.query(
+            query_embeddings=query_vectors,
+            n_results=min(top_k, collection.count())
+        )
+        started = observe_stage("query", model_id, f"batch_{search_type}", started, timings)
+        
+        formatted = [formatter(results, row) for row in range(len(queries))]
+        observe_stage("format", model_id, f"batch_{search_type}", started, timings)
+        return formatted
+        
+    except Exception as e:
+        # Hata boş sonuç gibi görünmesin
+        print(f"❌ {model_id} toplu arama hatası: {e}")
+        raise SearchError(f"{model_id} toplu arama hatası: {e}") from e
+
+def run_model_search(query, model_id, search_type, top_k=5, timings=None):
+    """Tek bir model için arama tipine göre doğru arama fonksiyonunu çalıştır"""
+    if search_type == 'sentences':
+        return search_in_sentences(query, model_id, top_k=top_k, timings=timings)
+    return search_in_words(query, model_id, top_k=top_k, timings=timings)
 
 @app.route('/')
 def index():
@@ -438,39 +1004,164 @@ def search():
     if not model_ids:
         return jsonify({'error': 'En az bir model seçimi gerekli!'})
     
-    # Geçersiz model ID'lerini filtrele
-    valid_model_ids = [mid for mid in model_ids if mid in loaded_models]
+    # Geçersiz (veya henüz hazır olmayan) model ID'lerini filtrele
+    valid_model_ids = [mid for mid in model_ids if mid in available_model_ids()]
     if not valid_model_ids:
+        if any(model_states.get(mid, {}).get('state') in ('pending', 'loading') for mid in model_ids):
+            return jsonify({'error': 'Seçilen modeller henüz yükleniyor, lütfen biraz sonra tekrar deneyin!'})
         return jsonify({'error': 'Seçilen modeller yüklenmemiş!'})
     
+    top_k = 5
+    debug = debug_requested(data)
+    # no_cache: sonuç önbelleği okunmaz ve yazılmaz (yük testi / ölçüm için)
+    use_cache = not data.get('no_cache')
+    
     try:
-        final_results = {}
+        # Aynı veritabanı nesli için daha önce hesaplanmış yanıt varsa onu döndür
+        started = time.perf_counter()
+        # Nesil bir kez okunur; yanıt aynı nesil altında saklanır (arada geçiş olduysa saklanmaz)
+        generation = current_database_generation()
+        cache_key = (normalize_query(query), tuple(valid_model_ids), search_type, top_k)
+        cached_response = search_result_cache.get(cache_key, generation) if use_cache else None
+        # Model/aşama bazlı süreler (ms): Server-Timing başlığı ve debug yanıtı için
+        stage_timings = g.stage_timings = {'result_cache': {'lookup': elapsed_ms(started)}}
+        if cached_response is not None:
+            timings = {'timings': {'stages': stage_timings, 'total_ms': elapsed_ms(started)}} if debug else {}
+            return jsonify(dict(cached_response, cached=True, **timings))
         
+        # Her model için aramayı paralel başlat
         for model_id in valid_model_ids:
-            # Her model için ayrı ayrı arama yap
-            if search_type == 'sentences':
-                results = search_in_sentences(query, model_id, top_k=5)
-            else:  # words
-                results = search_in_words(query, model_id, top_k=5)
-            
+            stage_timings[model_id] = {}
+        all_results, timed_out_models, queued_models, errors = run_fanout(
+            search_executor,
+            {model_id: (run_model_search, (query, model_id, search_type, top_k, stage_timings[model_id]))
+             for model_id in valid_model_ids},
+            timeout=SEARCH_TIMEOUT_SECONDS,
+            queue_timeout=SEARCH_QUEUE_TIMEOUT_SECONDS
+        )
+        
+        final_results = {}
+        for model_id in valid_model_ids:
+            # Süre sınırını aşan veya havuzda başlayamayan model boş sonuçla döner
+            results = all_results.get(model_id, [])
             final_results[model_id] = {
                 "model_name": SUPPORTED_MODELS.get(model_id, "Bilinmeyen Model"),
                 "model_id": model_id,
                 "results": results,
                 "total_found": len(results)
             }
+            if model_id in timed_out_models:
+                final_results[model_id]["timed_out"] = True
+            elif model_id in queued_models:
+                final_results[model_id]["queue_timed_out"] = True
+            elif model_id in errors:
+                final_results[model_id]["error"] = str(errors[model_id])
         
-        return jsonify({
+        if timed_out_models:
+            print(f"⏱️  Süre sınırı aşıldı ({SEARCH_TIMEOUT_SECONDS}s): {timed_out_models}")
+        if queued_models:
+            print(f"⏱️  Arama havuzu dolu, {SEARCH_QUEUE_TIMEOUT_SECONDS}s içinde başlayamadı: {queued_models}")
+        
+        response = {
             'query': query,
             'type': search_type,
             'search_results': final_results,
-            'models_used': valid_model_ids
-        })
+            'models_used': valid_model_ids,
+            'timed_out_models': timed_out_models,
+            'queue_timed_out_models': queued_models,
+            'failed_models': list(errors)
+        }
+        
+        # Eksik (süre aşımlı veya hatalı model içeren) yanıtlar önbelleğe alınmaz
+        if use_cache and not timed_out_models and not queued_models and not errors:
+            search_result_cache.put(cache_key, response, generation)
+        
+        timings = {'timings': {'stages': stage_timings, 'total_ms': elapsed_ms(started)}} if debug else {}
+        return jsonify(dict(response, cached=False, **timings))
         
     except Exception as e:
         print(f"❌ Arama hatası: {e}")
         return jsonify({'error': f'Arama yapılırken hata oluştu: {str(e)}'})
 
+def int_param(data, name, default, minimum=1, maximum=None):
+    """İstek parametresini tamsayıya çevir: geçersiz veya minimumun altındaysa ValueError,
+    maximum'u aşarsa maximum'a indir"""
+    value = data.get(name, default)
+    try:
+        if isinstance(value, bool):
+            raise TypeError(name)
+        value = int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"'{name}' bir tamsayı olmalı")
+    if value < minimum:
+        raise ValueError(f"'{name}' en az {minimum} olmalı")
+    return min(value, maximum) if maximum else value
+
+@app.route('/search/batch', methods=['POST'])
+def search_batch_endpoint():
+    """Çok sayıda sorguyu model başına tek seferde işleyen toplu arama endpoint'i"""
+    data = request.get_json() or {}
+    queries = [q.strip() for q in data.get('queries', []) if isinstance(q, str) and q.strip()]
+    model_ids = data.get('models', [])
+    search_type = data.get('type', 'sentences')  # 'sentences' veya 'words'
+    try:
+        top_k = int_param(data, 'top_k', 5, maximum=SEARCH_MAX_TOP_K)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not queries:
+        return jsonify({'error': 'En az bir arama terimi gerekli!'})
+    
+    if len(queries) > SEARCH_BATCH_MAX_QUERIES:
+        return jsonify({'error': f'Tek istekte en fazla {SEARCH_BATCH_MAX_QUERIES} sorgu gönderilebilir!'})
+        
+    if not model_ids:
+        return jsonify({'error': 'En az bir model seçimi gerekli!'})
+    
+    valid_model_ids = [mid for mid in model_ids if mid in available_model_ids()]
+    if not valid_model_ids:
+        return jsonify({'error': 'Seçilen modeller yüklenmemiş!'})
+    
+    try:
+        # Modeller paralel, her modelin sorguları tek batch halinde
+        started = time.perf_counter()
+        stage_timings = g.stage_timings = {model_id: {} for model_id in valid_model_ids}
+        all_results, _, _, errors = run_fanout(
+            batch_search_executor,
+            {model_id: (search_batch, (queries, model_id, search_type, top_k, stage_timings[model_id]))
+             for model_id in valid_model_ids}
+        )
+        
+        batch_results = {}
+        for model_id in valid_model_ids:
+            per_query = all_results.get(model_id) or [[] for _ in queries]
+            batch_results[model_id] = {
+                "model_name": SUPPORTED_MODELS.get(model_id, "Bilinmeyen Model"),
+                "model_id": model_id,
+                "results": [
+                    {"query": query, "results": results, "total_found": len(results)}
+                    for query, results in zip(queries, per_query)
+                ]
+            }
+            if model_id in errors:
+                batch_results[model_id]["error"] = str(errors[model_id])
+        
+        response = {
+            'queries': queries,
+            'type': search_type,
+            'top_k': top_k,
+            'batch_results': batch_results,
+            'models_used': valid_model_ids,
+            'failed_models': list(errors)
+        }
+        if debug_requested(data):
+            response['timings'] = {'stages': stage_timings, 'total_ms': elapsed_ms(started)}
+        return jsonify(response)
+        
+    except Exception as e:
+        print(f"❌ Toplu arama hatası: {e}")
+        return jsonify({'error': f'Toplu arama yapılırken hata oluştu: {str(e)}'})
+
 @app.route('/relationships/<word>')
 def get_relationships(word):
     """Kelime ilişkilerini getir"""
@@ -508,10 +1199,14 @@ def question_answer():
             return jsonify({'error': 'Q&A sistemi hazır değil!'})
         
         # VectorStore Retriever ile alakalı dokümanları bul
+        request_started = started = time.perf_counter()
+        stage_timings = g.stage_timings = {QA_MODEL_ID: {}}
         relevant_docs = qa_retriever.invoke(question)
+        started = observe_stage("retrieve", QA_MODEL_ID, "qa", started, stage_timings[QA_MODEL_ID])
         
         # Soru cevaplama
         qa_result = answer_question(question, relevant_docs)
+        observe_stage("answer", QA_MODEL_ID, "qa", started, stage_timings[QA_MODEL_ID])
         
         # Similarity score hesaplama
         similarity_scores = []
@@ -522,7 +1217,7 @@ def question_answer():
                 similarity = 0.9 - (i * 0.1)  # 90%, 80%, 70% vs.
                 similarity_scores.append(round(max(similarity, 0.4) * 100, 1))
         
-        return jsonify({
+        response = {
             'question': question,
             'answer': qa_result['answer'],
             'confidence': qa_result['confidence'],
@@ -531,11 +1226,109 @@ def question_answer():
             'retrieved_documents': len(relevant_docs),
             'similarity_scores': similarity_scores,
             'method': 'VectorStoreRetriever + LangChain'
-        })
+        }
+        if debug_requested(data):
+            response['timings'] = {'stages': stage_timings, 'total_ms': elapsed_ms(request_started)}
+        return jsonify(response)
         
     except Exception as e:
         return jsonify({'error': f'Q&A hatası: {str(e)}'})
 
+def admin_error():
+    """Yönetici endpoint'leri için yetki kontrolü; sorun yoksa None"""
+    if not ADMIN_TOKEN:
+        return jsonify({'error': 'Yönetici endpoint\'leri kapalı (ADMIN_TOKEN ayarlanmamış)'}), 404
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return jsonify({'error': 'Yetkisiz istek!'}), 403
+    return None
+
+@app.route('/admin/profile', methods=['POST'])
+def admin_profile():
+    """Verilen sorguları arama fonksiyonları ve Q&A retriever üzerinden cProfile altında çalıştır"""
+    error = admin_error()
+    if error:
+        return error
+    
+    data = request.get_json() or {}
+    queries = [q.strip() for q in data.get('queries', []) if isinstance(q, str) and q.strip()]
+    targets = data.get('targets', ['words', 'sentences'])
+    model_ids = [mid for mid in (data.get('models') or available_model_ids()) if mid in available_model_ids()]
+    try:
+        top_k = int_param(data, 'top_k', 5, maximum=SEARCH_MAX_TOP_K)
+        repeat = int_param(data, 'repeat', 1)
+        limit = int_param(data, 'limit', 30, maximum=PROFILE_MAX_LIMIT)
+        sample_interval_ms = None
+        if data.get('sampling'):
+            try:
+                sample_interval_ms = float(data.get('sample_interval_ms', 5))
+            except (TypeError, ValueError):
+                raise ValueError("'sample_interval_ms' bir sayı olmalı")
+            if not 0 < sample_interval_ms <= 1000:
+                raise ValueError("'sample_interval_ms' 0 ile 1000 arasında olmalı")
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not queries:
+        return jsonify({'error': 'En az bir sorgu gerekli!'}), 400
+    # Çağrı listesi kurulmadan önce reddedilir (her tur sorgu başına en az bir çağrı)
+    if repeat * len(queries) > PROFILE_MAX_CALLS:
+        return jsonify({'error': f'Tek profilde en fazla {PROFILE_MAX_CALLS} çağrı yapılabilir '
+                                 f'({repeat} tekrar x {len(queries)} sorgu istendi)!'}), 400
+    
+    calls = []
+    for _ in range(repeat):
+        for query in queries:
+            for model_id in model_ids:
+                if 'words' in targets:
+                    calls.append((f"words:{model_id}", lambda q=query, m=model_id: search_in_words(q, m, top_k=top_k)))
+                if 'sentences' in targets:
+                    calls.append((f"sentences:{model_id}", lambda q=query, m=model_id: search_in_sentences(q, m, top_k=top_k)))
+            if 'qa' in targets and qa_retriever is not None:
+                calls.append(("qa_retriever", lambda q=query: qa_retriever.invoke(q)))
+    
+    if not calls:
+        return jsonify({'error': 'Profillenecek hedef yok (model veya Q&A sistemi hazır değil)!'}), 400
+    if len(calls) > PROFILE_MAX_CALLS:
+        return jsonify({'error': f'Tek profilde en fazla {PROFILE_MAX_CALLS} çağrı yapılabilir ({len(calls)} istendi)!'}), 400
+    
+    # Aynı anda tek profil: cProfile ölçümleri birbirine karışmasın
+    if not profiling_lock.acquire(blocking=False):
+        return jsonify({'error': 'Başka bir profil çalışıyor, lütfen bekleyin!'}), 409
+    try:
+        profiling_context.direct_encode = not data.get('use_cache', False)
+        result = profile_calls(
+            calls,
+            sort=data.get('sort', 'cumulative'),
+            limit=limit,
+            dump_dir=PROFILE_DIR,
+            label="search",
+            sample_interval_ms=sample_interval_ms
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    finally:
+        profiling_context.direct_encode = False
+        profiling_lock.release()
+    
+    result['dump_url'] = f"/admin/profile/dumps/{result['dump_file']}"
+    if 'sampling' in result:
+        result['sampling']['folded_url'] = f"/admin/profile/dumps/{result['sampling']['folded_file']}"
+    return jsonify(dict(result, models=model_ids, targets=targets, queries=len(queries)))
+
+@app.route('/admin/profile/dumps/<path:filename>')
+def admin_profile_dump(filename):
+    """Profil dosyasını indir (.prof: snakeviz / pstats, .folded: flamegraph / speedscope)"""
+    error = admin_error()
+    if error:
+        return error
+    return send_from_directory(PROFILE_DIR, filename, as_attachment=True)
+
+@app.route('/ready')
+def ready():
+    """Hazır olma (readiness) kontrolü - model bazlı yükleme durumları"""
+    snapshot = readiness_snapshot()
+    return jsonify(snapshot), (200 if snapshot['ready'] else 503)
+
 @app.route('/stats')
 def stats():
     """Sistem istatistikleri - çoklu model destekli"""
@@ -546,14 +1339,19 @@ def stats():
         qa_docs_count = 0
         
         # Her model için istatistikleri topla
-        for model_id in loaded_models.keys():
+        searchable_models = available_model_ids()
+        for model_id in searchable_models:
             word_count = word_collections.get(model_id, {}).count() if word_collections.get(model_id) else 0
             sentence_count = sentence_collections.get(model_id, {}).count() if sentence_collections.get(model_id) else 0
             
             model_stats[model_id] = {
                 'name': SUPPORTED_MODELS.get(model_id, 'Unknown'),
                 'words': word_count,
-                'sentences': sentence_count
+                'sentences': sentence_count,
+                'precision': precision_for(model_id, MODEL_PRECISION),
+                'max_seq_length': max_seq_length_for(model_id, MODEL_MAX_SEQ_LENGTH),
+                'word_backend': backend_name(word_indexes.get(model_id)),
+                'sentence_backend': backend_name(sentence_indexes.get(model_id))
             }
             
             total_words = max(total_words, word_count)  # Veriler aynı olduğu için max al
@@ -563,7 +1361,7 @@ def stats():
         if qa_vectorstore:
             try:
                 qa_docs_count = qa_vectorstore._collection.count()
-            except:
+            except Exception:
                 qa_docs_count = 0
         
         return jsonify({
@@ -572,11 +1370,18 @@ def stats():
             'relationships_count': len(iliskiler) if iliskiler else 0,
             'models_loaded': len(loaded_models),
             'model_loaded': len(loaded_models) > 0,
-            'available_models': list(loaded_models.keys()),
+            'available_models': searchable_models,
             'model_details': model_stats,
             'supported_models': SUPPORTED_MODELS,
             'qa_documents_count': qa_docs_count,
-            'qa_system_ready': qa_vectorstore is not None
+            'qa_system_ready': qa_vectorstore is not None,
+            'embedding_cache': query_embedding_cache.stats(),
+            'embedding_store': embedding_store.stats() if embedding_store else None,
+            'micro_batching': micro_batching_stats(),
+            'result_cache': search_result_cache.stats(),
+            'database': dict(database_state, generation=database_generation),
+            'readiness': readiness_snapshot(),
+            'model_manager': model_manager.stats()
         })
         
     except Exception as e:
@@ -595,10 +1400,10 @@ if __name__ == '__main__':
     print("🎯 Multi-Model Türkçe Semantik Arama Sistemi")
     print("=" * 50)
     
-    # Verileri yükle
-    if load_data():
-        print("🚀 Sistem hazır! http://127.0.0.1:5001")
-        app.run(debug=True, host='0.0.0.0', port=5001)
-    else:
-        print("❌ Sistem başlatılamadı!")
-        print("💡 Önce 'python rebuild_database.py' komutunu çalıştırın")
+    # Verileri arka planda yükle; debug reloader'da sadece sunucuyu çalıştıran alt süreç yükler
+    debug = True
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_background_loading()
+    
+    print("🚀 Sunucu başlatılıyor: http://127.0.0.1:5001 (hazır olma durumu: /ready)")
+    app.run(debug=debug, host='0.0.0.0', port=5001)
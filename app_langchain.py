@@ -1,8 +1,10 @@
 # app_langchain.py - Langchain ve ChromaDB ile Gelişmiş Semantik Arama
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, g, has_request_context
 import os
 from langchain_arama import TurkishSemanticSearch
+from metrics import (MetricsRegistry, install_request_metrics, install_server_timing, cache_collector,
+                     debug_requested, elapsed_ms)
 
 app = Flask(__name__)
 
@@ -10,6 +12,29 @@ app = Flask(__name__)
 search_system = None
 iliskiler = None
 
+# Prometheus metinsel metrikleri (/metrics)
+metrics_registry = MetricsRegistry(prefix="langchain_search_")
+search_stage_seconds = metrics_registry.histogram(
+    "stage_duration_seconds", "Model ve arama tipine göre aşama süresi (encode, query, format)",
+    ("stage", "model", "type"))
+install_request_metrics(app, metrics_registry)
+# Yanıtlarda aşama bazlı Server-Timing başlığı
+install_server_timing(app)
+metrics_registry.add_collector(cache_collector(
+    "embedding_store", "Kalıcı embedding deposu",
+    lambda: search_system.store_embeddings.store.stats() if search_system and search_system.store_embeddings.store else None))
+
+def observe_search_stage(stage, search_type, seconds):
+    """Arama aşamasını histograma ve (istek içindeyse) Server-Timing için g.stage_timings'e yaz"""
+    search_stage_seconds.observe(seconds, stage=stage, model="dbmdz_bert", type=search_type)
+    if has_request_context():
+        stages = g.setdefault('stage_timings', {}).setdefault(f"dbmdz_bert.{search_type}", {})
+        stages[stage] = round(seconds * 1000, 3)
+
+def debug_timings():
+    """debug yanıtı için bu istekte toplanan aşama süreleri"""
+    return {'stages': g.get('stage_timings') or {}, 'total_ms': elapsed_ms(g.request_started)}
+
 def load_relationships():
     """Kelime ilişkilerini yükle"""
     global iliskiler
@@ -55,6 +80,7 @@ def init_search_system():
         
         # Arama sistemini oluştur
         search_system = TurkishSemanticSearch()
+        search_system.stage_observer = observe_search_stage
         
         # Vektör depolarını kur
         search_system.setup_word_vectorstore()
@@ -97,6 +123,7 @@ def search():
         query = data.get('query', '').strip()
         search_type = data.get('type', 'sentences')  # 'sentences' veya 'words'
         top_k = data.get('top_k', 5)  # Varsayılan 5 sonuç
+        debug = debug_requested(data)
         
         if not query:
             return jsonify({'error': 'Arama terimi gerekli!'})
@@ -112,7 +139,8 @@ def search():
                 'results': results,
                 'total_data': stats['sentences_count'],
                 'search_method': 'langchain_chromadb',
-                'model': stats['embedding_model']
+                'model': stats['embedding_model'],
+                **({'timings': debug_timings()} if debug else {})
             })
         else:
             # Kelimelerde arama
@@ -125,7 +153,8 @@ def search():
                 'results': results,
                 'total_data': stats['words_count'],
                 'search_method': 'langchain_chromadb',
-                'model': stats['embedding_model']
+                'model': stats['embedding_model'],
+                **({'timings': debug_timings()} if debug else {})
             })
             
     except Exception as e:
@@ -163,7 +192,8 @@ def hybrid_search():
                 'sentences_count': stats['sentences_count']
             },
             'search_method': 'langchain_chromadb_hybrid',
-            'model': stats['embedding_model']
+            'model': stats['embedding_model'],
+            **({'timings': debug_timings()} if debug_requested(data) else {})
         })
         
     except Exception as e:
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+⏱️ Search Benchmark - süreç içi arama gecikmesi ve verim ölçümü
+app.py arama fonksiyonlarını, Q&A retriever'ı ve (isteğe bağlı) LangChain aramasını
+farklı eşzamanlılık seviyelerinde çalıştırır; p50/p95/p99 gecikme, sorgu/s ve
+encode / indeks süre ayrımını JSON olarak yazar ve kayıtlı bir baseline ile karşılaştırır.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_queries(queries_file, sample_size, seed=42):
+    """Sorgu kümesini yükle; dosya verilmezse kelimeler ve metinlerden örnekle"""
+    if queries_file:
+        with open(queries_file, "r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+
+    pool = []
+    for filename in ("kelimeler.txt", "metinler.txt"):
+        path = os.path.join(BASE_DIR, filename)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                pool.extend(line.strip() for line in f if line.strip())
+
+    random.Random(seed).shuffle(pool)
+    return pool[:sample_size]
+
+
+def latency_summary(samples_ms):
+    """Gecikme örneklerinden ortalama ve yüzdelik değerleri hesapla (ms)"""
+    if not samples_ms:
+        return {'count': 0}
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        'count': int(len(samples)),
+        'mean_ms': round(float(samples.mean()), 3),
+        'p50_ms': round(float(np.percentile(samples, 50)), 3),
+        'p95_ms': round(float(np.percentile(samples, 95)), 3),
+        'p99_ms': round(float(np.percentile(samples, 99)), 3),
+        'max_ms': round(float(samples.max()), 3)
+    }
+
+
+def run_closed_loop(fn, queries, concurrency, requests_per_level):
+    """concurrency kadar thread, toplam requests_per_level çağrı bitene kadar sırayla sorgu gönderir"""
+    latencies = []
+    errors = [0]
+    counter = [0]
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                index = counter[0]
+                if index >= requests_per_level:
+                    return
+                counter[0] += 1
+            query = queries[index % len(queries)]
+            started = time.perf_counter()
+            try:
+                fn(query)
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    latencies.append(elapsed)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    wall = time.perf_counter() - started
+
+    result = latency_summary(latencies)
+    result.update({
+        'concurrency': concurrency,
+        'errors': errors[0],
+        'wall_seconds': round(wall, 3),
+        'qps': round(len(latencies) / wall, 2) if wall else 0.0
+    })
+    return result
+
+
+def encode_index_split(app_module, model_id, queries, top_k):
+    """Tek thread'de her sorgu için encode ve indeks sorgusu sürelerini ayrı ölç"""
+    split = {}
+    for search_type, indexes in (("words", app_module.word_indexes), ("sentences", app_module.sentence_indexes)):
+        index = indexes.get(model_id)
+        if index is None:
+            continue
+        encode_ms, index_ms = [], []
+        for query in queries:
+            started = time.perf_counter()
+            vector = app_module.encode_queries(model_id, [query], store_in_cache=False)[0]
+            encoded = time.perf_counter()
+            index.query(query_embeddings=[vector.tolist()], n_results=top_k)
+            finished = time.perf_counter()
+            encode_ms.append((encoded - started) * 1000)
+            index_ms.append((finished - encoded) * 1000)
+        split[search_type] = {
+            'backend': app_module.backend_name(index),
+            'encode': latency_summary(encode_ms),
+            'index': latency_summary(index_ms)
+        }
+    return split
+
+
+def build_targets(app_module, model_ids, top_k, include_langchain):
+    """Ölçülecek hedefler: ad -> tek sorgu alan fonksiyon"""
+    targets = {}
+    for model_id in model_ids:
+        targets[f"words:{model_id}"] = lambda q, m=model_id: app_module.search_in_words(q, m, top_k=top_k)
+        targets[f"sentences:{model_id}"] = lambda q, m=model_id: app_module.search_in_sentences(q, m, top_k=top_k)
+
+    if app_module.qa_retriever is not None:
+        targets["qa_retriever"] = lambda q: app_module.qa_retriever.invoke(q)
+
+    if include_langchain:
+        from langchain_arama import TurkishSemanticSearch
+        search = TurkishSemanticSearch()
+        if search.setup_word_vectorstore():
+            targets["langchain:words"] = lambda q: search.search_words(q, k=top_k)
+        if search.setup_sentence_vectorstore():
+            targets["langchain:sentences"] = lambda q: search.search_sentences(q, k=top_k)
+    return targets
+
+
+def compare_with_baseline(baseline, current, threshold):
+    """p95 gecikme artışlarını ve sorgu/s düşüşlerini eşik üzerinden listele"""
+    regressions = []
+    for target, levels in current.get('targets', {}).items():
+        for level, result in levels.items():
+            base = baseline.get('targets', {}).get(target, {}).get(level)
+            if not base:
+                continue
+            if base.get('p95_ms') and result.get('p95_ms', 0) > base['p95_ms'] * (1 + threshold):
+                regressions.append({'metric': f"{target}@{level}.p95_ms", 'baseline': base['p95_ms'], 'current': result['p95_ms']})
+            if base.get('qps') and result.get('qps', 0) < base['qps'] * (1 - threshold):
+                regressions.append({'metric': f"{target}@{level}.qps", 'baseline': base['qps'], 'current': result['qps']})
+    return regressions
+
+
+def parse_args(argv=None):
+    """Komut satırı argümanlarını çözümle"""
+    parser = argparse.ArgumentParser(description="Süreç içi arama gecikmesi ve verim benchmark'ı")
+    parser.add_argument("--models", nargs="+", help="Ölçülecek modeller (varsayılan: yüklenen tüm modeller)")
+    parser.add_argument("--queries", help="Satır başına bir sorgu içeren dosya (varsayılan: veri setinden örneklem)")
+    parser.add_argument("--sample", type=int, default=200, help="Örneklenecek sorgu sayısı")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="Eşzamanlılık seviyeleri")
+    parser.add_argument("--requests", type=int, default=200, help="Seviye başına istek sayısı")
+    parser.add_argument("-k", "--top-k", type=int, default=5)
+    parser.add_argument("--warm-cache", action="store_true", help="Sorgu vektörü önbelleğini açık bırak (varsayılan: kapalı)")
+    parser.add_argument("--langchain", action="store_true", help="TurkishSemanticSearch aramalarını da ölç")
+    parser.add_argument("--baseline", help="Karşılaştırılacak baseline JSON dosyası")
+    parser.add_argument("--save-baseline", action="store_true", help="Sonucu --baseline yoluna yeni baseline olarak yaz")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Gerileme eşiği (0.15 = %%15)")
+    parser.add_argument("--output", default="search_benchmark.json")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("⏱️  Search Benchmark")
+    print("=" * 60)
+
+    import app as app_module
+    if not app_module.load_data():
+        print("❌ Sistem yüklenemedi!")
+        return False
+
+    if not args.warm_cache:
+        # Her sorgu gerçekten encode edilsin
+        app_module.query_embedding_cache.max_entries_per_model = 0
+        app_module.query_embedding_cache.invalidate()
+
+    queries = load_queries(args.queries, args.sample)
+    if not queries:
+        print("❌ Sorgu bulunamadı!")
+        return False
+
+    model_ids = args.models or app_module.available_model_ids()
+    targets = build_targets(app_module, model_ids, args.top_k, args.langchain)
+    print(f"📊 Sorgu: {len(queries)}, hedef: {len(targets)}, eşzamanlılık: {args.concurrency}, "
+          f"seviye başına istek: {args.requests}")
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'config': {
+            'models': model_ids,
+            'query_count': len(queries),
+            'concurrency': args.concurrency,
+            'requests_per_level': args.requests,
+            'top_k': args.top_k,
+            'warm_cache': args.warm_cache,
+            'microbatching': app_module.MICROBATCH_ENABLED
+        },
+        'targets': {},
+        'encode_index_split': {}
+    }
+
+    for name, fn in targets.items():
+        print(f"\n🎯 {name}")
+        # Isınma: modelin ilk yüklenmesi ve lazy indeksler ölçüme girmesin
+        for query in queries[:5]:
+            fn(query)
+        report['targets'][name] = {}
+        for concurrency in args.concurrency:
+            result = run_closed_loop(fn, queries, concurrency, args.requests)
+            report['targets'][name][str(concurrency)] = result
+            print(f"   c={concurrency:<3} p50={result.get('p50_ms')}ms p95={result.get('p95_ms')}ms "
+                  f"p99={result.get('p99_ms')}ms qps={result['qps']} hata={result['errors']}")
+
+    print(f"\n🔬 Encode / indeks ayrımı")
+    for model_id in model_ids:
+        split = encode_index_split(app_module, model_id, queries, args.top_k)
+        report['encode_index_split'][model_id] = split
+        for search_type, values in split.items():
+            print(f"   {model_id}/{search_type} ({values['backend']}): encode p50={values['encode'].get('p50_ms')}ms, "
+                  f"indeks p50={values['index'].get('p50_ms')}ms")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Rapor kaydedildi: {args.output}")
+
+    if args.baseline and args.save_baseline:
+        # README örneğindeki benchmarks/ dizini depoda yok
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"📌 Baseline güncellendi: {args.baseline}")
+    elif args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare_with_baseline(json.load(f), report, args.threshold)
+        if regressions:
+            print(f"⚠️  Baseline'a göre {len(regressions)} gerileme:")
+            for item in regressions:
+                print(f"   • {item['metric']}: {item['baseline']} -> {item['current']}")
+            return False
+        print("✅ Baseline'a göre gerileme yok")
+
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
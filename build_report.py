@@ -0,0 +1,179 @@
+# build_report.py - İndeks build'leri için makine tarafından okunabilir aşama/verim raporu (JSON)
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+from model_manager import current_rss_mb, peak_rss_mb
+
+# Model bazında raporlanan aşamalar ve her aşamanın işlediği öğe türü
+STAGES = ("model_load", "tokenize", "encode_words", "encode_sentences", "insert")
+
+
+def get_directory_size(path):
+    """Dizin boyutunu MB cinsinden hesapla"""
+    total_size = 0
+    for dirpath, dirnames, filenames in os.walk(path):
+        for filename in filenames:
+            filepath = os.path.join(dirpath, filename)
+            total_size += os.path.getsize(filepath)
+    return total_size / (1024 * 1024)  # MB
+
+
+def children_peak_rss_mb():
+    """Alt süreçlerin (paralel encode worker'ları) en yüksek RSS değeri"""
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return round(peak / divisor, 1)
+    except Exception:
+        return None
+
+
+def model_memory(rss_before_mb, own_process=False):
+    """Bir modelin işlenmesinin bellek kaydı.
+
+    rss_delta_mb, model işlenmeden önceki ve sonraki RSS farkıdır (sıralı modda model hâlâ
+    bellekteyken ölçülür). own_process ise model ayrı bir worker sürecinde işlenmiştir ve
+    peak_rss_mb o sürecin kendi tepe değeridir; değilse tepe değer süreç genelidir.
+    """
+    rss_after_mb = current_rss_mb()
+    memory = {
+        'rss_before_mb': rss_before_mb,
+        'rss_after_mb': rss_after_mb,
+        'rss_delta_mb': round(rss_after_mb - rss_before_mb, 1) if None not in (rss_before_mb, rss_after_mb) else None
+    }
+    memory['peak_rss_mb' if own_process else 'process_peak_rss_mb'] = peak_rss_mb()
+    return memory
+
+
+def collection_sizes_mb(db_path):
+    """Koleksiyon adı -> HNSW vektör segmentinin disk boyutu (MB).
+
+    Kayıt/metadata satırları tüm koleksiyonlar için ortak chroma.sqlite3 dosyasındadır;
+    bu dosya ayrıca 'sqlite' anahtarıyla raporlanır.
+    """
+    sizes = {}
+    sqlite_path = os.path.join(db_path, "chroma.sqlite3")
+    if not os.path.exists(sqlite_path):
+        return sizes
+    connection = sqlite3.connect(f"file:{sqlite_path}?mode=ro", uri=True)
+    try:
+        rows = connection.execute(
+            "SELECT c.name, s.id FROM segments s JOIN collections c ON s.collection = c.id WHERE s.scope = 'VECTOR'"
+        ).fetchall()
+    finally:
+        connection.close()
+    for name, segment_id in rows:
+        segment_dir = os.path.join(db_path, segment_id)
+        sizes[name] = round(get_directory_size(segment_dir), 3) if os.path.isdir(segment_dir) else 0.0
+    sizes['sqlite'] = round(os.path.getsize(sqlite_path) / (1024 * 1024), 3)
+    return sizes
+
+
+class BuildReport:
+    """Bir rebuild çalışmasının model/koleksiyon bazında süre, verim, bellek ve boyut kaydı"""
+
+    def __init__(self, generation, options=None):
+        self.data = {
+            'generation': generation,
+            'started_at': datetime.now().isoformat(),
+            'options': options or {},
+            'models': {}
+        }
+
+    def _model(self, model_id):
+        return self.data['models'].setdefault(model_id, {'success': False, 'stages': {}, 'collections': {}})
+
+    def record_model(self, model_id, timings, word_count, sentence_count, success=True, items=None):
+        """Model aşama sürelerini öğe sayısı ve öğe/s verimiyle kaydet.
+
+        items verilirse aşama bazında işlenen öğe sayısını değiştirir (artımlı modda
+        sadece encode edilen / yazılan satırlar sayılır).
+        """
+        items = dict({
+            'tokenize': word_count + sentence_count,
+            'encode_words': word_count,
+            'encode_sentences': sentence_count,
+            'insert': word_count + sentence_count
+        }, **(items or {}))
+        model = self._model(model_id)
+        model['success'] = success
+        for stage in STAGES:
+            if stage not in timings:
+                continue
+            seconds = float(timings[stage])
+            entry = {'seconds': round(seconds, 3)}
+            if stage in items:
+                entry['items'] = items[stage]
+                entry['items_per_sec'] = round(items[stage] / seconds, 1) if seconds else None
+            model['stages'][stage] = entry
+
+    def record_memory(self, model_id, memory):
+        """Model bazında RSS kaydı (bkz. model_memory)"""
+        if memory:
+            self._model(model_id)['memory'] = memory
+
+    def record_collection(self, model_id, collection_name, stats):
+        """bulk_loader istatistiklerinden koleksiyon ekleme verimini kaydet"""
+        self._model(model_id)['collections'][collection_name] = {
+            'rows': stats.get('rows'),
+            'batch_size': stats.get('batch_size'),
+            'insert_seconds': stats.get('insert_seconds'),
+            'rows_per_sec': stats.get('rows_per_sec')
+        }
+
+    def finish(self, db_path, wall_seconds, successful_models, failed_models):
+        """Toplam süre, bellek ve disk boyutlarını ekle"""
+        sizes = collection_sizes_mb(db_path) if os.path.isdir(db_path) else {}
+        for model in self.data['models'].values():
+            for name, collection in model['collections'].items():
+                collection['size_mb'] = sizes.get(name)
+            model['size_mb'] = round(sum(c.get('size_mb') or 0.0 for c in model['collections'].values()), 3)
+        self.data.update({
+            'finished_at': datetime.now().isoformat(),
+            'wall_seconds': round(wall_seconds, 2),
+            'db_path': db_path,
+            'db_size_mb': round(get_directory_size(db_path), 3) if os.path.isdir(db_path) else None,
+            'sqlite_size_mb': sizes.get('sqlite'),
+            'peak_rss_mb': peak_rss_mb(),
+            'workers_peak_rss_mb': children_peak_rss_mb(),
+            'successful_models': successful_models,
+            'failed_models': failed_models
+        })
+        return self.data
+
+    def save(self, path):
+        """Raporu JSON olarak yaz"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2, ensure_ascii=False)
+        return path
+
+
+def compare_reports(baseline, current, threshold=0.10):
+    """İki rapordaki öğe/s ve kayıt/s değerlerini karşılaştır; eşikten fazla düşüşleri döndür"""
+    regressions = []
+    for model_id, model in current.get('models', {}).items():
+        base_model = baseline.get('models', {}).get(model_id)
+        if not base_model:
+            continue
+        pairs = [
+            (f"{model_id}.{stage}", entry.get('items_per_sec'), base_model['stages'].get(stage, {}).get('items_per_sec'))
+            for stage, entry in model.get('stages', {}).items()
+        ] + [
+            (f"{model_id}.{name}.insert", entry.get('rows_per_sec'), base_model['collections'].get(name, {}).get('rows_per_sec'))
+            for name, entry in model.get('collections', {}).items()
+        ]
+        for key, value, base_value in pairs:
+            if value and base_value and value < base_value * (1.0 - threshold):
+                regressions.append({
+                    'metric': key,
+                    'baseline': base_value,
+                    'current': value,
+                    'change': round(value / base_value - 1.0, 4)
+                })
+    return regressions
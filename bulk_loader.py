@@ -0,0 +1,109 @@
+# bulk_loader.py - ChromaDB koleksiyonlarına NumPy dizilerini doğrudan aktaran toplu yükleyici
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+DEFAULT_MAX_BATCH_SIZE = 5000
+
+
+def max_batch_size(client=None, requested=None):
+    """Batch boyutunu client'ın izin verdiği üst sınıra göre seç"""
+    limit = DEFAULT_MAX_BATCH_SIZE
+    if client is not None:
+        try:
+            limit = int(client.get_max_batch_size())
+        except Exception:
+            pass
+    return min(requested, limit) if requested else limit
+
+
+def _report(label, stats):
+    print(f"   🚚 {label}: {stats['rows']} kayıt, {stats['batches']} batch x {stats['batch_size']}, "
+          f"{stats['seconds']:.2f} s ({stats['rows_per_sec']:.0f} kayıt/s)")
+
+
+def _add_batch(collection, ids, documents, embeddings, metadatas):
+    """Tek batch ekle; float32 matris .tolist() yapılmadan ChromaDB'ye verilir"""
+    kwargs = {'ids': ids, 'documents': documents, 'embeddings': np.ascontiguousarray(embeddings, dtype=np.float32)}
+    if metadatas is not None:
+        kwargs['metadatas'] = metadatas
+    started = time.time()
+    collection.add(**kwargs)
+    return time.time() - started
+
+
+def bulk_insert(collection, ids, documents, embeddings, metadatas=None, client=None, batch_size=None, label="kayıt"):
+    """Hazır vektör matrisini client'ın maksimum batch boyutunda ekle"""
+    batch_size = max_batch_size(client, batch_size)
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    started = time.time()
+    batches = 0
+
+    for i in range(0, len(ids), batch_size):
+        end = min(i + batch_size, len(ids))
+        _add_batch(
+            collection, ids[i:end], documents[i:end], embeddings[i:end],
+            metadatas[i:end] if metadatas is not None else None
+        )
+        batches += 1
+
+    seconds = time.time() - started
+    stats = {
+        'rows': len(ids),
+        'batches': batches,
+        'batch_size': batch_size,
+        'seconds': round(seconds, 3),
+        'insert_seconds': round(seconds, 3),
+        'rows_per_sec': round(len(ids) / seconds, 1) if seconds else 0.0
+    }
+    _report(label, stats)
+    return stats
+
+
+def encode_and_insert(collection, ids, documents, encode_fn, metadatas=None, client=None, batch_size=None, label="kayıt"):
+    """Batch N eklenirken batch N+1'i encode et (tek arka plan yazıcı thread'i).
+
+    encode_fn metin listesi alıp vektör matrisi döndürmelidir. Sıralı yazıcı
+    kullanıldığı için koleksiyona ekleme sırası korunur.
+    """
+    batch_size = max_batch_size(client, batch_size)
+    started = time.time()
+    encode_seconds = 0.0
+    insert_seconds = 0.0
+    batches = 0
+    pending = None
+
+    with ThreadPoolExecutor(max_workers=1) as writer:
+        for i in range(0, len(ids), batch_size):
+            end = min(i + batch_size, len(ids))
+
+            encode_started = time.time()
+            vectors = encode_fn(documents[i:end])
+            encode_seconds += time.time() - encode_started
+
+            # Önceki batch'in yazılmasını bekle, sonra bu batch'i kuyruğa ver
+            if pending is not None:
+                insert_seconds += pending.result()
+            pending = writer.submit(
+                _add_batch, collection, ids[i:end], documents[i:end], vectors,
+                metadatas[i:end] if metadatas is not None else None
+            )
+            batches += 1
+
+        if pending is not None:
+            insert_seconds += pending.result()
+
+    seconds = time.time() - started
+    stats = {
+        'rows': len(ids),
+        'batches': batches,
+        'batch_size': batch_size,
+        'seconds': round(seconds, 3),
+        'encode_seconds': round(encode_seconds, 3),
+        'insert_seconds': round(insert_seconds, 3),
+        'rows_per_sec': round(len(ids) / seconds, 1) if seconds else 0.0
+    }
+    _report(label, stats)
+    return stats
@@ -0,0 +1,98 @@
+# collection_sync.py - İçerik tabanlı ID'lerle ChromaDB koleksiyonlarını metin listesine eşitleme
+
+import hashlib
+
+import numpy as np
+
+from bulk_loader import max_batch_size
+
+# Q&A vektör deposu (app.py, rebuild_database.py --incremental)
+QA_COLLECTION_NAME = "qa_documents"
+# Q&A deposu bu modelin cümle vektörlerini kullanır
+QA_MODEL_ID = "dbmdz_bert"
+QA_ID_PREFIX = "qa_"
+QA_INDEX_KEY = "sentence_id"
+
+
+def content_ids(texts, prefix=""):
+    """Metinlerden içerik tabanlı, kararlı ID'ler üret (tekrarlanan satırlar sıra numarası alır)"""
+    seen = {}
+    ids = []
+    for text in texts:
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:20]
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        ids.append(prefix + (digest if occurrence == 0 else f"{digest}-{occurrence}"))
+    return ids
+
+
+def qa_metadata(j):
+    """qa_documents kaydı için LangChain Document yapısıyla uyumlu metadata"""
+    return {"source": "metinler.txt", QA_INDEX_KEY: j, "type": "sentence"}
+
+
+def plan_collection_sync(collection, texts, prefix="", index_key="index"):
+    """Koleksiyonu metin listesine eşitlemek için gereken ekleme/silme/yeniden sıralama planı"""
+    ids = content_ids(texts, prefix)
+    existing = collection.get(include=["metadatas"])
+    existing_index = {
+        doc_id: (metadata or {}).get(index_key)
+        for doc_id, metadata in zip(existing["ids"], existing["metadatas"] or [None] * len(existing["ids"]))
+    }
+
+    to_add = [j for j, doc_id in enumerate(ids) if doc_id not in existing_index]
+    to_reindex = [j for j, doc_id in enumerate(ids) if doc_id in existing_index and existing_index[doc_id] != j]
+    desired = set(ids)
+    to_delete = [doc_id for doc_id in existing_index if doc_id not in desired]
+
+    return {
+        'ids': ids,
+        'add': to_add,
+        'reindex': to_reindex,
+        'delete': to_delete,
+        'unchanged': len(ids) - len(to_add) - len(to_reindex)
+    }
+
+
+def plan_is_empty(plan):
+    """Koleksiyon metin listesiyle zaten aynı mı"""
+    return not (plan['add'] or plan['delete'] or plan['reindex'])
+
+
+def apply_collection_sync(collection, texts, plan, vectors, batch_size=None, client=None, metadata_fn=None):
+    """Planı uygula: silinenleri kaldır, yeni kayıtları ekle, indeksi değişenleri güncelle.
+
+    vectors, plan['add'] sırasıyla eklenecek satırların vektörleridir.
+    """
+    ids = plan['ids']
+    metadata_fn = metadata_fn or (lambda j: {"index": j})
+    batch_size = max_batch_size(client, batch_size)
+
+    for i in range(0, len(plan['delete']), batch_size):
+        collection.delete(ids=plan['delete'][i:i + batch_size])
+
+    for i in range(0, len(plan['add']), batch_size):
+        positions = plan['add'][i:i + batch_size]
+        collection.upsert(
+            ids=[ids[j] for j in positions],
+            documents=[texts[j] for j in positions],
+            embeddings=np.asarray(vectors[i:i + batch_size], dtype=np.float32),
+            metadatas=[metadata_fn(j) for j in positions]
+        )
+
+    for i in range(0, len(plan['reindex']), batch_size):
+        positions = plan['reindex'][i:i + batch_size]
+        collection.update(
+            ids=[ids[j] for j in positions],
+            metadatas=[metadata_fn(j) for j in positions]
+        )
+
+
+def plan_qa_sync(collection, sentences):
+    """qa_documents koleksiyonu için eşitleme planı (ID'ler 'qa_' + içerik hash'i)"""
+    return plan_collection_sync(collection, sentences, QA_ID_PREFIX, QA_INDEX_KEY)
+
+
+def apply_qa_sync(collection, sentences, plan, vectors, batch_size=None, client=None):
+    """qa_documents planını uygula"""
+    apply_collection_sync(collection, sentences, plan, vectors, batch_size, client, qa_metadata)
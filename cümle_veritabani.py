@@ -5,11 +5,14 @@ import numpy as np
 import chromadb
 from sentence_transformers import SentenceTransformer
 
+from bulk_loader import bulk_insert
+from db_paths import resolve_db_dir
+
 print("🚀 Cümle Vektörleri ChromaDB'ye Yükleniyor...")
 
-# 1) Kalıcı DB yolunu ayarla
+# 1) Kalıcı DB yolunu ayarla (aktif blue/green build, yoksa eski db/ dizini)
 BASE_DIR = os.path.dirname(__file__)
-DB_DIR = os.path.join(BASE_DIR, "db")
+DB_DIR = resolve_db_dir(BASE_DIR)
 os.makedirs(DB_DIR, exist_ok=True)
 
 # 2) PersistentClient ile bağlantı
@@ -61,25 +64,15 @@ except Exception as e:
 # 7) Cümleleri toplu olarak ekle
 print("💾 Cümleler ChromaDB'ye ekleniyor...")
 try:
-    # ⚡ Optimized batch boyutu - daha büyük batchler daha hızlı!
-    batch_size = 500  # 100'den 500'e çıkardık
-    
-    for i in range(0, len(metinler), batch_size):
-        end_idx = min(i + batch_size, len(metinler))
-        batch_metinler = metinler[i:end_idx]
-        batch_vektorler = metin_vektorleri[i:end_idx]
-        batch_ids = [str(j) for j in range(i, end_idx)]
-        
-        # Vektörleri liste formatına çevir
-        batch_embeddings = [vec.tolist() for vec in batch_vektorler]
-        
-        collection.add(
-            embeddings=batch_embeddings,
-            documents=batch_metinler,
-            ids=batch_ids
-        )
-        
-        print(f"  📦 {end_idx}/{len(metinler)} cümle işlendi...")
+    # ⚡ NumPy matrisi doğrudan, client'ın izin verdiği en büyük batch boyutuyla eklenir
+    bulk_insert(
+        collection,
+        [str(j) for j in range(len(metinler))],
+        metinler,
+        metin_vektorleri,
+        client=client,
+        label="cümle"
+    )
 
     print(f"✅ {len(metinler)} cümle başarıyla ChromaDB'ye yüklendi!")
     print(f"🏁 Toplam kayıt sayısı: {collection.count()}")
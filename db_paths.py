@@ -0,0 +1,70 @@
+# db_paths.py - Blue/green veritabanı dizinleri ve atomik "current" işaretçisi
+
+import os
+import shutil
+
+LEGACY_DB_DIR = "db"
+BUILDS_DIR = "db_builds"
+POINTER_FILE = "CURRENT"
+
+
+def builds_dir(base_dir="."):
+    """Tüm build dizinlerinin bulunduğu klasör"""
+    return os.path.join(base_dir, BUILDS_DIR)
+
+
+def resolve_db_dir(base_dir="."):
+    """Aktif veritabanı dizini: işaretçi varsa gösterdiği build, yoksa eski 'db/' dizini"""
+    pointer = os.path.join(builds_dir(base_dir), POINTER_FILE)
+    try:
+        with open(pointer, "r", encoding="utf-8") as f:
+            name = f.read().strip()
+        if name and os.path.isdir(os.path.join(builds_dir(base_dir), name)):
+            return os.path.join(builds_dir(base_dir), name)
+    except OSError:
+        pass
+    return os.path.join(base_dir, LEGACY_DB_DIR)
+
+
+def new_build_dir(base_dir, generation, copy_from=None):
+    """Yeni nesil için boş (veya copy_from kopyası) build dizini oluştur"""
+    path = os.path.join(builds_dir(base_dir), generation)
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.makedirs(builds_dir(base_dir), exist_ok=True)
+    if copy_from and os.path.isdir(copy_from):
+        shutil.copytree(copy_from, path)
+    else:
+        os.makedirs(path)
+    return path
+
+
+def activate_build(base_dir, build_path):
+    """İşaretçiyi yeni build'e atomik olarak çevir (yaz + os.replace)"""
+    pointer = os.path.join(builds_dir(base_dir), POINTER_FILE)
+    tmp = pointer + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(os.path.basename(os.path.normpath(build_path)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, pointer)
+
+
+def prune_builds(base_dir=".", keep=2):
+    """Aktif build hariç en yeni `keep` build'i tut, daha eskileri sil.
+
+    Çalışan uygulama eski build'i birkaç saniye daha kullanıyor olabileceği için
+    bir önceki build hemen silinmez.
+    """
+    root = builds_dir(base_dir)
+    if not os.path.isdir(root):
+        return []
+    active = os.path.basename(resolve_db_dir(base_dir))
+    builds = sorted(
+        name for name in os.listdir(root)
+        if name != active and os.path.isdir(os.path.join(root, name))
+    )
+    removed = builds[:max(0, len(builds) - keep)]
+    for name in removed:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    return removed
@@ -0,0 +1,49 @@
+# embedding_adapters.py - Yüklü SentenceTransformer modellerini LangChain'e bağlayan adaptörler
+
+from langchain_core.embeddings import Embeddings
+
+from embedding_store import encode_with_store
+from search_backends import normalize_rows
+
+
+class SentenceTransformerEmbeddings(Embeddings):
+    """Zaten yüklü bir SentenceTransformer'ı LangChain Embeddings arayüzüyle sunan ince adaptör.
+
+    Model doğrudan değil, her çağrıda modeli döndüren bir fonksiyon (model_provider)
+    üzerinden alınır; böylece model yöneticisi modeli yeniden yüklese veya
+    bellekten çıkarsa bile adaptör güncel nesneyi kullanır ve ağırlıklar
+    ikinci kez belleğe alınmaz.
+
+    store verilirse doküman vektörleri önce kalıcı embedding deposunda aranır;
+    depoda ham vektörler tutulur, normalizasyon sonradan uygulanır.
+    """
+
+    def __init__(self, model_provider, normalize_embeddings=True, batch_size=32,
+                 store=None, model_id=None, revision=None):
+        self.model_provider = model_provider
+        self.normalize_embeddings = normalize_embeddings
+        self.batch_size = batch_size
+        self.store = store
+        self.model_id = model_id
+        self.revision = revision
+
+    def _encode(self, texts, normalize):
+        model = self.model_provider()
+        return model.encode(list(texts), batch_size=self.batch_size, normalize_embeddings=normalize)
+
+    def embed_documents(self, texts):
+        """Doküman listesini vektörleştir"""
+        if self.store is None:
+            vectors = self._encode(texts, self.normalize_embeddings)
+        else:
+            vectors = encode_with_store(
+                self.store, self.model_id, self.revision, texts,
+                lambda missing: self._encode(missing, False)
+            )
+            if self.normalize_embeddings:
+                vectors = normalize_rows(vectors)
+        return [vector.tolist() for vector in vectors]
+
+    def embed_query(self, text):
+        """Tek bir sorguyu vektörleştir (sorgular depoya yazılmaz)"""
+        return self._encode([text], self.normalize_embeddings)[0].tolist()
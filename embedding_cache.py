@@ -0,0 +1,120 @@
+# embedding_cache.py - Sorgu vektörleri için model bazlı LRU önbellek
+
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+
+def normalize_query(text):
+    """Sorgu metnini önbellek anahtarı olarak kullanılacak şekilde normalize et"""
+    return " ".join(str(text).split())
+
+
+class QueryEmbeddingCache:
+    """Her model için ayrı, boyutu sınırlı ve thread-safe sorgu vektörü önbelleği.
+
+    Vektörler normalize edilmiş sorgu metni ile anahtarlanır. Bir model id'si
+    farklı bir model nesnesiyle kullanılırsa (model yeniden yüklendiğinde)
+    o modelin önbelleği otomatik olarak boşaltılır.
+    """
+
+    def __init__(self, max_entries_per_model=1024):
+        self.max_entries_per_model = max(0, int(max_entries_per_model))
+        self._lock = threading.Lock()
+        self._entries = {}   # model_id -> OrderedDict(sorgu -> np.ndarray)
+        self._owners = {}    # model_id -> weakref(model)
+        self._hits = {}
+        self._misses = {}
+        self._evictions = {}
+
+    def _model_cache(self, model_id, model):
+        """Model önbelleğini döndür, model nesnesi değiştiyse sıfırla (kilit altında çağrılır)"""
+        owner = self._owners.get(model_id)
+        if owner is None or owner() is not model:
+            self._entries[model_id] = OrderedDict()
+            self._owners[model_id] = weakref.ref(model)
+        return self._entries[model_id]
+
+    def encode(self, model_id, model, queries, encode_fn, store=True):
+        """Sorguları önbellekten getir, eksik olanları tek bir encode çağrısıyla hesapla.
+
+        Dönüş değeri, sorgularla aynı sırada float32 numpy vektörlerinden oluşan listedir.
+        store=False ile yeni hesaplanan vektörler önbelleğe yazılmaz (toplu işler
+        sık kullanılan sorguları önbellekten atmasın diye).
+        """
+        keys = [normalize_query(q) for q in queries]
+        vectors = [None] * len(keys)
+
+        with self._lock:
+            cache = self._model_cache(model_id, model)
+            for i, key in enumerate(keys):
+                vector = cache.get(key)
+                if vector is not None:
+                    cache.move_to_end(key)
+                    vectors[i] = vector
+            hits = sum(1 for v in vectors if v is not None)
+            self._hits[model_id] = self._hits.get(model_id, 0) + hits
+            self._misses[model_id] = self._misses.get(model_id, 0) + len(keys) - hits
+
+        # Eksik sorguları (tekrarsız) kilit dışında vektörleştir
+        missing = list(dict.fromkeys(key for key, v in zip(keys, vectors) if v is None))
+        if not missing:
+            return vectors
+
+        encoded = np.asarray(encode_fn(missing), dtype=np.float32)
+        computed = {}
+        for key, vector in zip(missing, encoded):
+            vector = np.array(vector, dtype=np.float32)
+            vector.flags.writeable = False
+            computed[key] = vector
+
+        with self._lock:
+            cache = self._model_cache(model_id, model)
+            if store and self.max_entries_per_model > 0:
+                for key, vector in computed.items():
+                    cache[key] = vector
+                    cache.move_to_end(key)
+                while len(cache) > self.max_entries_per_model:
+                    cache.popitem(last=False)
+                    self._evictions[model_id] = self._evictions.get(model_id, 0) + 1
+
+        return [v if v is not None else computed[key] for key, v in zip(keys, vectors)]
+
+    def invalidate(self, model_id=None):
+        """Belirtilen modelin (veya tüm modellerin) önbelleğini temizle"""
+        with self._lock:
+            model_ids = [model_id] if model_id is not None else list(self._entries.keys())
+            for mid in model_ids:
+                self._entries.pop(mid, None)
+                self._owners.pop(mid, None)
+
+    def retain(self, model_ids):
+        """Sadece verilen modellere ait önbellekleri tut"""
+        with self._lock:
+            for mid in list(self._entries.keys()):
+                if mid not in model_ids:
+                    self._entries.pop(mid, None)
+                    self._owners.pop(mid, None)
+
+    def stats(self):
+        """Model bazlı önbellek istatistiklerini döndür"""
+        with self._lock:
+            model_ids = set(self._entries) | set(self._hits) | set(self._misses)
+            per_model = {}
+            for mid in sorted(model_ids):
+                hits = self._hits.get(mid, 0)
+                misses = self._misses.get(mid, 0)
+                total = hits + misses
+                per_model[mid] = {
+                    'entries': len(self._entries.get(mid, ())),
+                    'hits': hits,
+                    'misses': misses,
+                    'evictions': self._evictions.get(mid, 0),
+                    'hit_ratio': round(hits / total, 4) if total else 0.0
+                }
+            return {
+                'max_entries_per_model': self.max_entries_per_model,
+                'models': per_model
+            }
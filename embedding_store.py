@@ -0,0 +1,273 @@
+# embedding_store.py - (model, revizyon, metin hash) anahtarlı kalıcı disk üstü embedding deposu
+
+import hashlib
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_STORE_DIR = "embedding_store"
+
+
+def text_key(text):
+    """Metnin depo anahtarı (sha1)"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def model_revision(model_name, precision="fp32", max_seq_length=None):
+    """Model revizyonu: yerel HuggingFace önbelleğindeki commit hash'i, çıkarım hassasiyeti ve kesme uzunluğu.
+
+    Model yüklenmeden hesaplanır; böylece tüm vektörler depoda varsa model hiç yüklenmez.
+    Önbellekte ref bulunamazsa (yerel klasör, çevrimdışı kurulum) "main" kullanılır.
+    """
+    commit = "main"
+    hub_cache = os.environ.get("HF_HUB_CACHE") or os.path.join(
+        os.environ.get("HF_HOME", os.path.join(os.path.expanduser("~"), ".cache", "huggingface")), "hub"
+    )
+    ref_path = os.path.join(hub_cache, "models--" + model_name.replace("/", "--"), "refs", "main")
+    try:
+        with open(ref_path, "r") as f:
+            commit = f.read().strip()[:12] or commit
+    except OSError:
+        pass
+    revision = f"{commit}-{precision or 'fp32'}"
+    # Farklı kesme uzunluğu uzun metinlerde farklı vektör üretir
+    return f"{revision}-len{max_seq_length}" if max_seq_length else revision
+
+
+@contextmanager
+def namespace_file_lock(path):
+    """Namespace klasörü için süreçler arası özel kilit (app.py ve rebuild_database.py aynı depoya yazabilir)"""
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, ".lock"), "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class EmbeddingStore:
+    """Ham (normalize edilmemiş) float32 vektörleri model/revizyon bazında saklayan ekleme-tabanlı depo.
+
+    Her (model_id, revizyon) için bir klasör tutulur:
+      vectors.f32 - satır satır float32 vektörler (memory-mapped okunur)
+      keys.txt    - her satırın metin hash'i (satır numarası = vektör satırı)
+      meta.json   - vektör boyutu
+    Önce vektörler, sonra anahtarlar yazılır; yarıda kalan bir yazma açılışta kırpılır.
+    Eklemeler dosya kilidi altında yapılır ve satır numarası her seferinde diskteki
+    vectors.f32 boyutundan alınır; böylece aynı depoya yazan süreçler birbirinin
+    satırlarını kaydırmaz.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._namespaces = {}  # (model_id, revision) -> {'path', 'dim', 'keys', 'rows', 'keys_size', 'memmap'}
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+
+    def _namespace_path(self, model_id, revision):
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", f"{model_id}@{revision}")
+        return os.path.join(self.root, safe)
+
+    def _open(self, model_id, revision):
+        """Namespace'i diskten yükle (kilit altında çağrılır)"""
+        key = (model_id, revision)
+        namespace = self._namespaces.get(key)
+        if namespace is not None:
+            return namespace
+
+        path = self._namespace_path(model_id, revision)
+        namespace = {'path': path, 'dim': None, 'keys': {}, 'rows': 0, 'keys_size': 0, 'memmap': None}
+        if os.path.exists(os.path.join(path, "meta.json")):
+            with namespace_file_lock(path):
+                self._sync(namespace)
+
+        self._namespaces[key] = namespace
+        return namespace
+
+    def _sync(self, namespace):
+        """Disk durumunu (başka süreçlerin eklemeleri dahil) yeniden oku; dosya kilidi altında çağrılır"""
+        path = namespace['path']
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            return
+        with open(meta_path, "r", encoding="utf-8") as f:
+            namespace['dim'] = int(json.load(f)["dim"])
+
+        keys_path = os.path.join(path, "keys.txt")
+        vectors_path = os.path.join(path, "vectors.f32")
+        keys = []
+        if os.path.exists(keys_path):
+            with open(keys_path, "r", encoding="utf-8") as f:
+                keys = [line.strip() for line in f]
+        stored_rows = os.path.getsize(vectors_path) // (namespace['dim'] * 4) if os.path.exists(vectors_path) else 0
+
+        # Kesilmiş bir yazmadan kalan tutarsız kuyruğu at
+        rows = min(len(keys), stored_rows)
+        if rows != len(keys) or rows != stored_rows:
+            keys = keys[:rows]
+            with open(vectors_path, "ab") as f:
+                f.truncate(rows * namespace['dim'] * 4)
+            with open(keys_path, "w", encoding="utf-8") as f:
+                f.writelines(k + "\n" for k in keys)
+
+        namespace['keys'] = {k: row for row, k in enumerate(keys)}
+        namespace['rows'] = rows
+        namespace['keys_size'] = os.path.getsize(keys_path) if os.path.exists(keys_path) else 0
+        namespace['memmap'] = None
+
+    def _changed_on_disk(self, namespace):
+        """Başka bir süreç bu namespace'e yazdı mı (keys.txt boyutu değişti mi)"""
+        keys_path = os.path.join(namespace['path'], "keys.txt")
+        size = os.path.getsize(keys_path) if os.path.exists(keys_path) else 0
+        return size != namespace['keys_size']
+
+    def _matrix(self, namespace):
+        """Namespace vektörlerini memory-mapped matris olarak döndür"""
+        rows = namespace['rows']
+        if not rows:
+            return None
+        if namespace['memmap'] is None or namespace['memmap'].shape[0] != rows:
+            namespace['memmap'] = np.memmap(
+                os.path.join(namespace['path'], "vectors.f32"),
+                dtype=np.float32, mode="r", shape=(rows, namespace['dim'])
+            )
+        return namespace['memmap']
+
+    def get_many(self, model_id, revision, texts):
+        """Metinlerin vektörlerini döndür; depoda olmayanlar için None"""
+        with self._lock:
+            namespace = self._open(model_id, revision)
+            keys = [text_key(text) for text in texts]
+            rows = [namespace['keys'].get(key) for key in keys]
+            if None in rows and self._changed_on_disk(namespace):
+                # Eksikler başka bir sürecin eklediği satırlarda olabilir
+                with namespace_file_lock(namespace['path']):
+                    self._sync(namespace)
+                rows = [namespace['keys'].get(key) for key in keys]
+            found = [i for i, row in enumerate(rows) if row is not None]
+            result = [None] * len(texts)
+            if found:
+                matrix = self._matrix(namespace)
+                vectors = np.array(matrix[[rows[i] for i in found]], dtype=np.float32)
+                for position, i in enumerate(found):
+                    result[i] = vectors[position]
+            self._hits += len(found)
+            self._misses += len(texts) - len(found)
+            return result
+
+    def put_many(self, model_id, revision, texts, vectors):
+        """Yeni vektörleri depoya ekle (zaten olan anahtarlar atlanır)"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(texts):
+            return 0
+
+        with self._lock:
+            namespace = self._open(model_id, revision)
+            with namespace_file_lock(namespace['path']):
+                # Bu örnek yüklendikten sonra başka süreçlerin eklediği satırlar
+                self._sync(namespace)
+                if namespace['dim'] is None:
+                    namespace['dim'] = int(vectors.shape[1])
+                    with open(os.path.join(namespace['path'], "meta.json"), "w", encoding="utf-8") as f:
+                        json.dump({'model_id': model_id, 'revision': revision, 'dim': namespace['dim']}, f)
+                elif vectors.shape[1] != namespace['dim']:
+                    raise ValueError(f"Vektör boyutu uyumsuz: {vectors.shape[1]} != {namespace['dim']}")
+
+                new_keys, new_rows = [], []
+                seen = set()
+                for i, text in enumerate(texts):
+                    key = text_key(text)
+                    if key in namespace['keys'] or key in seen:
+                        continue
+                    seen.add(key)
+                    new_keys.append(key)
+                    new_rows.append(i)
+                if not new_keys:
+                    return 0
+
+                vectors_path = os.path.join(namespace['path'], "vectors.f32")
+                keys_path = os.path.join(namespace['path'], "keys.txt")
+                start = os.path.getsize(vectors_path) // (namespace['dim'] * 4) if os.path.exists(vectors_path) else 0
+                with open(vectors_path, "ab") as f:
+                    f.write(np.ascontiguousarray(vectors[new_rows]).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                with open(keys_path, "a", encoding="utf-8") as f:
+                    f.writelines(key + "\n" for key in new_keys)
+
+                for offset, key in enumerate(new_keys):
+                    namespace['keys'][key] = start + offset
+                namespace['rows'] = start + len(new_keys)
+                namespace['keys_size'] = os.path.getsize(keys_path)
+                namespace['memmap'] = None
+                self._writes += len(new_keys)
+                return len(new_keys)
+
+    def stats(self):
+        """Depo istatistiklerini döndür"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'root': self.root,
+                'namespaces': {
+                    f"{model_id}@{revision}": len(namespace['keys'])
+                    for (model_id, revision), namespace in self._namespaces.items()
+                },
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / total, 4) if total else 0.0,
+                'writes': self._writes
+            }
+
+
+def default_store():
+    """EMBEDDING_STORE_DIR ortam değişkenine göre depo (boş değer depoyu kapatır)"""
+    root = os.environ.get("EMBEDDING_STORE_DIR", DEFAULT_STORE_DIR)
+    return EmbeddingStore(root) if root else None
+
+
+def encode_with_store(store, model_id, revision, texts, encode_fn):
+    """Önce depoya bak, sadece eksik metinleri encode_fn ile encode edip depoya yaz.
+
+    encode_fn ham (normalize edilmemiş) vektörler döndürmelidir; sonuç girişle
+    aynı sırada float32 matristir.
+    """
+    texts = list(texts)
+    if store is None:
+        return np.asarray(encode_fn(texts), dtype=np.float32)
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    vectors = store.get_many(model_id, revision, texts)
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if missing:
+        unique = list(dict.fromkeys(texts[i] for i in missing))
+        encoded = np.asarray(encode_fn(unique), dtype=np.float32)
+        store.put_many(model_id, revision, unique, encoded)
+        by_text = dict(zip(unique, encoded))
+        for i in missing:
+            vectors[i] = by_text[texts[i]]
+
+    print(f"   💾 Embedding deposu ({model_id}): {len(texts) - len(missing)} hazır, {len(missing)} encode edildi")
+    return np.vstack(vectors)
@@ -0,0 +1,158 @@
+# encoder_utils.py - Embedding modellerini yükleme, çıkarım hassasiyeti (fp32 / int8 / bf16) ve uzunluk kovalı encode yardımcıları
+
+import time
+
+import numpy as np
+
+PRECISIONS = ("fp32", "int8", "bf16")
+
+# Token uzunluğu kova sınırları ve kova başına token bütçesi (batch boyutu = bütçe / kova sınırı)
+LENGTH_BUCKETS = (16, 32, 64, 128, 256, 512)
+DEFAULT_TOKEN_BUDGET = 8192
+DEFAULT_MAX_BUCKET_BATCH = 256
+
+
+def parse_precision_config(value):
+    """Hassasiyet ayarını çözümle.
+
+    "int8" gibi tek bir değer tüm modellere uygulanır ("*" anahtarı),
+    "dbmdz_bert=int8,turkcell_roberta=bf16" ise model bazlı ayar verir.
+    """
+    config = {}
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "=" in part:
+            model_id, precision = (p.strip() for p in part.split("=", 1))
+        else:
+            model_id, precision = "*", part
+        precision = precision.lower()
+        if precision not in PRECISIONS:
+            raise ValueError(f"Geçersiz hassasiyet '{precision}' (seçenekler: {', '.join(PRECISIONS)})")
+        config[model_id] = precision
+    return config
+
+
+def precision_for(model_id, config):
+    """Model için ayarlanmış hassasiyeti döndür (varsayılan fp32)"""
+    return config.get(model_id, config.get("*", "fp32"))
+
+
+def parse_max_seq_length_config(value):
+    """max_seq_length ayarını çözümle: "128" tüm modellere, "dbmdz_bert=128,multilingual_mpnet=256" model bazlı"""
+    config = {}
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        model_id, length = (p.strip() for p in part.split("=", 1)) if "=" in part else ("*", part)
+        if not length.isdigit() or int(length) <= 0:
+            raise ValueError(f"Geçersiz max_seq_length '{length}'")
+        config[model_id] = int(length)
+    return config
+
+
+def max_seq_length_for(model_id, config):
+    """Model için ayarlanmış max_seq_length (ayar yoksa None: modelin kendi değeri)"""
+    return config.get(model_id, config.get("*"))
+
+
+def apply_precision(model, precision, inplace=True):
+    """Modeli istenen CPU çıkarım hassasiyetine çevir.
+
+    int8: Linear katmanlarına torch dynamic quantization uygulanır.
+    bf16: Ağırlıklar bfloat16'ya çevrilir.
+    """
+    if precision in (None, "fp32"):
+        return model
+
+    import torch
+
+    if precision == "int8":
+        return torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8, inplace=inplace
+        )
+    if precision == "bf16":
+        if not inplace:
+            import copy
+            model = copy.deepcopy(model)
+        return model.to(torch.bfloat16)
+    raise ValueError(f"Geçersiz hassasiyet: {precision}")
+
+
+def load_sentence_transformer(model_name, precision="fp32", device=None, max_seq_length=None):
+    """SentenceTransformer modelini yükle, hassasiyet ve max_seq_length ayarını uygula"""
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name, device=device)
+    if max_seq_length:
+        # Tokenizer girdileri bu uzunlukta keser; kısa veri setinde 512'ye kadar dolgu yapılmaz
+        model.max_seq_length = int(max_seq_length)
+    return apply_precision(model, precision)
+
+
+def token_lengths(model, texts):
+    """Metinlerin özel tokenlar dahil, max_seq_length ile kesilmiş token uzunlukları"""
+    encoded = model.tokenizer(
+        list(texts), add_special_tokens=True, truncation=True,
+        max_length=model.max_seq_length, return_attention_mask=False
+    )
+    return np.array([len(ids) for ids in encoded["input_ids"]], dtype=np.int64)
+
+
+def length_buckets(lengths, edges=LENGTH_BUCKETS, token_budget=DEFAULT_TOKEN_BUDGET,
+                   max_batch_size=DEFAULT_MAX_BUCKET_BATCH):
+    """Uzunlukları kovalara ayır: [(kova sınırı, batch boyutu, indeksler)] (kısa kovalar önce)"""
+    edges = sorted(edges)
+    bucket_ids = np.searchsorted(edges, lengths, side="left")
+    buckets = []
+    for bucket in np.unique(bucket_ids):
+        indices = np.nonzero(bucket_ids == bucket)[0]
+        edge = edges[bucket] if bucket < len(edges) else int(lengths[indices].max())
+        batch_size = int(max(1, min(max_batch_size, token_budget // edge)))
+        # Kova içinde de uzunluğa göre sırala, batch içi dolgu en aza insin
+        indices = indices[np.argsort(lengths[indices], kind="stable")]
+        buckets.append((int(edge), batch_size, indices))
+    return buckets
+
+
+def padded_token_count(lengths, batches):
+    """Verilen batch'lerde (indeks dizileri) dolgu dahil işlenen token sayısı"""
+    return int(sum(int(lengths[batch].max()) * len(batch) for batch in batches if len(batch)))
+
+
+def bucketed_encode(model, texts, token_budget=DEFAULT_TOKEN_BUDGET, max_batch_size=DEFAULT_MAX_BUCKET_BATCH,
+                    edges=LENGTH_BUCKETS, stats=None, **encode_kwargs):
+    """Metinleri token uzunluğu kovalarında, kovaya göre ayarlanmış batch boyutuyla encode et.
+
+    Sonuç girişle aynı sıradadır. stats sözlüğü verilirse tokenizasyon ve encode
+    süreleri ile gerçek/dolgu dahil token sayıları eklenir.
+    """
+    texts = list(texts)
+    stats = stats if stats is not None else {}
+    if not texts:
+        return np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+    started = time.perf_counter()
+    lengths = token_lengths(model, texts)
+    stats['tokenize_seconds'] = stats.get('tokenize_seconds', 0.0) + time.perf_counter() - started
+
+    vectors = None
+    padded_tokens = 0
+    started = time.perf_counter()
+    for edge, batch_size, indices in length_buckets(lengths, edges, token_budget, max_batch_size):
+        bucket_vectors = np.asarray(
+            model.encode([texts[i] for i in indices], batch_size=batch_size, **encode_kwargs),
+            dtype=np.float32
+        )
+        if vectors is None:
+            vectors = np.empty((len(texts), bucket_vectors.shape[1]), dtype=np.float32)
+        vectors[indices] = bucket_vectors
+        padded_tokens += padded_token_count(
+            lengths, [indices[i:i + batch_size] for i in range(0, len(indices), batch_size)]
+        )
+    stats['encode_seconds'] = stats.get('encode_seconds', 0.0) + time.perf_counter() - started
+    stats['tokens'] = stats.get('tokens', 0) + int(lengths.sum())
+    stats['padded_tokens'] = stats.get('padded_tokens', 0) + padded_tokens
+    return vectors
@@ -0,0 +1,67 @@
+# fanout.py - Model bazlı aramaları thread havuzunda paralel çalıştırma; süre sınırı görev başladığında işler
+
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+# Henüz başlamamış görevler varken başlangıçlarını fark etmek için bekleme aralığı (saniye)
+START_POLL_SECONDS = 0.005
+
+
+def run_fanout(executor, calls, timeout=None, queue_timeout=None):
+    """calls sözlüğündeki {anahtar: (fonksiyon, argümanlar)} çağrılarını havuzda paralel çalıştır.
+
+    timeout her görev için çalışmaya başladığı andan itibaren sayılır; havuz kuyruğunda
+    beklenen süre görevin süresine eklenmez. queue_timeout verilirse o süre içinde
+    başlayamayan görevler iptal edilir. Hata veren görevlerin istisnaları ayrı döner.
+    Sonuç: (sonuçlar, süresi aşanlar, kuyrukta kalanlar, {anahtar: istisna}).
+    """
+    started_at = {}
+
+    def run(key, fn, args):
+        started_at[key] = time.monotonic()
+        return fn(*args)
+
+    submitted = time.monotonic()
+    futures = {executor.submit(run, key, fn, args): key for key, (fn, args) in calls.items()}
+    pending = set(futures)
+    results, timed_out, queue_expired, errors = {}, [], [], {}
+
+    while pending:
+        now = time.monotonic()
+        deadlines = []
+        waiting_to_start = False
+        for future in list(pending):
+            key = futures[future]
+            if future.done():
+                continue
+            start = started_at.get(key)
+            if start is not None:
+                if timeout is None:
+                    continue
+                if now >= start + timeout:
+                    # Çalışan görev durdurulamaz; yanıt onu beklemeden döner
+                    pending.discard(future)
+                    timed_out.append(key)
+                else:
+                    deadlines.append(start + timeout)
+            elif queue_timeout is not None and now >= submitted + queue_timeout and future.cancel():
+                pending.discard(future)
+                queue_expired.append(key)
+            else:
+                waiting_to_start = True
+                if queue_timeout is not None:
+                    deadlines.append(submitted + queue_timeout)
+
+        if not pending:
+            break
+        wake = min(deadlines) - now if deadlines else None
+        if waiting_to_start:
+            wake = START_POLL_SECONDS if wake is None else min(wake, START_POLL_SECONDS)
+        done, pending = wait(pending, timeout=None if wake is None else max(0.0, wake), return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is not None:
+                errors[futures[future]] = future.exception()
+            else:
+                results[futures[future]] = future.result()
+
+    return results, timed_out, queue_expired, errors
@@ -0,0 +1,94 @@
+# hnsw_config.py - Koleksiyon bazında ChromaDB HNSW parametreleri (M, construction_ef, search_ef)
+
+import fnmatch
+import json
+import os
+
+DEFAULT_HNSW_CONFIG_FILE = "hnsw_config.json"
+HNSW_KEYS = ("M", "construction_ef", "search_ef")
+# İndeks kurulurken sabitlenen parametreler; değişirse koleksiyon yeniden oluşturulmalıdır
+BUILD_KEYS = ("M", "construction_ef")
+# Koleksiyon configuration sözlüğündeki karşılıkları
+CONFIGURATION_KEYS = {"M": "max_neighbors", "construction_ef": "ef_construction", "search_ef": "ef_search"}
+
+
+def validate_params(params, source="hnsw"):
+    """Parametre adlarını ve pozitif tamsayı değerlerini doğrula"""
+    result = {}
+    for key, value in params.items():
+        if key not in HNSW_KEYS:
+            raise ValueError(f"{source}: bilinmeyen HNSW parametresi '{key}' (seçenekler: {', '.join(HNSW_KEYS)})")
+        value = int(value)
+        if value <= 0:
+            raise ValueError(f"{source}: {key} pozitif olmalı: {value}")
+        result[key] = value
+    return result
+
+
+def parse_hnsw_spec(spec):
+    """'M=32,construction_ef=200,search_ef=100' biçimindeki değerleri çözümle"""
+    params = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        key, _, value = item.partition("=")
+        params[key.strip()] = value.strip()
+    return validate_params(params, "--hnsw")
+
+
+def load_hnsw_config(path=None, overrides=None):
+    """Koleksiyon bazlı HNSW ayarlarını yükle.
+
+    Dosya biçimi: {"default": {...}, "<koleksiyon adı veya glob>": {...}}. Dosya yoksa
+    boş ayar döner (ChromaDB varsayılanları). overrides (ör. --hnsw) tüm koleksiyonlara
+    dosyadaki değerlerin üzerine uygulanır.
+    """
+    config = {}
+    path = path or DEFAULT_HNSW_CONFIG_FILE
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        for pattern, params in raw.items():
+            if pattern.startswith("_"):
+                continue  # "_comment" gibi açıklama alanları
+            config[pattern] = validate_params(params, f"{path}:{pattern}")
+    if overrides:
+        config["__override__"] = dict(overrides)
+    return config
+
+
+def hnsw_params_for(collection_name, config):
+    """Koleksiyonun HNSW parametreleri: default, eşleşen glob'lar (dosya sırasıyla), tam ad, override"""
+    params = dict(config.get("default", {}))
+    for pattern, values in config.items():
+        if pattern in ("default", "__override__", collection_name):
+            continue
+        if fnmatch.fnmatchcase(collection_name, pattern):
+            params.update(values)
+    params.update(config.get(collection_name, {}))
+    params.update(config.get("__override__", {}))
+    return params
+
+
+def hnsw_metadata(params):
+    """Parametreleri koleksiyon oluşturma metadata'sı anahtarlarına çevir (hnsw:M, ...)"""
+    return {f"hnsw:{key}": value for key, value in params.items()}
+
+
+def current_hnsw_params(collection):
+    """Koleksiyonun etkin HNSW parametreleri (configuration, yoksa metadata)"""
+    params = {}
+    try:
+        hnsw = (collection.configuration or {}).get("hnsw") or {}
+        params = {key: hnsw[name] for key, name in CONFIGURATION_KEYS.items() if hnsw.get(name) is not None}
+    except Exception:
+        pass
+    if not params:
+        metadata = collection.metadata or {}
+        params = {key: metadata[f"hnsw:{key}"] for key in HNSW_KEYS if f"hnsw:{key}" in metadata}
+    return params
+
+
+def set_search_ef(collection, search_ef):
+    """search_ef'i yeniden kurmadan değiştir (diğer parametreler oluşturulurken sabitlenir)"""
+    collection.modify(configuration={"hnsw": {"ef_search": int(search_ef)}})
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+🕸️ HNSW Tuning - ChromaDB HNSW ayarları için recall@k / gecikme ızgarası
+Her kelime_vektorleri_* / metin_vektorleri_* koleksiyonu için sorgu kümesinin kesin (NumPy)
+top-k sonuçlarını hesaplar, verilen M / construction_ef / search_ef ızgarasındaki her ayarla
+geçici bir kopya indeks kurup recall@k ve sorgu gecikmesini ölçer; hedef recall'u sağlayan
+en hızlı ayarı önerir ve isteğe bağlı olarak rebuild_database.py'nin HNSW ayar dosyasına yazar.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import fnmatch
+import argparse
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import chromadb
+
+from benchmark_search import latency_summary
+from build_report import collection_sizes_mb
+from bulk_loader import bulk_insert
+from db_paths import resolve_db_dir
+from encoder_utils import load_sentence_transformer
+from hnsw_config import DEFAULT_HNSW_CONFIG_FILE, hnsw_metadata, current_hnsw_params, set_search_ef
+from search_backends import normalize_rows
+
+# Desteklenen modellerin tanımı (rebuild_database.py ile aynı)
+SUPPORTED_MODELS = {
+    "dbmdz_bert": "dbmdz/bert-base-turkish-cased",
+    "turkcell_roberta": "TURKCELL/roberta-base-turkish-uncased",
+    "multilingual_mpnet": "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
+}
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+COLLECTION_PATTERNS = ("kelime_vektorleri_*", "metin_vektorleri_*")
+
+
+def load_collection(collection, page_size=5000):
+    """Koleksiyondaki tüm ID'leri, dokümanları ve vektörleri sayfa sayfa oku"""
+    ids, documents, vectors = [], [], []
+    offset = 0
+    while True:
+        page = collection.get(limit=page_size, offset=offset, include=["embeddings", "documents"])
+        if not page['ids']:
+            break
+        ids.extend(page['ids'])
+        documents.extend(page['documents'] or [None] * len(page['ids']))
+        vectors.append(np.asarray(page['embeddings'], dtype=np.float32))
+        offset += len(page['ids'])
+    matrix = np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+    return ids, documents, matrix
+
+
+def exact_top_k(matrix, queries, k, exclude_rows=None, block_size=64):
+    """Kosinüs benzerliğine göre kesin top-k satır indeksleri (exclude_rows: sorgu başına hariç satır)"""
+    matrix = normalize_rows(matrix)
+    queries = normalize_rows(queries)
+    result = np.empty((len(queries), k), dtype=np.int64)
+    for start in range(0, len(queries), block_size):
+        scores = queries[start:start + block_size] @ matrix.T
+        if exclude_rows is not None:
+            rows = np.arange(scores.shape[0])
+            scores[rows, exclude_rows[start:start + block_size]] = -np.inf
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+        result[start:start + block_size] = np.take_along_axis(top, order, axis=1)
+    return result
+
+
+def measure(collection, queries, truth_ids, k, exclude_ids=None, warmup=5):
+    """Her sorguyu tek tek çalıştırıp recall@k ve gecikmeyi ölç"""
+    extra = 1 if exclude_ids is not None else 0
+    for vector in queries[:warmup]:
+        collection.query(query_embeddings=vector[None, :], n_results=k + extra, include=[])
+
+    latencies, recalls = [], []
+    for i, vector in enumerate(queries):
+        started = time.perf_counter()
+        found = collection.query(query_embeddings=vector[None, :], n_results=k + extra, include=[])['ids'][0]
+        latencies.append((time.perf_counter() - started) * 1000)
+        if exclude_ids is not None:
+            found = [doc_id for doc_id in found if doc_id != exclude_ids[i]]
+        recalls.append(len(set(found[:k]) & truth_ids[i]) / k)
+
+    result = latency_summary(latencies)
+    result.update({
+        'recall_at_k': round(float(np.mean(recalls)), 4),
+        'min_recall_at_k': round(float(np.min(recalls)), 4)
+    })
+    return result
+
+
+def build_queries(collection_name, matrix, ids, args, encoded_queries=None):
+    """Sorgu vektörleri: --queries dosyası model ile encode edilir, yoksa koleksiyondan örneklenir
+    (örneklenen kayıt kendi sonuçlarından çıkarılır).
+
+    encoded_queries (model_id -> vektörler) verilirse model başına tek encode yapılır; aynı
+    modelin kelime ve cümle koleksiyonları aynı sorgu vektörlerini kullanır.
+    """
+    if args.queries:
+        model_id = collection_name.split("_vektorleri_", 1)[1]
+        if model_id not in SUPPORTED_MODELS:
+            raise ValueError(f"{collection_name} için model bilinmiyor; --queries kullanılamaz")
+        encoded_queries = encoded_queries if encoded_queries is not None else {}
+        if model_id not in encoded_queries:
+            with open(args.queries, "r", encoding="utf-8") as f:
+                texts = [line.strip() for line in f if line.strip()][:args.sample]
+            model = load_sentence_transformer(SUPPORTED_MODELS[model_id], device="cpu")
+            encoded_queries[model_id] = np.asarray(model.encode(texts), dtype=np.float32)
+            del model
+        return encoded_queries[model_id], None, None
+
+    rows = np.array(sorted(random.Random(args.seed).sample(range(len(ids)), min(args.sample, len(ids)))))
+    return matrix[rows], rows, [ids[row] for row in rows]
+
+
+def pick_recommendation(grid, target_recall):
+    """Hedef recall'u sağlayan en düşük p95 gecikmeli ayar; yoksa en yüksek recall"""
+    if not grid:
+        return None
+    passing = [row for row in grid if row['recall_at_k'] >= target_recall]
+    if passing:
+        return min(passing, key=lambda row: (row['p95_ms'], row['M'], row['construction_ef']))
+    return max(grid, key=lambda row: (row['recall_at_k'], -row['p95_ms']))
+
+
+def tune_collection(client, name, args, encoded_queries=None):
+    """Tek koleksiyon için mevcut ayarı ve ızgarayı ölç"""
+    print(f"\n🕸️  {name}")
+    collection = client.get_collection(name)
+    ids, documents, matrix = load_collection(collection)
+    if len(ids) <= args.k:
+        print(f"   ⚠️  Kayıt sayısı ({len(ids)}) k'dan küçük, atlanıyor")
+        return None
+
+    queries, exclude_rows, exclude_ids = build_queries(name, matrix, ids, args, encoded_queries)
+    started = time.perf_counter()
+    truth_rows = exact_top_k(matrix, queries, args.k, exclude_rows)
+    truth_ids = [{ids[row] for row in rows} for rows in truth_rows]
+    print(f"   📊 {len(ids)} kayıt, {len(queries)} sorgu, kesin top-{args.k}: {time.perf_counter() - started:.2f} s")
+
+    current = dict(current_hnsw_params(collection), **measure(collection, queries, truth_ids, args.k, exclude_ids))
+    print(f"   📌 Mevcut {current_hnsw_params(collection)}: recall@{args.k}={current['recall_at_k']} "
+          f"p50={current['p50_ms']}ms p95={current['p95_ms']}ms")
+
+    # Izgara geçici bir veritabanında kurulur; aktif veritabanına dokunulmaz
+    scratch_dir = tempfile.mkdtemp(prefix="hnsw_tuning_")
+    grid = []
+    try:
+        scratch = chromadb.PersistentClient(path=scratch_dir)
+        for m in args.m:
+            for construction_ef in args.construction_ef:
+                scratch_name = f"tune_M{m}_ef{construction_ef}"
+                params = {'M': m, 'construction_ef': construction_ef}
+                candidate = scratch.create_collection(
+                    name=scratch_name,
+                    metadata=dict({"hnsw:space": "cosine"}, **hnsw_metadata(params))
+                )
+                stats = bulk_insert(candidate, ids, documents, matrix, client=scratch, label=scratch_name)
+                index_size = collection_sizes_mb(scratch_dir).get(scratch_name)
+                for search_ef in args.search_ef:
+                    set_search_ef(candidate, search_ef)
+                    row = dict(params, search_ef=search_ef, build_seconds=stats['insert_seconds'], index_size_mb=index_size)
+                    row.update(measure(candidate, queries, truth_ids, args.k, exclude_ids))
+                    grid.append(row)
+                    print(f"   M={m:<3} construction_ef={construction_ef:<4} search_ef={search_ef:<4} "
+                          f"recall@{args.k}={row['recall_at_k']:<6} p50={row['p50_ms']}ms p95={row['p95_ms']}ms")
+                scratch.delete_collection(scratch_name)
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    recommended = pick_recommendation(grid, args.target_recall)
+    if recommended:
+        print(f"   ✅ Öneri: M={recommended['M']}, construction_ef={recommended['construction_ef']}, "
+              f"search_ef={recommended['search_ef']} (recall@{args.k}={recommended['recall_at_k']}, p95={recommended['p95_ms']}ms)")
+    return {
+        'records': len(ids),
+        'queries': len(queries),
+        'query_source': args.queries or 'collection_sample',
+        'current': current,
+        'grid': grid,
+        'recommended': recommended
+    }
+
+
+def write_config(path, results):
+    """Önerilen ayarları HNSW ayar dosyasına koleksiyon adıyla yaz (diğer anahtarlar korunur)"""
+    config = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    for name, result in results.items():
+        recommended = (result or {}).get('recommended')
+        if recommended:
+            config[name] = {key: recommended[key] for key in ('M', 'construction_ef', 'search_ef')}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def parse_args(argv=None):
+    """Komut satırı argümanlarını çözümle"""
+    parser = argparse.ArgumentParser(description="ChromaDB HNSW ayarları için recall@k / gecikme ızgarası")
+    parser.add_argument("--db", default=None, help="Veritabanı dizini (varsayılan: aktif build)")
+    parser.add_argument("--collections", nargs="+", default=list(COLLECTION_PATTERNS), help="Koleksiyon adları veya glob'ları")
+    parser.add_argument("--queries", help="Satır başına bir sorgu; model ile encode edilir (varsayılan: koleksiyondan örneklem)")
+    parser.add_argument("--sample", type=int, default=200, help="Sorgu sayısı")
+    parser.add_argument("-k", type=int, default=10, help="recall@k için k")
+    parser.add_argument("--m", type=int, nargs="+", default=[8, 16, 32], help="Denenecek M değerleri")
+    parser.add_argument("--construction-ef", type=int, nargs="+", default=[100, 200], help="Denenecek construction_ef değerleri")
+    parser.add_argument("--search-ef", type=int, nargs="+", default=[10, 25, 50, 100, 200], help="Denenecek search_ef değerleri")
+    parser.add_argument("--target-recall", type=float, default=0.95, help="Öneri için en düşük recall@k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="hnsw_tuning_report.json")
+    parser.add_argument("--write-config", nargs="?", const=DEFAULT_HNSW_CONFIG_FILE, default=None,
+                        help=f"Önerileri HNSW ayar dosyasına yaz (varsayılan yol: {DEFAULT_HNSW_CONFIG_FILE})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    db_path = args.db or resolve_db_dir(BASE_DIR)
+
+    print("🕸️  HNSW Tuning")
+    print("=" * 60)
+    print(f"💾 Veritabanı: {db_path}")
+
+    if not os.path.isdir(db_path):
+        print("❌ Veritabanı bulunamadı! Önce 'python rebuild_database.py' çalıştırın")
+        return False
+
+    client = chromadb.PersistentClient(path=db_path)
+    names = sorted(
+        collection.name if hasattr(collection, 'name') else str(collection)
+        for collection in client.list_collections()
+    )
+    names = [name for name in names if any(fnmatch.fnmatchcase(name, pattern) for pattern in args.collections)]
+    if not names:
+        print("❌ Eşleşen koleksiyon yok!")
+        return False
+    print(f"📚 Koleksiyonlar: {names}")
+    print(f"🔢 Izgara: M={args.m}, construction_ef={args.construction_ef}, search_ef={args.search_ef}, k={args.k}")
+
+    results = {}
+    encoded_queries = {}  # model_id -> --queries vektörleri (model başına bir kez yüklenir)
+    for name in names:
+        try:
+            results[name] = tune_collection(client, name, args, encoded_queries)
+        except Exception as e:
+            print(f"❌ {name} ölçülemedi: {e}")
+            results[name] = {'error': str(e)}
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'db_path': db_path,
+        'config': {
+            'k': args.k,
+            'sample': args.sample,
+            'queries_file': args.queries,
+            'm': args.m,
+            'construction_ef': args.construction_ef,
+            'search_ef': args.search_ef,
+            'target_recall': args.target_recall
+        },
+        'collections': results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Rapor kaydedildi: {args.output}")
+
+    if args.write_config:
+        print(f"📝 HNSW ayarları yazıldı: {write_config(args.write_config, results)} "
+              f"(uygulamak için: python rebuild_database.py --hnsw-config {args.write_config})")
+
+    return any(result and 'error' not in result for result in results.values())
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -1,21 +1,34 @@
 # langchain_arama.py
 
 import os
+import time
 import chromadb
 from langchain_community.vectorstores import Chroma
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain.schema import Document
 from sentence_transformers import SentenceTransformer
 
+from encoder_utils import apply_precision
+from embedding_adapters import SentenceTransformerEmbeddings
+from embedding_store import default_store, model_revision
+from db_paths import resolve_db_dir
+
 class TurkishSemanticSearch:
     """Langchain ve ChromaDB kullanarak Türkçe semantik arama sistemi"""
     
-    def __init__(self, db_path="./db"):
-        self.db_path = db_path
+    def __init__(self, db_path=None, precision=None):
+        # Varsayılan: db_builds/CURRENT işaretçisinin gösterdiği aktif build (yoksa eski db/ dizini)
+        self.db_path = db_path or resolve_db_dir(os.path.dirname(os.path.abspath(__file__)))
         self.embedding_model_name = "dbmdz/bert-base-turkish-cased"
+        # Çıkarım hassasiyeti: fp32 (varsayılan), int8 veya bf16
+        self.precision = precision or os.environ.get("LANGCHAIN_PRECISION", "fp32")
         self.embeddings = None
+        # Depolara eklenen dokümanlar için kalıcı embedding deposu kullanan adaptör
+        self.store_embeddings = None
         self.word_vectorstore = None
         self.sentence_vectorstore = None
+        # Aşama süresi bildirimi: fn(stage, search_type, seconds) (ör. metrik histogramı)
+        self.stage_observer = None
         self._setup_embeddings()
     
     def _setup_embeddings(self):
@@ -27,7 +40,15 @@ class TurkishSemanticSearch:
                 model_kwargs={'device': 'cpu'},
                 encode_kwargs={'normalize_embeddings': True}
             )
-            print("✅ Langchain embedding modeli hazırlandı")
+            self.embeddings.client = apply_precision(self.embeddings.client, self.precision)
+            self.store_embeddings = SentenceTransformerEmbeddings(
+                lambda: self.embeddings.client,
+                normalize_embeddings=True,
+                store=default_store(),
+                model_id="dbmdz_bert",
+                revision=model_revision(self.embedding_model_name, self.precision)
+            )
+            print(f"✅ Langchain embedding modeli hazırlandı ({self.precision})")
         except Exception as e:
             print(f"❌ Embedding modeli hatası: {e}")
             raise e
@@ -42,7 +63,7 @@ class TurkishSemanticSearch:
             self.word_vectorstore = Chroma(
                 client=client,
                 collection_name="kelime_vektorleri_langchain",
-                embedding_function=self.embeddings,
+                embedding_function=self.store_embeddings,
                 persist_directory=self.db_path
             )
             print("✅ Kelime vektör deposu hazır")
@@ -62,7 +83,7 @@ class TurkishSemanticSearch:
             self.sentence_vectorstore = Chroma(
                 client=client,
                 collection_name="metin_vektorleri_langchain",
-                embedding_function=self.embeddings,
+                embedding_function=self.store_embeddings,
                 persist_directory=self.db_path
             )
             print("✅ Cümle vektör deposu hazır")
@@ -131,6 +152,21 @@ class TurkishSemanticSearch:
             print(f"❌ Cümle ekleme hatası: {e}")
             return False
     
+    def _observe(self, stage, search_type, started):
+        """Aşama süresini stage_observer'a bildir ve bitiş zamanını döndür"""
+        finished = time.perf_counter()
+        if self.stage_observer:
+            self.stage_observer(stage, search_type, finished - started)
+        return finished
+    
+    def _similarity_search(self, vectorstore, query, k, search_type):
+        """Encode ve ChromaDB sorgusunu ayrı ölçerek similarity_search_with_score ile aynı sonucu döndür"""
+        started = time.perf_counter()
+        query_vector = self.store_embeddings.embed_query(query)
+        started = self._observe("encode", search_type, started)
+        results = vectorstore.similarity_search_by_vector_with_relevance_scores(query_vector, k=k)
+        return results, self._observe("query", search_type, started)
+    
     def search_words(self, query, k=5):
         """Kelimelerde arama yap"""
         if not self.word_vectorstore:
@@ -138,7 +174,7 @@ class TurkishSemanticSearch:
         
         try:
             # Similarity search
-            results = self.word_vectorstore.similarity_search_with_score(query, k=k)
+            results, started = self._similarity_search(self.word_vectorstore, query, k, "words")
             
             formatted_results = []
             for i, (doc, score) in enumerate(results):
@@ -154,6 +190,7 @@ class TurkishSemanticSearch:
                     'score': score
                 })
             
+            self._observe("format", "words", started)
             return formatted_results
             
         except Exception as e:
@@ -167,7 +204,7 @@ class TurkishSemanticSearch:
         
         try:
             # Similarity search
-            results = self.sentence_vectorstore.similarity_search_with_score(query, k=k)
+            results, started = self._similarity_search(self.sentence_vectorstore, query, k, "sentences")
             
             formatted_results = []
             for i, (doc, score) in enumerate(results):
@@ -183,6 +220,7 @@ class TurkishSemanticSearch:
                     'score': score
                 })
             
+            self._observe("format", "sentences", started)
             return formatted_results
             
         except Exception as e:
@@ -195,6 +233,7 @@ class TurkishSemanticSearch:
             'words_count': 0,
             'sentences_count': 0,
             'embedding_model': self.embedding_model_name,
+            'precision': self.precision,
             'db_path': self.db_path
         }
         
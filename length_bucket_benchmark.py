@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+📏 Length Bucket Benchmark - sabit batch ile uzunluk kovalı encode karşılaştırması
+Her model için metinler.txt üzerinde encode hızını (metin/s), dolgu dahil işlenen token
+sayısını ve iki yöntemin vektörleri arasındaki farkı ölçer.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+from encoder_utils import (DEFAULT_TOKEN_BUDGET, DEFAULT_MAX_BUCKET_BATCH, load_sentence_transformer,
+                           parse_max_seq_length_config, max_seq_length_for, token_lengths,
+                           padded_token_count, bucketed_encode)
+from search_backends import normalize_rows
+
+# Desteklenen modellerin tanımı (rebuild_database.py ile aynı)
+SUPPORTED_MODELS = {
+    "dbmdz_bert": "dbmdz/bert-base-turkish-cased",
+    "turkcell_roberta": "TURKCELL/roberta-base-turkish-uncased",
+    "multilingual_mpnet": "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
+}
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_texts(texts_file, sample_size, seed=42):
+    """Metinleri yükle; sample_size verilirse rastgele örneklem al (dosya sırası korunur)"""
+    with open(texts_file, "r", encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()]
+    if sample_size and sample_size < len(texts):
+        picked = sorted(random.Random(seed).sample(range(len(texts)), sample_size))
+        texts = [texts[i] for i in picked]
+    return texts
+
+
+def baseline_padded_tokens(texts, lengths, batch_size):
+    """Sabit batch'te dolgu: SentenceTransformer.encode'un karakter uzunluğuna göre sıraladığı batch'ler"""
+    order = np.argsort([-len(text) for text in texts], kind="stable")
+    return padded_token_count(lengths, [order[i:i + batch_size] for i in range(0, len(order), batch_size)])
+
+
+def benchmark_model(model_id, model_name, texts, batch_size, token_budget, max_bucket_batch, max_seq_length, repeats):
+    """Tek model için sabit batch ve uzunluk kovalı encode'u karşılaştır"""
+    print(f"\n🤖 {model_id} (max_seq_length={max_seq_length or 'varsayılan'})")
+    model = load_sentence_transformer(model_name, device="cpu", max_seq_length=max_seq_length)
+    lengths = token_lengths(model, texts)
+
+    # Isınma turu
+    model.encode(texts[:batch_size], batch_size=batch_size)
+
+    baseline_seconds, baseline_vectors = None, None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        baseline_vectors = model.encode(texts, batch_size=batch_size)
+        elapsed = time.perf_counter() - started
+        baseline_seconds = elapsed if baseline_seconds is None else min(baseline_seconds, elapsed)
+
+    bucketed_seconds, bucketed_vectors, stats = None, None, {}
+    for _ in range(repeats):
+        stats = {}
+        started = time.perf_counter()
+        bucketed_vectors = bucketed_encode(model, texts, token_budget, max_bucket_batch, stats=stats)
+        elapsed = time.perf_counter() - started
+        bucketed_seconds = elapsed if bucketed_seconds is None else min(bucketed_seconds, elapsed)
+
+    # Dolgu sonucu değiştirmemeli; kosinüs benzerliği 1'e çok yakın olmalı
+    cosine = np.sum(normalize_rows(baseline_vectors) * normalize_rows(bucketed_vectors), axis=1)
+    baseline_padded = baseline_padded_tokens(texts, lengths, batch_size)
+
+    result = {
+        'model_id': model_id,
+        'model_name': model_name,
+        'max_seq_length': int(model.max_seq_length),
+        'texts': len(texts),
+        'tokens': int(lengths.sum()),
+        'mean_tokens': round(float(lengths.mean()), 2),
+        'max_tokens': int(lengths.max()),
+        'baseline': {
+            'batch_size': batch_size,
+            'seconds': round(baseline_seconds, 3),
+            'texts_per_sec': round(len(texts) / baseline_seconds, 1),
+            'padded_tokens': baseline_padded,
+            'padding_ratio': round(baseline_padded / max(1, int(lengths.sum())), 3)
+        },
+        'bucketed': {
+            'token_budget': token_budget,
+            'max_batch_size': max_bucket_batch,
+            'seconds': round(bucketed_seconds, 3),
+            'tokenize_seconds': round(stats.get('tokenize_seconds', 0.0), 3),
+            'texts_per_sec': round(len(texts) / bucketed_seconds, 1),
+            'padded_tokens': stats.get('padded_tokens', 0),
+            'padding_ratio': round(stats.get('padded_tokens', 0) / max(1, stats.get('tokens', 1)), 3)
+        },
+        'speedup': round(baseline_seconds / bucketed_seconds, 3) if bucketed_seconds else None,
+        'min_cosine_vs_baseline': round(float(cosine.min()), 6)
+    }
+    print(f"   ⏱️  sabit batch: {result['baseline']['texts_per_sec']} metin/s "
+          f"(dolgu x{result['baseline']['padding_ratio']}), kovalı: {result['bucketed']['texts_per_sec']} metin/s "
+          f"(dolgu x{result['bucketed']['padding_ratio']}) -> x{result['speedup']}")
+    print(f"   🎯 En düşük kosinüs benzerliği: {result['min_cosine_vs_baseline']}")
+    return result
+
+
+def parse_args(argv=None):
+    """Komut satırı argümanlarını çözümle"""
+    parser = argparse.ArgumentParser(description="Uzunluk kovalı encode'un dolgu ve hız kazancını ölç")
+    parser.add_argument("--models", nargs="+", default=list(SUPPORTED_MODELS.keys()), choices=list(SUPPORTED_MODELS.keys()))
+    parser.add_argument("--texts", default=os.path.join(BASE_DIR, "metinler.txt"), help="Satır başına bir metin içeren dosya")
+    parser.add_argument("--sample", type=int, default=2000, help="Örneklenecek metin sayısı (0 = tümü)")
+    parser.add_argument("--batch-size", type=int, default=32, help="Karşılaştırma için sabit batch boyutu")
+    parser.add_argument("--token-budget", type=int, default=DEFAULT_TOKEN_BUDGET, help="Kova başına batch token bütçesi")
+    parser.add_argument("--max-bucket-batch", type=int, default=DEFAULT_MAX_BUCKET_BATCH)
+    parser.add_argument("--max-seq-length", default="", help="Tek değer veya 'dbmdz_bert=128,...'")
+    parser.add_argument("--repeats", type=int, default=2, help="Ölçüm tekrar sayısı (en iyisi alınır)")
+    parser.add_argument("--output", default="length_bucket_report.json")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    max_seq_config = parse_max_seq_length_config(args.max_seq_length)
+
+    print("📏 Length Bucket Benchmark")
+    print("=" * 60)
+
+    texts = load_texts(args.texts, args.sample)
+    if not texts:
+        print("❌ Metin bulunamadı!")
+        return False
+    print(f"📊 Metin sayısı: {len(texts)}, sabit batch: {args.batch_size}, token bütçesi: {args.token_budget}")
+
+    results = []
+    for model_id in args.models:
+        try:
+            results.append(benchmark_model(
+                model_id, SUPPORTED_MODELS[model_id], texts, args.batch_size, args.token_budget,
+                args.max_bucket_batch, max_seq_length_for(model_id, max_seq_config), args.repeats
+            ))
+        except Exception as e:
+            print(f"❌ {model_id} ölçülemedi: {e}")
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'texts_file': args.texts,
+        'text_count': len(texts),
+        'results': results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"\n💾 Rapor kaydedildi: {args.output}")
+    return bool(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+🚦 Load Test - app.py / app_langchain.py için kapalı döngü HTTP yük üreticisi
+/search, /qa, /hybrid_search ve /similar_words uç noktalarını ayarlanabilir eşzamanlılık,
+sorgu karışımı ve hedef istek/s ile çalıştırır; uç nokta bazında p50/p95/p99 gecikme,
+hata oranı ve zaman içindeki verimi JSON olarak yazar.
+
+--target verilirse çalışan bir sunucuya HTTP ile, verilmezse Flask test client ile
+süreç içinde istek gönderilir (ağ gerektirmeyen izole build makineleri için).
+
+Sorgu örneklemi istek sayısından küçükse ilk turdan sonra app.py'nin sonuç önbelleği
+yanıt verir; --cache bypass (no_cache bayrağı) veya --cache unique (istek başına
+benzersiz sorgu) ile önbelleksiz yol ölçülür. Önbellek isabet oranı raporlanır.
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import quote
+
+from benchmark_search import load_queries, latency_summary
+
+# Uç nokta adı -> (HTTP metodu, yol, gövde) üreten istek şablonları
+ENDPOINTS = {
+    'search_words': lambda q, args: ('POST', '/search', {'query': q, 'type': 'words', 'models': args.models, 'top_k': args.top_k}),
+    'search_sentences': lambda q, args: ('POST', '/search', {'query': q, 'type': 'sentences', 'models': args.models, 'top_k': args.top_k}),
+    'qa': lambda q, args: ('POST', '/qa', {'question': q}),
+    'hybrid_search': lambda q, args: ('POST', '/hybrid_search', {'query': q, 'top_k': args.top_k}),
+    'similar_words': lambda q, args: ('GET', f"/similar_words/{quote(q)}", None)
+}
+
+# Sorgu metni değiştirilebilen uç noktalar (--cache unique); similar_words kelime listesinde arar
+UNIQUE_QUERY_ENDPOINTS = ('search_words', 'search_sentences', 'qa', 'hybrid_search')
+CACHE_MODES = ('on', 'bypass', 'unique')
+
+# Uygulama bazında varsayılan karışım (uç nokta -> ağırlık)
+DEFAULT_MIX = {
+    'app': {'search_words': 4, 'search_sentences': 4, 'qa': 2},
+    'app_langchain': {'search_words': 3, 'search_sentences': 3, 'hybrid_search': 2, 'similar_words': 2}
+}
+
+
+def parse_weights(spec):
+    """'search_words=4,qa=1' biçimindeki ağırlıkları çözümle"""
+    weights = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Bilinmeyen uç nokta: {name}")
+        weights[name] = float(weight) if weight else 1.0
+    return weights
+
+
+def load_mix(mix_file, weights, queries, total, seed=42):
+    """İstek karışımı: [(uç nokta, sorgu), ...].
+
+    mix_file satırları 'uç_nokta|sorgu' biçimindedir ve dosyadaki sırayla döngüsel kullanılır;
+    dosya yoksa sorgular ağırlıklara göre rastgele uç noktalara dağıtılır.
+    """
+    if mix_file:
+        mix = []
+        with open(mix_file, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                endpoint, _, query = line.partition("|")
+                endpoint = endpoint.strip()
+                if endpoint not in ENDPOINTS or not query.strip():
+                    print(f"⚠️  Geçersiz karışım satırı atlandı: {line}")
+                    continue
+                mix.append((endpoint, query.strip()))
+        return mix
+
+    rng = random.Random(seed)
+    names = list(weights.keys())
+    picks = rng.choices(names, weights=[weights[name] for name in names], k=total)
+    return [(name, queries[i % len(queries)]) for i, name in enumerate(picks)]
+
+
+class HttpTransport:
+    """Çalışan bir sunucuya requests ile istek gönderir (thread başına bir Session)"""
+
+    def __init__(self, base_url, timeout):
+        import requests
+        self.requests = requests
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def send(self, method, path, payload):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = self.requests.Session()
+        response = session.request(method, self.base_url + path, json=payload, timeout=self.timeout)
+        body = response.json() if response.headers.get("Content-Type", "").startswith("application/json") else None
+        return response.status_code, body
+
+
+class TestClientTransport:
+    """Flask test client ile süreç içinde istek gönderir (ağ gerekmez)"""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.local = threading.local()
+
+    def send(self, method, path, payload):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.flask_app.test_client()
+        response = client.open(path, method=method, json=payload)
+        return response.status_code, response.get_json(silent=True)
+
+
+def load_app(app_name):
+    """Test client için uygulamayı içe aktarıp verilerini yükle"""
+    if app_name == "app":
+        import app as app_module
+        return app_module.app if app_module.load_data() else None
+    import app_langchain as app_module
+    return app_module.app if app_module.init_search_system() else None
+
+
+def build_request(endpoint, query, index, args):
+    """İstek şablonunu --cache moduna göre doldur"""
+    if args.cache == 'unique' and endpoint in UNIQUE_QUERY_ENDPOINTS:
+        # Normalize edilmiş önbellek anahtarı her istekte farklı olsun
+        query = f"{query} {index}"
+    method, path, payload = ENDPOINTS[endpoint](query, args)
+    if args.cache == 'bypass' and path == '/search':
+        payload = dict(payload, no_cache=True)
+    return method, path, payload
+
+
+def run_load(transport, mix, args):
+    """Kapalı döngü: concurrency kadar worker, her biri yanıt gelince sıradaki isteği gönderir.
+
+    rps verilirse istekler start + i / rps zaman dilimlerine yerleştirilir; geride kalan
+    worker beklemeden devam eder (toplam hız hedefi aşmaz).
+    """
+    records = []  # (bitiş saniyesi, uç nokta, gecikme ms, başarılı mı, önbellekten mi / None)
+    error_samples = defaultdict(list)
+    counter = [0]
+    lock = threading.Lock()
+    started = time.perf_counter()
+    deadline = started + args.duration if args.duration else None
+
+    def worker():
+        while True:
+            with lock:
+                index = counter[0]
+                if args.requests and index >= args.requests:
+                    return
+                counter[0] += 1
+            if args.rps:
+                delay = started + index / args.rps - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            if deadline and time.perf_counter() >= deadline:
+                return
+
+            endpoint, query = mix[index % len(mix)]
+            method, path, payload = build_request(endpoint, query, index, args)
+            request_started = time.perf_counter()
+            cached = None
+            try:
+                status, body = transport.send(method, path, payload)
+                if isinstance(body, dict) and 'cached' in body:
+                    cached = bool(body['cached'])
+                # Uygulamalar hataları 200 + {'error': ...} ile de döndürebilir
+                error = None if status == 200 and not (isinstance(body, dict) and body.get('error')) else \
+                    f"HTTP {status}: {body.get('error') if isinstance(body, dict) else ''}"
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            finished = time.perf_counter()
+
+            with lock:
+                records.append((finished - started, endpoint, (finished - request_started) * 1000, error is None, cached))
+                if error and len(error_samples[endpoint]) < 5:
+                    error_samples[endpoint].append(error)
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for _ in range(args.concurrency):
+            pool.submit(worker)
+    wall = time.perf_counter() - started
+    return records, dict(error_samples), wall
+
+
+def summarize(records, error_samples, wall, interval):
+    """Uç nokta bazında gecikme/hata özeti ve interval saniyelik verim zaman çizelgesi"""
+    by_endpoint = defaultdict(list)
+    for record in records:
+        by_endpoint[record[1]].append(record)
+
+    def group_summary(group):
+        latencies = [latency for _, _, latency, ok, _ in group if ok]
+        errors = sum(1 for record in group if not record[3])
+        result = latency_summary(latencies)
+        result.update({
+            'requests': len(group),
+            'errors': errors,
+            'error_rate': round(errors / len(group), 4) if group else 0.0,
+            'rps': round(len(group) / wall, 2) if wall else 0.0
+        })
+        # Önbellek bilgisi döndüren yanıtlar (app.py /search): isabet oranı ve önbelleksiz gecikme
+        reported = [record for record in group if record[3] and record[4] is not None]
+        if reported:
+            hits = sum(1 for record in reported if record[4])
+            result['cache_hits'] = hits
+            result['cache_hit_rate'] = round(hits / len(reported), 4)
+            result['uncached'] = latency_summary([record[2] for record in reported if not record[4]])
+        return result
+
+    endpoints = {}
+    for endpoint, group in sorted(by_endpoint.items()):
+        endpoints[endpoint] = group_summary(group)
+        if endpoint in error_samples:
+            endpoints[endpoint]['error_samples'] = error_samples[endpoint]
+
+    buckets = defaultdict(list)
+    for record in records:
+        buckets[int(record[0] // interval)].append(record)
+    timeline = []
+    for bucket in range(int(wall // interval) + 1):
+        group = buckets.get(bucket, [])
+        latencies = [latency for _, _, latency, ok, _ in group if ok]
+        timeline.append({
+            'second': round(bucket * interval, 3),
+            'requests': len(group),
+            'errors': sum(1 for record in group if not record[3]),
+            'rps': round(len(group) / interval, 2),
+            'p95_ms': latency_summary(latencies).get('p95_ms')
+        })
+
+    total = group_summary(records)
+    total['wall_seconds'] = round(wall, 3)
+    return {'total': total, 'endpoints': endpoints, 'timeline': timeline}
+
+
+def parse_args(argv=None):
+    """Komut satırı argümanlarını çözümle"""
+    parser = argparse.ArgumentParser(description="app.py / app_langchain.py için kapalı döngü yük testi")
+    parser.add_argument("--app", choices=list(DEFAULT_MIX.keys()), default="app",
+                        help="Hedef uygulama (varsayılan karışımı ve test client'ı belirler)")
+    parser.add_argument("--target", help="Çalışan sunucu adresi (ör. http://127.0.0.1:5001); verilmezse Flask test client")
+    parser.add_argument("--concurrency", type=int, default=8, help="Eşzamanlı worker sayısı")
+    parser.add_argument("--rps", type=float, default=0.0, help="Hedef toplam istek/s (0 = sınırsız)")
+    parser.add_argument("--requests", type=int, default=500, help="Toplam istek sayısı (0 = sadece --duration)")
+    parser.add_argument("--duration", type=float, default=0.0, help="En uzun süre (saniye, 0 = sınırsız)")
+    parser.add_argument("--mix", help="'uç_nokta|sorgu' satırlarından oluşan karışım dosyası")
+    parser.add_argument("--weights", default="", help="Dosya yoksa uç nokta ağırlıkları, ör. 'search_words=4,qa=1'")
+    parser.add_argument("--queries", help="Satır başına bir sorgu içeren dosya (varsayılan: veri setinden örneklem)")
+    parser.add_argument("--sample", type=int, default=200, help="Örneklenecek sorgu sayısı")
+    parser.add_argument("--models", nargs="+", default=["dbmdz_bert"], help="/search isteklerindeki modeller")
+    parser.add_argument("-k", "--top-k", type=int, default=5)
+    parser.add_argument("--interval", type=float, default=1.0, help="Zaman çizelgesi aralığı (saniye)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="HTTP istek zaman aşımı (saniye)")
+    parser.add_argument("--warmup", type=int, default=5, help="Ölçüm öncesi ısınma isteği sayısı")
+    parser.add_argument("--cache", choices=CACHE_MODES, default="on",
+                        help="Sonuç önbelleği: on (olduğu gibi), bypass (/search isteklerine no_cache), "
+                             "unique (istek başına benzersiz sorgu; embedding önbelleği de atlanır)")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Bu oranın üzerinde hata varsa çıkış kodu 1")
+    parser.add_argument("--output", default="load_test_report.json")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.requests and not args.duration:
+        print("❌ --requests veya --duration verilmeli!")
+        return False
+
+    print("🚦 Load Test")
+    print("=" * 60)
+
+    try:
+        weights = parse_weights(args.weights) if args.weights else DEFAULT_MIX[args.app]
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+
+    queries = load_queries(args.queries, args.sample)
+    mix = load_mix(args.mix, weights, queries, max(args.requests, args.sample))
+    if not mix:
+        print("❌ İstek karışımı boş!")
+        return False
+
+    if args.target:
+        transport = HttpTransport(args.target, args.timeout)
+        print(f"🌐 Hedef: {args.target}")
+    else:
+        flask_app = load_app(args.app)
+        if flask_app is None:
+            print("❌ Uygulama yüklenemedi!")
+            return False
+        transport = TestClientTransport(flask_app)
+        print(f"🧪 Hedef: {args.app} (Flask test client)")
+
+    for i, (endpoint, query) in enumerate(mix[:args.warmup]):
+        try:
+            transport.send(*build_request(endpoint, query, f"w{i}", args))
+        except Exception as e:
+            print(f"⚠️  Isınma isteği başarısız ({endpoint}): {e}")
+
+    print(f"📊 Karışım: {len(mix)} istek, eşzamanlılık: {args.concurrency}, "
+          f"hedef: {args.rps or 'sınırsız'} istek/s, istek: {args.requests or '-'}, süre: {args.duration or '-'}s")
+
+    records, error_samples, wall = run_load(transport, mix, args)
+    summary = summarize(records, error_samples, wall, args.interval)
+
+    total = summary['total']
+    print(f"\n📈 Toplam: {total['requests']} istek, {total['rps']} istek/s, hata oranı: {total['error_rate']}")
+    for endpoint, result in summary['endpoints'].items():
+        cache = f" önbellek={result['cache_hit_rate']:.0%}" if 'cache_hit_rate' in result else ""
+        print(f"   {endpoint:<17} p50={result.get('p50_ms')}ms p95={result.get('p95_ms')}ms "
+              f"p99={result.get('p99_ms')}ms istek/s={result['rps']} hata={result['errors']}{cache}")
+    if total.get('cache_hit_rate', 0.0) > 0.5:
+        print(f"⚠️  Yanıtların {total['cache_hit_rate']:.0%}'i sonuç önbelleğinden geldi; gecikmeler çoğunlukla "
+              f"önbellek isabetidir (önbelleksiz yol için --cache bypass veya --cache unique)")
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'config': {
+            'app': args.app,
+            'target': args.target or 'test_client',
+            'concurrency': args.concurrency,
+            'rps': args.rps,
+            'requests': args.requests,
+            'duration': args.duration,
+            'mix_file': args.mix,
+            'weights': None if args.mix else weights,
+            'models': args.models,
+            'top_k': args.top_k,
+            'cache': args.cache
+        }
+    }
+    report.update(summary)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Rapor kaydedildi: {args.output}")
+
+    if total['error_rate'] > args.max_error_rate:
+        print(f"⚠️  Hata oranı eşiği aşıldı: {total['error_rate']} > {args.max_error_rate}")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
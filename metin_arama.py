@@ -1,9 +1,13 @@
 # metin_arama.py
-import numpy as np
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+import os
 import sys
 
+from search_backends import DEFAULT_BLOCK_ROWS, MappedVectorIndex, normalize_rows
+
+# Skorlama blok boyutu (satır); büyük korpuslarda bellek kullanımını sınırlar
+BLOCK_ROWS = int(os.environ.get("METIN_ARAMA_BLOCK_ROWS", DEFAULT_BLOCK_ROWS))
+
 # -------------------------------
 # Model ve Veriler
 # -------------------------------
@@ -20,9 +24,9 @@ def load_model_and_data():
         with open("metinler.txt", "r", encoding="utf-8") as f:
             metinler = [line.strip() for line in f if line.strip()]
         
-        # Vektörleri yükleme
-        print("🔢 Metin vektörleri yükleniyor...")
-        metin_vektorleri = np.load("metin_vektorleri.npy")
+        # Vektörleri yükleme: normalize kopya bir kez üretilir, sonra mmap ile açılır
+        print("🔢 Metin vektörleri yükleniyor (mmap)...")
+        metin_vektorleri = MappedVectorIndex.open("metin_vektorleri.npy", block_rows=BLOCK_ROWS)
         
         print(f"✅ Yükleme tamamlandı!")
         print(f"📊 Toplam cümle sayısı: {len(metinler)}")
@@ -45,20 +49,21 @@ def search_similar_sentences(query, model, metinler, metin_vektorleri, top_k=5):
         print(f"🔍 '{query}' için arama yapılıyor...")
         query_vector = model.encode([query])
         
-        # Benzerlik hesapla
-        similarities = cosine_similarity(query_vector, metin_vektorleri)[0]
+        # Bellekteki ham matris verilirse normalize edilip indekse sarılır
+        if not isinstance(metin_vektorleri, MappedVectorIndex):
+            metin_vektorleri = MappedVectorIndex(normalize_rows(metin_vektorleri), BLOCK_ROWS)
         
-        # En benzer cümleleri bul
-        top_indices = np.argsort(similarities)[::-1][:top_k]
+        # Blok blok benzerlik hesapla, en benzer cümleleri argpartition ile bul
+        scores, indices = metin_vektorleri.search(query_vector, top_k)
         
         results = []
-        for i, idx in enumerate(top_indices):
+        for i, (idx, similarity) in enumerate(zip(indices[0], scores[0])):
+            idx = int(idx)
             sentence = metinler[idx]
-            similarity = similarities[idx]
             results.append({
                 'rank': i + 1,
                 'sentence': sentence,
-                'similarity': similarity,
+                'similarity': float(similarity),
                 'index': idx
             })
         
@@ -0,0 +1,320 @@
+# metrics.py - Prometheus metin formatında (exposition 0.0.4) süreç içi metrikler ve Server-Timing başlıkları
+
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Gecikme histogramları için üst sınırlar (saniye)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    """Etiket değerini exposition formatına uygun kaçışla"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Etiket adları sabit, etiket değerleri bazında değer tutan metrik tabanı"""
+
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} etiketleri {self.labelnames} olmalı: {sorted(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """[(örnek adı, [(etiket, değer), ...], değer), ...]"""
+        with self._lock:
+            return [(self.name, list(zip(self.labelnames, key)), value) for key, value in sorted(self._values.items())]
+
+
+class Counter(_Metric):
+    """Yalnızca artan sayaç"""
+
+    kind = "counter"
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Anlık değer (artıp azalabilir)"""
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount=1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Kümülatif kovalı histogram (_bucket, _sum, _count örnekleri)"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][i] += 1
+                    break
+            else:
+                state['counts'][-1] += 1
+            state['sum'] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Blok süresini saniye cinsinden gözlemle"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        result = []
+        with self._lock:
+            items = sorted((key, dict(state, counts=list(state['counts']))) for key, state in self._values.items())
+        for key, state in items:
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state['counts']):
+                cumulative += count
+                result.append((f"{self.name}_bucket", labels + [("le", _format_value(float(bound)))], cumulative))
+            result.append((f"{self.name}_sum", labels, state['sum']))
+            result.append((f"{self.name}_count", labels, cumulative))
+        return result
+
+
+class MetricsRegistry:
+    """Metrikleri ve kazıma (scrape) anında çalışan toplayıcıları tutan kayıt defteri.
+
+    Toplayıcılar (name, kind, documentation, [(etiket sözlüğü, değer), ...]) demetleri
+    döndüren fonksiyonlardır; önbellek ve bellek gibi mevcut istatistikleri kopyalamadan
+    yayınlamak için kullanılır.
+    """
+
+    def __init__(self, prefix=""):
+        self.prefix = prefix
+        self._metrics = []
+        self._collectors = []
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self.prefix + name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(self.prefix + name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(self.prefix + name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+        return collector
+
+    def render(self):
+        """Tüm metrikleri metin exposition formatında döndür"""
+        lines = []
+
+        def family(name, kind, documentation, samples):
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+
+        for metric in self._metrics:
+            family(metric.name, metric.kind, metric.documentation, metric.samples())
+
+        for collector in self._collectors:
+            try:
+                for name, kind, documentation, values in collector():
+                    name = self.prefix + name
+                    family(name, kind, documentation,
+                           [(name, sorted(labels.items()), value) for labels, value in values if value is not None])
+            except Exception as e:
+                # Bozuk bir toplayıcı diğer metrikleri engellemesin
+                lines.append(f"# toplayıcı hatası: {_escape(e)}")
+        return "\n".join(lines) + "\n"
+
+
+class _TimedJSONProvider(DefaultJSONProvider):
+    """jsonify çağrılarının serileştirme süresini endpoint bazında ölçen JSON sağlayıcı"""
+
+    histogram = None
+
+    def response(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().response(*args, **kwargs)
+        finally:
+            endpoint = (request.endpoint or "unknown") if has_request_context() else "none"
+            self.histogram.observe(time.perf_counter() - started, endpoint=endpoint)
+
+
+def install_request_metrics(app, registry):
+    """Flask uygulamasına istek sayacı, gecikme histogramı, eşzamanlı istek ölçer,
+    JSON serileştirme süresi ve /metrics endpoint'i ekle"""
+    requests_total = registry.counter(
+        "http_requests_total", "Endpoint, metod ve durum koduna göre istek sayısı", ("endpoint", "method", "status"))
+    request_seconds = registry.histogram(
+        "http_request_duration_seconds", "Endpoint bazında istek süresi", ("endpoint", "method"))
+    in_flight = registry.gauge(
+        "http_requests_in_flight", "İşlenmekte olan istek sayısı", ("endpoint",))
+    serialize_seconds = registry.histogram(
+        "json_serialize_duration_seconds", "jsonify ile yanıt serileştirme süresi", ("endpoint",))
+
+    provider = _TimedJSONProvider(app)
+    provider.histogram = serialize_seconds
+    app.json = provider
+
+    @app.before_request
+    def _start_request_metrics():
+        request.environ['metrics.started'] = time.perf_counter()
+        in_flight.inc(endpoint=request.endpoint or "unknown")
+
+    @app.after_request
+    def _record_request_metrics(response):
+        started = request.environ.pop('metrics.started', None)
+        if started is not None:
+            endpoint = request.endpoint or "unknown"
+            in_flight.dec(endpoint=endpoint)
+            request_seconds.observe(time.perf_counter() - started, endpoint=endpoint, method=request.method)
+            requests_total.inc(endpoint=endpoint, method=request.method, status=str(response.status_code))
+        return response
+
+    @app.teardown_request
+    def _release_in_flight(error=None):
+        # after_request çalışmadan biten (yakalanmamış hata) istekler
+        if request.environ.pop('metrics.started', None) is not None:
+            endpoint = request.endpoint or "unknown"
+            in_flight.dec(endpoint=endpoint)
+            requests_total.inc(endpoint=endpoint, method=request.method, status="500")
+
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus metin formatında metrikler"""
+        return app.response_class(registry.render(), content_type=CONTENT_TYPE)
+
+    return registry
+
+
+def cache_collector(name, documentation, stats_fn, per_model=False):
+    """hits / misses / hit_ratio içeren bir stats() çıktısını metrik ailelerine çevir"""
+    def collect():
+        stats = stats_fn()
+        if stats is None:
+            return []
+        groups = stats['models'].items() if per_model else [(None, stats)]
+        rows = [({'model': model_id} if model_id else {}, values) for model_id, values in groups]
+        return [
+            (f"{name}_hits_total", "counter", f"{documentation} isabet sayısı",
+             [(labels, values.get('hits')) for labels, values in rows]),
+            (f"{name}_misses_total", "counter", f"{documentation} ıska sayısı",
+             [(labels, values.get('misses')) for labels, values in rows]),
+            (f"{name}_hit_ratio", "gauge", f"{documentation} isabet oranı",
+             [(labels, values.get('hit_ratio')) for labels, values in rows])
+        ]
+    return collect
+
+
+def memory_collector(model_manager):
+    """Model bazlı tahmini bellek ve süreç RSS ölçerleri"""
+    def collect():
+        stats = model_manager.stats()
+        return [
+            ("model_memory_megabytes", "gauge", "Yüklü modelin tahmini parametre belleği (MB)",
+             [({'model': model_id}, size) for model_id, size in stats['model_memory_mb'].items()]),
+            ("models_resident", "gauge", "Bellekte yüklü model sayısı",
+             [({}, len(stats['resident_models']))]),
+            ("process_resident_memory_megabytes", "gauge", "Sürecin anlık RSS değeri (MB)",
+             [({}, stats['process_rss_mb'])]),
+            ("process_peak_resident_memory_megabytes", "gauge", "Sürecin en yüksek RSS değeri (MB)",
+             [({}, stats['process_peak_rss_mb'])])
+        ]
+    return collect
+
+
+def server_timing_header(stage_timings, total_ms=None):
+    """{grup: {aşama: ms}} sözlüğünü Server-Timing başlığına çevir (ör. 'dbmdz_bert.encode;dur=12.3')"""
+    entries = [
+        f"{group}.{stage};dur={ms}"
+        for group, stages in list(stage_timings.items())
+        for stage, ms in list(stages.items())
+    ]
+    if total_ms is not None:
+        entries.append(f"total;dur={total_ms}")
+    return ", ".join(entries)
+
+
+def debug_requested(data=None):
+    """İstek gövdesinde ('debug': true) veya sorgu dizesinde (?debug=1) debug bayrağı var mı"""
+    if request.args.get("debug", "").lower() in ("1", "true", "yes"):
+        return True
+    return isinstance(data, dict) and data.get("debug") in (True, 1, "1", "true")
+
+
+def elapsed_ms(started):
+    """perf_counter başlangıcından bu yana geçen süre (ms)"""
+    return round((time.perf_counter() - started) * 1000, 3)
+
+
+def install_server_timing(app):
+    """Her yanıta Server-Timing başlığı ekle: g.stage_timings'teki aşamalar ve toplam süre"""
+    @app.before_request
+    def _start_server_timing():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _add_server_timing(response):
+        started = g.get('request_started')
+        if started is not None:
+            response.headers['Server-Timing'] = server_timing_header(g.get('stage_timings') or {}, elapsed_ms(started))
+        return response
@@ -0,0 +1,189 @@
+# micro_batcher.py - Eşzamanlı encode isteklerini birleştiren dinamik mikro-batch zamanlayıcısı
+
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Batch boyutu histogramı için üst sınırlar (Prometheus tarzı "le" kovaları)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+# Kuyrukta bekleme süresi histogramı için üst sınırlar (milisaniye)
+WAIT_MS_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250)
+
+
+class BatcherClosedError(RuntimeError):
+    """Kapatılmış zamanlayıcıya istek gönderildi (model çıkarıldı veya yenilendi)"""
+
+
+class _PendingRequest:
+    """Kuyrukta bekleyen tek bir encode isteği"""
+
+    __slots__ = ("texts", "enqueued_at", "done", "vectors", "error")
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.vectors = None
+        self.error = None
+
+
+class MicroBatcher:
+    """Bir model için gelen sorguları birkaç milisaniye biriktirip tek encode çağrısında işler.
+
+    İlk istek kuyruğa girdikten sonra en fazla max_wait_ms beklenir veya
+    max_batch_size metin toplanınca batch hemen çalıştırılır. Her çağıran
+    kendi sorgularının vektörlerini aynı sırada geri alır.
+    """
+
+    def __init__(self, name, encode_fn, max_batch_size=32, max_wait_ms=5.0):
+        self.name = name
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._queue = deque()
+        self._queued_texts = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name=f"microbatch-{name}", daemon=True)
+        self._worker.start()
+
+        # Metrikler
+        self._batches = 0
+        self._batched_texts = 0
+        self._max_queue_depth = 0
+        self._batch_size_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self._wait_counts = [0] * (len(WAIT_MS_BUCKETS) + 1)
+        self._wait_sum_ms = 0.0
+        self._wait_max_ms = 0.0
+        self._encode_sum_ms = 0.0
+
+    def submit(self, texts):
+        """Metinleri kuyruğa ekle ve vektörler hazır olana kadar bekle"""
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        # Zaten yeterince büyük istekler doğrudan encode edilir
+        if len(texts) >= self.max_batch_size:
+            return self.encode_fn(texts)
+
+        request = _PendingRequest(texts)
+        with self._cond:
+            if self._closed:
+                raise BatcherClosedError(f"Mikro-batch zamanlayıcısı kapatıldı: {self.name}")
+            self._queue.append(request)
+            self._queued_texts += len(texts)
+            self._max_queue_depth = max(self._max_queue_depth, self._queued_texts)
+            self._cond.notify()
+
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.vectors
+
+    def _collect_batch(self):
+        """Süre veya boyut sınırına ulaşılana kadar istek topla (kilit altında çağrılır)"""
+        while not self._queue and not self._closed:
+            self._cond.wait()
+        if self._closed and not self._queue:
+            return None
+
+        deadline = self._queue[0].enqueued_at + self.max_wait
+        while self._queued_texts < self.max_batch_size and not self._closed:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            self._cond.wait(remaining)
+
+        batch = []
+        size = 0
+        while self._queue and (not batch or size + len(self._queue[0].texts) <= self.max_batch_size):
+            request = self._queue.popleft()
+            batch.append(request)
+            size += len(request.texts)
+        self._queued_texts -= size
+        return batch
+
+    def _run(self):
+        """Arka plan thread'i: batch topla, encode et, sonuçları dağıt"""
+        while True:
+            with self._cond:
+                batch = self._collect_batch()
+            if batch is None:
+                return
+
+            started = time.perf_counter()
+            texts = [text for request in batch for text in request.texts]
+            try:
+                vectors = np.asarray(self.encode_fn(texts))
+                error = None
+            except Exception as e:
+                vectors = None
+                error = e
+            finished = time.perf_counter()
+
+            offset = 0
+            for request in batch:
+                if error is None:
+                    request.vectors = vectors[offset:offset + len(request.texts)]
+                else:
+                    request.error = error
+                offset += len(request.texts)
+                request.done.set()
+
+            self._record(batch, len(texts), started, finished)
+
+    def _record(self, batch, size, started, finished):
+        """Batch boyutu ve bekleme süresi metriklerini güncelle"""
+        with self._cond:
+            self._batches += 1
+            self._batched_texts += size
+            self._batch_size_counts[_bucket_index(BATCH_SIZE_BUCKETS, size)] += 1
+            self._encode_sum_ms += (finished - started) * 1000
+            for request in batch:
+                wait_ms = (started - request.enqueued_at) * 1000
+                self._wait_counts[_bucket_index(WAIT_MS_BUCKETS, wait_ms)] += 1
+                self._wait_sum_ms += wait_ms
+                self._wait_max_ms = max(self._wait_max_ms, wait_ms)
+
+    def close(self):
+        """Yeni istekleri reddet; kuyruktaki istekler işlendikten sonra arka plan thread'i durur"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def stats(self):
+        """Kuyruk derinliği, batch boyutu histogramı ve bekleme süresi metrikleri"""
+        with self._cond:
+            requests = sum(self._wait_counts)
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000,
+                'queue_depth': self._queued_texts,
+                'max_queue_depth': self._max_queue_depth,
+                'batches': self._batches,
+                'requests': requests,
+                'avg_batch_size': round(self._batched_texts / self._batches, 2) if self._batches else 0.0,
+                'batch_size_histogram': _histogram(BATCH_SIZE_BUCKETS, self._batch_size_counts),
+                'wait_ms_histogram': _histogram(WAIT_MS_BUCKETS, self._wait_counts),
+                'avg_wait_ms': round(self._wait_sum_ms / requests, 3) if requests else 0.0,
+                'max_wait_ms_observed': round(self._wait_max_ms, 3),
+                'avg_encode_ms': round(self._encode_sum_ms / self._batches, 3) if self._batches else 0.0
+            }
+
+
+def _bucket_index(bounds, value):
+    """Değerin düştüğü histogram kovasının indeksini bul"""
+    for i, bound in enumerate(bounds):
+        if value <= bound:
+            return i
+    return len(bounds)
+
+
+def _histogram(bounds, counts):
+    """Kova sayılarını {"<=sınır": adet} sözlüğüne çevir"""
+    labels = [f"<={bound}" for bound in bounds] + ["+Inf"]
+    return dict(zip(labels, counts))
@@ -0,0 +1,194 @@
+# model_manager.py - İhtiyaç anında model yükleme ve bellek bütçeli LRU çıkarma
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def current_rss_mb():
+    """Sürecin anlık resident set size (RSS) değerini MB cinsinden döndür"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return round(resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except Exception:
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    """Sürecin en yüksek RSS değerini MB cinsinden döndür"""
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux'ta KB, macOS'ta byte döner
+        divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return round(peak / divisor, 1)
+    except Exception:
+        return None
+
+
+def packed_tensors(model):
+    """Dynamic quantized (int8) katmanların parameters() içinde görünmeyen paketlenmiş ağırlık ve bias'ları"""
+    for module in model.modules():
+        unpack = getattr(getattr(module, "_packed_params", None), "_weight_bias", None)
+        if callable(unpack):
+            for tensor in unpack():
+                if tensor is not None:
+                    yield tensor
+
+
+def estimate_model_size_mb(model):
+    """Modelin parametre, buffer ve (int8 modelde) paketlenmiş ağırlıklarının kapladığı belleği tahmin et"""
+    try:
+        total = sum(p.numel() * p.element_size() for p in model.parameters())
+        total += sum(b.numel() * b.element_size() for b in model.buffers())
+        total += sum(t.numel() * t.element_size() for t in packed_tensors(model))
+        return round(total / (1024 * 1024), 1)
+    except Exception:
+        return 0.0
+
+
+class ModelManager:
+    """Modelleri ilk istekte yükleyen ve bütçe aşılınca en uzun süredir kullanılmayanı çıkaran yönetici.
+
+    Yüklü modeller dışarıdan verilen `models` sözlüğünde tutulur, böylece mevcut
+    kod aynı sözlüğü okumaya devam edebilir. Bütçe model sayısı (max_models) ve/veya
+    tahmini model belleği (max_memory_mb) ile sınırlanır; 0 sınırsız demektir.
+    """
+
+    def __init__(self, loader, models=None, max_models=0, max_memory_mb=0,
+                 on_load=None, on_evict=None, on_state=None):
+        self.loader = loader
+        self.models = models if models is not None else {}
+        self.max_models = max(0, int(max_models))
+        self.max_memory_mb = max(0.0, float(max_memory_mb))
+        self.on_load = on_load
+        self.on_evict = on_evict
+        self.on_state = on_state
+
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._lru = OrderedDict()  # model_id -> tahmini boyut (MB), en eski başta
+        self._loads = {}           # model_id -> {'count', 'last_seconds', 'total_seconds'}
+        self._evictions = {}
+        self._failures = {}
+
+    def _notify_state(self, model_id, state, **details):
+        if self.on_state is not None:
+            self.on_state(model_id, state, **details)
+
+    def touch(self, model_id):
+        """Modeli en son kullanılan olarak işaretle"""
+        with self._lock:
+            if model_id in self._lru:
+                self._lru.move_to_end(model_id)
+
+    def get(self, model_id):
+        """Modeli döndür, yüklü değilse yükle (aynı model için tek yükleme yapılır)"""
+        with self._lock:
+            model = self.models.get(model_id)
+            if model is not None:
+                if model_id in self._lru:
+                    self._lru.move_to_end(model_id)
+                return model
+            load_lock = self._load_locks.setdefault(model_id, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                model = self.models.get(model_id)
+                if model is not None:
+                    return model
+            return self._load(model_id)
+
+    def _load(self, model_id):
+        """Modeli yükle, sözlüğe ekle ve bütçeyi uygula"""
+        self._notify_state(model_id, 'loading')
+        started = time.time()
+        try:
+            model = self.loader(model_id)
+        except Exception as e:
+            with self._lock:
+                self._failures[model_id] = self._failures.get(model_id, 0) + 1
+            self._notify_state(model_id, 'failed', error=str(e))
+            raise
+
+        load_seconds = round(time.time() - started, 2)
+        size_mb = estimate_model_size_mb(model)
+        if self.on_load is not None:
+            self.on_load(model_id, model)
+
+        with self._lock:
+            self.models[model_id] = model
+            self._lru[model_id] = size_mb
+            self._lru.move_to_end(model_id)
+            stats = self._loads.setdefault(model_id, {'count': 0, 'last_seconds': 0.0, 'total_seconds': 0.0})
+            stats['count'] += 1
+            stats['last_seconds'] = load_seconds
+            stats['total_seconds'] = round(stats['total_seconds'] + load_seconds, 2)
+            evicted = self._enforce_budget(keep=model_id)
+
+        self._notify_state(model_id, 'ready', load_seconds=load_seconds, size_mb=size_mb)
+        for evicted_id in evicted:
+            self._after_evict(evicted_id)
+        return model
+
+    def _over_budget(self):
+        """Bütçe aşılmış mı (kilit altında çağrılır)"""
+        if self.max_models and len(self._lru) > self.max_models:
+            return True
+        if self.max_memory_mb and sum(self._lru.values()) > self.max_memory_mb:
+            return True
+        return False
+
+    def _enforce_budget(self, keep=None):
+        """Bütçe sağlanana kadar en eski modelleri çıkar (kilit altında çağrılır)"""
+        evicted = []
+        while self._over_budget():
+            candidates = [mid for mid in self._lru if mid != keep]
+            if not candidates:
+                break
+            victim = candidates[0]
+            self._lru.pop(victim, None)
+            self.models.pop(victim, None)
+            self._evictions[victim] = self._evictions.get(victim, 0) + 1
+            evicted.append(victim)
+        return evicted
+
+    def _after_evict(self, model_id):
+        """Çıkarılan modelin belleğini serbest bırak ve bildir"""
+        print(f"♻️  Model bellekten çıkarıldı (LRU): {model_id}")
+        if self.on_evict is not None:
+            self.on_evict(model_id)
+        self._notify_state(model_id, 'evicted')
+        import gc
+        gc.collect()
+
+    def evict(self, model_id):
+        """Modeli elle bellekten çıkar"""
+        with self._lock:
+            if self.models.pop(model_id, None) is None:
+                return False
+            self._lru.pop(model_id, None)
+            self._evictions[model_id] = self._evictions.get(model_id, 0) + 1
+        self._after_evict(model_id)
+        return True
+
+    def stats(self):
+        """Yükleme süreleri, çıkarmalar ve bellek kullanımı"""
+        with self._lock:
+            resident = list(self._lru.keys())
+            return {
+                'max_models': self.max_models,
+                'max_memory_mb': self.max_memory_mb,
+                'resident_models': resident,
+                'resident_model_memory_mb': round(sum(self._lru.values()), 1),
+                'model_memory_mb': dict(self._lru),
+                'loads': {mid: dict(stats) for mid, stats in self._loads.items()},
+                'evictions': dict(self._evictions),
+                'total_evictions': sum(self._evictions.values()),
+                'load_failures': dict(self._failures),
+                'process_rss_mb': current_rss_mb(),
+                'process_peak_rss_mb': peak_rss_mb()
+            }
@@ -0,0 +1,157 @@
+# profiling.py - Arama sıcak yolu için cProfile ve örnekleme (sampling) profilleyici yardımcıları
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+PROFILE_DIR = "profiles"
+SORT_KEYS = ("cumulative", "tottime", "ncalls")
+
+
+def short_path(path):
+    """Kaynak dosya yolunun son iki bileşeni (site-packages yollarını kısaltmak için)"""
+    parts = os.path.normpath(path).split(os.sep)
+    return os.path.join(*parts[-2:]) if len(parts) > 1 else path
+
+
+def top_functions(stats, sort="cumulative", limit=30):
+    """pstats verisinden en pahalı fonksiyonları sözlük listesi olarak döndür"""
+    rows = []
+    for (filename, line, name), (primitive, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            'function': f"{name} ({short_path(filename)}:{line})" if line else name,
+            'ncalls': calls,
+            'primitive_calls': primitive,
+            'tottime_ms': round(tottime * 1000, 3),
+            'cumtime_ms': round(cumtime * 1000, 3),
+            'cumtime_per_call_ms': round(cumtime * 1000 / primitive, 3) if primitive else None
+        })
+    key = {'cumulative': 'cumtime_ms', 'tottime': 'tottime_ms', 'ncalls': 'ncalls'}[sort]
+    rows.sort(key=lambda row: row[key], reverse=True)
+    return rows[:limit]
+
+
+class StackSampler:
+    """Hedef thread'in yığınını sabit aralıklarla örnekleyen hafif profilleyici.
+
+    cProfile'ın aksine her çağrıya ek maliyet bindirmez; C uzantılarında (torch, ChromaDB)
+    geçen süre de çağıran Python fonksiyonuna yazılır. Sonuç flamegraph.pl / speedscope
+    ile açılabilen "collapsed stack" (.folded) biçiminde de yazılabilir.
+    """
+
+    def __init__(self, thread_id, interval_ms=5.0):
+        self.thread_id = thread_id
+        self.interval = max(0.5, float(interval_ms)) / 1000.0
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({short_path(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def summary(self, limit=30):
+        """Kendi (yaprak) ve kapsayıcı örnek sayısına göre en sık görülen fonksiyonlar"""
+        own, inclusive = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+
+        def ranked(counter):
+            return [
+                {'function': name, 'samples': count,
+                 'percent': round(count * 100 / self.samples, 1) if self.samples else 0.0}
+                for name, count in counter.most_common(limit)
+            ]
+
+        return {
+            'interval_ms': round(self.interval * 1000, 3),
+            'samples': self.samples,
+            'top_self': ranked(own),
+            'top_inclusive': ranked(inclusive)
+        }
+
+    def write_folded(self, path):
+        """Yığınları 'f1;f2;f3 adet' satırları olarak yaz"""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+def profile_calls(calls, sort="cumulative", limit=30, dump_dir=PROFILE_DIR, label="search", sample_interval_ms=None):
+    """(ad, fonksiyon) çiftlerini bu thread'de cProfile altında sırayla çalıştır.
+
+    Sonuç: duvar saati süresi, çağrı/hata sayıları, en pahalı fonksiyonlar ve
+    snakeviz / pstats ile açılabilen .prof dosyasının yolu. sample_interval_ms
+    verilirse aynı çalışma yığın örneklemesiyle de ölçülür.
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Geçersiz sıralama: {sort} (seçenekler: {', '.join(SORT_KEYS)})")
+
+    os.makedirs(dump_dir, exist_ok=True)
+    name = f"{label}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+    profiler = cProfile.Profile()
+    sampler = StackSampler(threading.get_ident(), sample_interval_ms) if sample_interval_ms else None
+    per_call = Counter()
+    errors = []
+
+    if sampler:
+        sampler.start()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        for call_name, fn in calls:
+            call_started = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:
+                errors.append(f"{call_name}: {e}")
+            per_call[call_name] += time.perf_counter() - call_started
+    finally:
+        profiler.disable()
+        wall = time.perf_counter() - started
+        if sampler:
+            sampler.stop()
+
+    dump_path = os.path.join(dump_dir, f"{name}.prof")
+    profiler.dump_stats(dump_path)
+    result = {
+        'wall_seconds': round(wall, 3),
+        'calls': len(calls),
+        'errors': errors,
+        'target_seconds': {call_name: round(seconds, 3) for call_name, seconds in sorted(per_call.items())},
+        'sort': sort,
+        'top_functions': top_functions(pstats.Stats(profiler), sort, limit),
+        'dump_file': os.path.basename(dump_path)
+    }
+    if sampler:
+        result['sampling'] = sampler.summary(limit)
+        result['sampling']['folded_file'] = os.path.basename(sampler.write_folded(os.path.join(dump_dir, f"{name}.folded")))
+    return result
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+⚖️ Quantization Benchmark - fp32 / int8 / bf16 karşılaştırması
+Her model için sorgu encode gecikmesini ve fp32 koleksiyonlarına karşı recall@k kaybını ölçer.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+
+import numpy as np
+import chromadb
+
+from benchmark_search import load_queries
+from db_paths import resolve_db_dir
+from encoder_utils import PRECISIONS, apply_precision, load_sentence_transformer
+
+# Desteklenen modellerin tanımı (rebuild_database.py ile aynı)
+SUPPORTED_MODELS = {
+    "dbmdz_bert": "dbmdz/bert-base-turkish-cased",
+    "turkcell_roberta": "TURKCELL/roberta-base-turkish-uncased",
+    "multilingual_mpnet": "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
+}
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_DIR = resolve_db_dir(BASE_DIR)
+
+
+def time_encoding(model, queries, batch_size, repeats):
+    """Sorguları encode et; en iyi tekrarın toplam süresini ve vektörleri döndür"""
+    # Isınma turu
+    model.encode(queries[:min(len(queries), batch_size)], batch_size=batch_size)
+
+    best = None
+    vectors = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        vectors = model.encode(queries, batch_size=batch_size)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, np.asarray(vectors, dtype=np.float32)
+
+
+def recall_at_k(reference_ids, candidate_ids, k):
+    """İki sonuç listesinin ortalama recall@k değeri"""
+    scores = []
+    for ref, cand in zip(reference_ids, candidate_ids):
+        ref_set = set(ref[:k])
+        if ref_set:
+            scores.append(len(ref_set & set(cand[:k])) / len(ref_set))
+    return float(np.mean(scores)) if scores else 0.0
+
+
+def benchmark_model(client, model_id, model_name, queries, precision, k, batch_size, repeats):
+    """Tek model için fp32 ile seçilen hassasiyeti karşılaştır"""
+    print(f"\n🤖 {model_id}: fp32 vs {precision}")
+
+    fp32_model = load_sentence_transformer(model_name, "fp32", device="cpu")
+    fp32_seconds, fp32_vectors = time_encoding(fp32_model, queries, batch_size, repeats)
+
+    # Aynı ağırlıkların kopyası üzerinde hassasiyet uygula (ikinci indirme yok)
+    quantized_model = apply_precision(fp32_model, precision, inplace=False)
+    quant_seconds, quant_vectors = time_encoding(quantized_model, queries, batch_size, repeats)
+
+    result = {
+        'model_id': model_id,
+        'model_name': model_name,
+        'precision': precision,
+        'queries': len(queries),
+        'fp32_ms_per_query': round(fp32_seconds * 1000 / len(queries), 3),
+        f'{precision}_ms_per_query': round(quant_seconds * 1000 / len(queries), 3),
+        'speedup': round(fp32_seconds / quant_seconds, 3) if quant_seconds else None,
+        'collections': {}
+    }
+    print(f"   ⏱️  fp32: {result['fp32_ms_per_query']} ms/sorgu, "
+          f"{precision}: {result[f'{precision}_ms_per_query']} ms/sorgu (x{result['speedup']})")
+
+    # fp32 koleksiyonlarında fp32 sorgularının sonuçları referans kabul edilir
+    for collection_name in (f"kelime_vektorleri_{model_id}", f"metin_vektorleri_{model_id}"):
+        try:
+            collection = client.get_collection(collection_name)
+        except Exception as e:
+            print(f"   ⚠️  {collection_name} bulunamadı: {e}")
+            continue
+
+        index_precision = (collection.metadata or {}).get("precision", "fp32")
+        if index_precision != "fp32":
+            print(f"   ⚠️  {collection_name} {index_precision} ile oluşturulmuş, referans fp32 değil")
+
+        n_results = min(k, collection.count())
+        reference = collection.query(query_embeddings=fp32_vectors.tolist(), n_results=n_results)
+        candidate = collection.query(query_embeddings=quant_vectors.tolist(), n_results=n_results)
+        recall = recall_at_k(reference['ids'], candidate['ids'], n_results)
+
+        result['collections'][collection_name] = {
+            'index_precision': index_precision,
+            f'recall_at_{k}': round(recall, 4),
+            'recall_drop': round(1.0 - recall, 4)
+        }
+        print(f"   🎯 {collection_name}: recall@{k} = {recall:.4f}")
+
+    return result
+
+
+def parse_args(argv=None):
+    """Komut satırı argümanlarını çözümle"""
+    parser = argparse.ArgumentParser(description="Quantized çıkarımın gecikme kazancını ve recall kaybını ölç")
+    parser.add_argument("--models", nargs="+", default=list(SUPPORTED_MODELS.keys()), choices=list(SUPPORTED_MODELS.keys()))
+    parser.add_argument("--precision", default="int8", choices=[p for p in PRECISIONS if p != "fp32"])
+    parser.add_argument("--queries", help="Satır başına bir sorgu içeren dosya (varsayılan: veri setinden örneklem)")
+    parser.add_argument("--sample", type=int, default=200, help="Örneklenecek sorgu sayısı")
+    parser.add_argument("-k", type=int, default=5, help="recall@k için k")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=3, help="Gecikme ölçümü tekrar sayısı (en iyisi alınır)")
+    parser.add_argument("--output", default="quantization_report.json")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("⚖️  Quantization Benchmark")
+    print("=" * 60)
+
+    queries = load_queries(args.queries, args.sample)
+    if not queries:
+        print("❌ Sorgu bulunamadı!")
+        return False
+    print(f"📊 Sorgu sayısı: {len(queries)}, hassasiyet: {args.precision}, k={args.k}")
+
+    client = chromadb.PersistentClient(path=DB_DIR)
+
+    results = []
+    for model_id in args.models:
+        try:
+            results.append(benchmark_model(
+                client, model_id, SUPPORTED_MODELS[model_id], queries,
+                args.precision, args.k, args.batch_size, args.repeats
+            ))
+        except Exception as e:
+            print(f"❌ {model_id} ölçülemedi: {e}")
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'precision': args.precision,
+        'k': args.k,
+        'query_count': len(queries),
+        'results': results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"\n💾 Rapor kaydedildi: {args.output}")
+    return bool(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
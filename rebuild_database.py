@@ -7,11 +7,27 @@
 import os
 import sys
 import time
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
 import shutil
-import numpy as np
 import chromadb
+from datetime import datetime
 from pathlib import Path
-from sentence_transformers import SentenceTransformer
+
+from encoder_utils import (PRECISIONS, parse_precision_config, precision_for, load_sentence_transformer,
+                           parse_max_seq_length_config, max_seq_length_for, bucketed_encode)
+from build_report import BuildReport, compare_reports, model_memory
+from model_manager import current_rss_mb
+from bulk_loader import bulk_insert, encode_and_insert, max_batch_size
+from collection_sync import (QA_COLLECTION_NAME, QA_MODEL_ID, content_ids, plan_collection_sync, plan_is_empty,
+                             apply_collection_sync, plan_qa_sync, apply_qa_sync)
+from search_backends import normalize_rows
+from db_paths import resolve_db_dir, new_build_dir, activate_build, prune_builds
+from embedding_store import EmbeddingStore, default_store, encode_with_store, model_revision
+from hnsw_config import (DEFAULT_HNSW_CONFIG_FILE, BUILD_KEYS, parse_hnsw_spec, load_hnsw_config, hnsw_params_for,
+                         hnsw_metadata, current_hnsw_params, set_search_ef)
 
 # Desteklenecek modellerin tanımı
 SUPPORTED_MODELS = {
@@ -20,9 +36,25 @@ SUPPORTED_MODELS = {
     "multilingual_mpnet": "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
 }
 
-def clear_database():
+def new_generation_stamp():
+    """Bu rebuild için benzersiz veritabanı nesli (generation) damgası üret"""
+    return datetime.now().strftime("%Y%m%dT%H%M%S%f")
+
+def collection_metadata(model_id, generation, precision, hnsw=None):
+    """Model koleksiyonları için ortak metadata (hnsw: koleksiyonun M / construction_ef / search_ef ayarları)"""
+    metadata = {"hnsw:space": "cosine", "model_id": model_id, "generation": generation, "precision": precision}
+    metadata.update(hnsw_metadata(hnsw or {}))
+    return metadata
+
+def stamp_generation(collection, generation):
+    """Koleksiyon metadata'sındaki generation damgasını güncelle"""
+    # hnsw:* anahtarları oluşturulduktan sonra değiştirilemez, modify'a gönderilmez
+    metadata = {k: v for k, v in (collection.metadata or {}).items() if not k.startswith("hnsw:")}
+    metadata["generation"] = generation
+    collection.modify(metadata=metadata)
+
+def clear_database(db_dir="db"):
     """Mevcut veritabanını temizle"""
-    db_dir = "db"
     if os.path.exists(db_dir):
         print(f"🗑️  Mevcut veritabanı temizleniyor: {db_dir}")
         shutil.rmtree(db_dir)
@@ -49,20 +81,51 @@ def check_files():
     print("✅ Tüm gerekli dosyalar mevcut")
     return True
 
-def create_vectors_for_model(model_id, model_name, kelimeler, metinler):
-    """Belirtilen model için vektörleri oluştur"""
-    print(f"\n🤖 Model yükleniyor: {model_name}")
+def lazy_encoder(model_id, model_name, precision="fp32", timings=None, max_seq_length=None, length_buckets=True):
+    """İlk çağrıda modeli yükleyen encode fonksiyonu (tüm vektörler depodaysa model hiç yüklenmez).
+    
+    length_buckets açıkken metinler token uzunluğu kovalarında, kovaya göre ayarlanmış
+    batch boyutuyla encode edilir; sonuç sırası değişmez.
+    """
+    state = {'stats': {}}
+    timings = timings if timings is not None else {}
+    
+    def encode(texts):
+        if 'model' not in state:
+            print(f"\n🤖 Model yükleniyor: {model_name} ({precision}, max_seq_length={max_seq_length or 'varsayılan'})")
+            started = time.time()
+            state['model'] = load_sentence_transformer(model_name, precision, max_seq_length=max_seq_length)
+            timings['model_load'] = round(time.time() - started, 2)
+            print(f"✅ Model başarıyla yüklendi: {model_id}")
+        if length_buckets:
+            vectors = bucketed_encode(state['model'], texts, stats=state['stats'], show_progress_bar=True)
+            # Tokenizasyon süresi encode aşamalarının içinde, ayrıca raporlanır
+            timings['tokenize'] = round(state['stats']['tokenize_seconds'], 3)
+            return vectors
+        return state['model'].encode(texts, show_progress_bar=True)
+    
+    return encode
+
+def create_vectors_for_model(model_id, model_name, kelimeler, metinler, precision="fp32", store=None, timings=None,
+                             max_seq_length=None, length_buckets=True):
+    """Belirtilen model için vektörleri oluştur (kalıcı embedding deposundakiler yeniden kullanılır)"""
+    timings = timings if timings is not None else {}
     try:
-        model = SentenceTransformer(model_name)
-        print(f"✅ Model başarıyla yüklendi: {model_id}")
+        encode = lazy_encoder(model_id, model_name, precision, timings, max_seq_length, length_buckets)
+        revision = model_revision(model_name, precision, max_seq_length)
         
-        # Kelime vektörlerini oluştur
+        # Kelime vektörlerini oluştur (model yükleme süresi ayrı sayılır)
         print(f"🔤 Kelime vektörleri oluşturuluyor...")
-        kelime_vektorleri = model.encode(kelimeler, show_progress_bar=True)
+        started = time.time()
+        kelime_vektorleri = encode_with_store(store, model_id, revision, kelimeler, encode)
+        timings['encode_words'] = round(time.time() - started - timings.get('model_load', 0.0), 2)
         
         # Cümle vektörlerini oluştur
         print(f"📚 Cümle vektörleri oluşturuluyor...")
-        metin_vektorleri = model.encode(metinler, show_progress_bar=True)
+        load_before = timings.get('model_load', 0.0)
+        started = time.time()
+        metin_vektorleri = encode_with_store(store, model_id, revision, metinler, encode)
+        timings['encode_sentences'] = round(time.time() - started - (timings.get('model_load', 0.0) - load_before), 2)
         
         return kelime_vektorleri, metin_vektorleri, True
         
@@ -70,84 +133,261 @@ def create_vectors_for_model(model_id, model_name, kelimeler, metinler):
         print(f"❌ Model {model_id} yüklenirken hata: {e}")
         return None, None, False
 
-def rebuild_collections_for_model(model_id, kelimeler, metinler, kelime_vektorleri, metin_vektorleri):
-    """Belirtilen model için ChromaDB koleksiyonlarını oluştur"""
+def configure_worker_threads(threads):
+    """Worker sürecinin BLAS/torch thread bütçesini ayarla (model yüklenmeden önce çağrılır)"""
+    for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[name] = str(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+def encode_model_worker(model_id, model_name, kelimeler, metinler, precision, store_root, max_seq_length=None,
+                        length_buckets=True):
+    """Paralel modda ayrı süreçte çalışır: modeli yükle ve vektörleri döndür (ChromaDB'ye yazmaz).
+    
+    Her model yeni bir worker sürecinde çalıştığından sürecin tepe RSS'i o modele aittir.
+    """
+    rss_before = current_rss_mb()
+    timings = {}
+    store = EmbeddingStore(store_root) if store_root else None
+    kelime_vektorleri, metin_vektorleri, success = create_vectors_for_model(
+        model_id, model_name, kelimeler, metinler, precision, store, timings, max_seq_length, length_buckets
+    )
+    return model_id, kelime_vektorleri, metin_vektorleri, success, timings, model_memory(rss_before, own_process=True)
+
+def iter_encoded_models(models, kelimeler, metinler, precision_config, store, workers, threads_per_worker=None,
+                        max_seq_config=None, length_buckets=True):
+    """Her modeli ayrı bir süreçte encode et ve (model_id, kelime, metin, başarı, süreler, bellek) döndür.
+    
+    Sonuçlar bitiş sırasıyla gelir; ChromaDB'ye yazma çağıran tarafta tek süreçte yapılır.
+    """
+    threads = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+    print(f"⚡ Paralel encode: {workers} süreç x {threads} thread")
+    
+    # fork edilmiş süreçlerde torch thread havuzları sorun çıkarabildiği için spawn kullanılır.
+    # Her model yeni bir süreçte çalışır (Python 3.11+); tepe RSS önceki modelden devralınmaz
+    pool_options = {'max_tasks_per_child': 1} if sys.version_info >= (3, 11) else {}
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=configure_worker_threads,
+        initargs=(threads,),
+        **pool_options
+    ) as pool:
+        futures = {
+            pool.submit(
+                encode_model_worker, model_id, model_name, kelimeler, metinler,
+                precision_for(model_id, precision_config), store.root if store else None,
+                max_seq_length_for(model_id, max_seq_config or {}), length_buckets
+            ): model_id
+            for model_id, model_name in models.items()
+        }
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                print(f"❌ {futures[future]} worker hatası: {e}")
+                yield futures[future], None, None, False, {}, {}
+
+def stage_seconds(timings):
+    """Model aşamalarının toplam süresi (tokenizasyon encode aşamalarına dahil olduğundan sayılmaz)"""
+    return sum(seconds for stage, seconds in timings.items() if stage != "tokenize")
+
+def print_stage_timings(stage_timings, wall_seconds):
+    """Model ve aşama bazlı süre tablosunu yazdır"""
+    stages = ("model_load", "tokenize", "encode_words", "encode_sentences", "insert")
+    print(f"\n⏱️  AŞAMA SÜRELERİ (saniye)")
+    print(f"{'model':<20}" + "".join(f"{stage:>18}" for stage in stages))
+    for model_id, timings in stage_timings.items():
+        print(f"{model_id:<20}" + "".join(f"{timings.get(stage, 0.0):>18.2f}" for stage in stages))
+    serial = sum(stage_seconds(timings) for timings in stage_timings.values())
+    print(f"   Aşamaların toplamı: {serial:.2f} s, duvar saati: {wall_seconds:.2f} s (encode ve ekleme iç içe çalışabilir)")
+
+def rebuild_collections_for_model(model_id, kelimeler, metinler, kelime_vektorleri, metin_vektorleri, generation=None,
+                                  precision="fp32", encode_fn=None, timings=None, db_path="db", report=None,
+                                  hnsw_config=None):
+    """Belirtilen model için ChromaDB koleksiyonlarını oluştur.
+    
+    encode_fn verilirse vektörler hazır beklenmez: batch N eklenirken batch N+1 encode edilir.
+    """
     print(f"\n💾 {model_id} için koleksiyonlar oluşturuluyor...")
+    generation = generation or new_generation_stamp()
+    timings = timings if timings is not None else {}
     
     # ChromaDB bağlantısı
-    client = chromadb.PersistentClient(path="db")
+    client = chromadb.PersistentClient(path=db_path)
     
     # Koleksiyon isimleri
     word_collection_name = f"kelime_vektorleri_{model_id}"
     sentence_collection_name = f"metin_vektorleri_{model_id}"
     
     try:
-        # Kelime koleksiyonu
-        print(f"📖 Kelime koleksiyonu oluşturuluyor: {word_collection_name}")
-        word_collection = client.get_or_create_collection(
-            name=word_collection_name,
-            metadata={"hnsw:space": "cosine", "model_id": model_id}
+        stages = (
+            ("📖", "Kelime", word_collection_name, kelimeler, kelime_vektorleri, "encode_words"),
+            ("📝", "Cümle", sentence_collection_name, metinler, metin_vektorleri, "encode_sentences"),
         )
-        
-        # Kelime vektörlerini batch processing ile ekle
-        batch_size = 1000
-        for i in range(0, len(kelimeler), batch_size):
-            end_idx = min(i + batch_size, len(kelimeler))
+        for icon, label, collection_name, texts, vectors, encode_stage in stages:
+            hnsw = hnsw_params_for(collection_name, hnsw_config or {})
+            print(f"{icon} {label} koleksiyonu oluşturuluyor: {collection_name}" + (f" (HNSW: {hnsw})" if hnsw else ""))
+            collection = client.get_or_create_collection(
+                name=collection_name,
+                metadata=collection_metadata(model_id, generation, precision, hnsw)
+            )
             
-            batch_kelimeler = kelimeler[i:end_idx]
-            batch_vektorler = kelime_vektorleri[i:end_idx]
-            batch_ids = [str(j) for j in range(i, end_idx)]
-            batch_embeddings = [vec.tolist() for vec in batch_vektorler]
+            # İçerik tabanlı ID'ler (artımlı güncellemede aynı satır aynı ID'yi alır)
+            ids = content_ids(texts)
+            metadatas = [{"index": j} for j in range(len(texts))]
             
-            word_collection.add(
-                embeddings=batch_embeddings,
-                documents=batch_kelimeler,
-                ids=batch_ids
-            )
+            if encode_fn is not None:
+                load_before = timings.get('model_load', 0.0)
+                stats = encode_and_insert(collection, ids, texts, encode_fn, metadatas, client=client, label=collection_name)
+                timings[encode_stage] = round(stats['encode_seconds'] - (timings.get('model_load', 0.0) - load_before), 2)
+            else:
+                stats = bulk_insert(collection, ids, texts, vectors, metadatas, client=client, label=collection_name)
+            timings['insert'] = round(timings.get('insert', 0.0) + stats['insert_seconds'], 2)
+            if report is not None:
+                report.record_collection(model_id, collection_name, stats)
             
-            print(f"  📦 {end_idx}/{len(kelimeler)} kelime işlendi...")
-        
-        print(f"✅ Kelime koleksiyonu tamamlandı: {word_collection.count()} kayıt")
-        
-        # Cümle koleksiyonu
-        print(f"📝 Cümle koleksiyonu oluşturuluyor: {sentence_collection_name}")
-        sentence_collection = client.get_or_create_collection(
-            name=sentence_collection_name,
-            metadata={"hnsw:space": "cosine", "model_id": model_id}
-        )
+            print(f"✅ {label} koleksiyonu tamamlandı: {collection.count()} kayıt")
+        return True
         
-        # Cümle vektörlerini batch processing ile ekle
-        batch_size = 500
-        for i in range(0, len(metinler), batch_size):
-            end_idx = min(i + batch_size, len(metinler))
+    except Exception as e:
+        print(f"❌ {model_id} koleksiyonları oluşturulurken hata: {e}")
+        return False
+
+def incremental_update_for_model(model_id, model_name, kelimeler, metinler, generation, precision="fp32", store=None,
+                                 db_path="db", max_seq_length=None, length_buckets=True, hnsw_config=None,
+                                 timings=None, items=None, report=None):
+    """Model koleksiyonlarını sadece değişen satırları encode ederek güncelle.
+    
+    timings / items tam build ile aynı aşama adlarıyla doldurulur; items sadece encode
+    edilen ve yazılan satırları sayar, böylece öğe/s verimleri karşılaştırılabilir.
+    """
+    print(f"\n♻️  {model_id} için artımlı güncelleme...")
+    timings = timings if timings is not None else {}
+    items = items if items is not None else {}
+    client = chromadb.PersistentClient(path=db_path)
+    
+    try:
+        targets = []
+        for name, texts, encode_stage in ((f"kelime_vektorleri_{model_id}", kelimeler, "encode_words"),
+                                          (f"metin_vektorleri_{model_id}", metinler, "encode_sentences")):
+            hnsw = hnsw_params_for(name, hnsw_config or {})
+            collection = client.get_or_create_collection(
+                name=name,
+                metadata=collection_metadata(model_id, generation, precision, hnsw)
+            )
             
-            batch_metinler = metinler[i:end_idx]
-            batch_vektorler = metin_vektorleri[i:end_idx]
-            batch_ids = [str(j) for j in range(i, end_idx)]
-            batch_embeddings = [vec.tolist() for vec in batch_vektorler]
+            # Farklı hassasiyetle oluşturulmuş vektörler karıştırılmaz; M / construction_ef de
+            # indeks kurulurken sabitlenir. İkisinde de koleksiyon baştan kurulur
+            index_precision = (collection.metadata or {}).get("precision", "fp32")
+            current = current_hnsw_params(collection)
+            changed = {key: (current.get(key), hnsw[key]) for key in BUILD_KEYS if key in hnsw and current.get(key) != hnsw[key]}
+            if index_precision != precision or changed:
+                reason = f"{index_precision} -> {precision}" if index_precision != precision else f"HNSW {changed}"
+                print(f"   ⚠️  {name}: {reason}, koleksiyon yeniden oluşturuluyor")
+                client.delete_collection(name)
+                collection = client.create_collection(
+                    name=name,
+                    metadata=collection_metadata(model_id, generation, precision, hnsw)
+                )
+            elif "search_ef" in hnsw and current.get("search_ef") != hnsw["search_ef"]:
+                # search_ef yeniden kurulum gerektirmez
+                set_search_ef(collection, hnsw["search_ef"])
+                print(f"   🔧 {name}: search_ef {current.get('search_ef')} -> {hnsw['search_ef']}")
             
-            sentence_collection.add(
-                embeddings=batch_embeddings,
-                documents=batch_metinler,
-                ids=batch_ids
-            )
+            plan = plan_collection_sync(collection, texts)
+            print(f"   📋 {name}: +{len(plan['add'])} / -{len(plan['delete'])} / "
+                  f"~{len(plan['reindex'])} yeniden sıralama / {plan['unchanged']} değişmedi")
+            targets.append((collection, texts, plan, encode_stage))
+        
+        # Model sadece depoda olmayan satırlar encode edilirken yüklenir
+        encode = lazy_encoder(model_id, model_name, precision, timings, max_seq_length, length_buckets)
+        revision = model_revision(model_name, precision, max_seq_length)
+        
+        for collection, texts, plan, encode_stage in targets:
+            if plan_is_empty(plan):
+                continue
+            vectors = []
+            if plan['add']:
+                load_before = timings.get('model_load', 0.0)
+                started = time.time()
+                vectors = encode_with_store(store, model_id, revision, [texts[j] for j in plan['add']], encode)
+                timings[encode_stage] = round(time.time() - started - (timings.get('model_load', 0.0) - load_before), 2)
+                items[encode_stage] = len(plan['add'])
+                items['tokenize'] = items.get('tokenize', 0) + len(plan['add'])
             
-            print(f"  📦 {end_idx}/{len(metinler)} cümle işlendi...")
+            started = time.time()
+            apply_collection_sync(collection, texts, plan, vectors, client=client)
+            insert_seconds = time.time() - started
+            rows = len(plan['add']) + len(plan['delete']) + len(plan['reindex'])
+            timings['insert'] = round(timings.get('insert', 0.0) + insert_seconds, 2)
+            items['insert'] = items.get('insert', 0) + rows
+            if report is not None:
+                report.record_collection(model_id, collection.name, {
+                    'rows': rows,
+                    'batch_size': max_batch_size(client),
+                    'insert_seconds': round(insert_seconds, 3),
+                    'rows_per_sec': round(rows / insert_seconds, 1) if insert_seconds else None
+                })
+            stamp_generation(collection, generation)
+            print(f"   ✅ {collection.name}: {collection.count()} kayıt")
         
-        print(f"✅ Cümle koleksiyonu tamamlandı: {sentence_collection.count()} kayıt")
         return True
         
     except Exception as e:
-        print(f"❌ {model_id} koleksiyonları oluşturulurken hata: {e}")
+        print(f"❌ {model_id} artımlı güncelleme hatası: {e}")
         return False
 
-def verify_database():
+def sync_qa_documents(metinler, db_path="db", vectors_available=True):
+    """Build'e kopyalanan qa_documents koleksiyonunu metinler.txt ile aynı içerik farkıyla eşitle.
+    
+    Yeni cümlelerin vektörleri aynı build'deki dbmdz cümle koleksiyonundan alınır (Q&A aynı
+    modeli kullanır). Vektörler alınamazsa koleksiyon silinir; app.py açılışta yeniden doldurur.
+    """
+    client = chromadb.PersistentClient(path=db_path)
+    if QA_COLLECTION_NAME not in [c.name for c in client.list_collections()]:
+        return True
+    
+    try:
+        if not vectors_available:
+            raise ValueError(f"{QA_MODEL_ID} cümle koleksiyonu güncellenemedi")
+        qa_collection = client.get_collection(QA_COLLECTION_NAME)
+        plan = plan_qa_sync(qa_collection, metinler)
+        print(f"   📋 {QA_COLLECTION_NAME}: +{len(plan['add'])} / -{len(plan['delete'])} / "
+              f"~{len(plan['reindex'])} yeniden sıralama / {plan['unchanged']} değişmedi")
+        if plan_is_empty(plan):
+            return True
+        
+        vectors = []
+        if plan['add']:
+            sentence_ids = content_ids(metinler)
+            needed = [sentence_ids[j] for j in plan['add']]
+            data = client.get_collection(f"metin_vektorleri_{QA_MODEL_ID}").get(ids=needed, include=["embeddings"])
+            by_id = dict(zip(data["ids"], data["embeddings"]))
+            missing = [doc_id for doc_id in needed if doc_id not in by_id]
+            if missing:
+                raise ValueError(f"{len(missing)} cümlenin vektörü metin_vektorleri_{QA_MODEL_ID} koleksiyonunda yok")
+            vectors = normalize_rows([by_id[doc_id] for doc_id in needed])
+        
+        apply_qa_sync(qa_collection, metinler, plan, vectors, client=client)
+        print(f"   ✅ {QA_COLLECTION_NAME}: {qa_collection.count()} kayıt")
+        return True
+        
+    except Exception as e:
+        print(f"⚠️  {QA_COLLECTION_NAME} eşitlenemedi ({e}), koleksiyon siliniyor; app.py yeniden dolduracak")
+        client.delete_collection(QA_COLLECTION_NAME)
+        return False
+
+def verify_database(db_path="db"):
     """Veritabanını doğrula"""
     print("\n🔍 VERİTABANI DOĞRULAMA")
     print("=" * 50)
     
     try:
-        client = chromadb.PersistentClient(path="db")
+        client = chromadb.PersistentClient(path=db_path)
         
         # Koleksiyonları kontrol et
         collections = client.list_collections()
@@ -199,12 +439,107 @@ def verify_database():
         print(f"❌ Veritabanı doğrulama hatası: {e}")
         return False
 
-def main():
+def parse_args(argv=None):
+    """Komut satırı argümanlarını çözümle"""
+    parser = argparse.ArgumentParser(description="Multi-model ChromaDB veritabanını yeniden oluştur")
+    parser.add_argument(
+        "--precision",
+        default="",
+        help=f"Çıkarım hassasiyeti ({'/'.join(PRECISIONS)}); tek değer veya 'dbmdz_bert=int8,turkcell_roberta=bf16'"
+    )
+    parser.add_argument(
+        "--max-seq-length",
+        default="",
+        help="Tokenizer kesme uzunluğu; tek değer veya 'dbmdz_bert=128,multilingual_mpnet=256' (varsayılan: model ayarı)"
+    )
+    parser.add_argument(
+        "--no-length-buckets",
+        action="store_true",
+        help="Token uzunluğu kovalarını kapat, metinleri tek encode çağrısıyla işle"
+    )
+    parser.add_argument(
+        "--hnsw-config",
+        default=DEFAULT_HNSW_CONFIG_FILE,
+        help="Koleksiyon bazlı HNSW ayar dosyası: {\"default\": {...}, \"metin_vektorleri_*\": {\"M\": 32, ...}}"
+    )
+    parser.add_argument(
+        "--hnsw",
+        default="",
+        help="Tüm koleksiyonlar için HNSW değerleri, dosyanın üzerine yazılır: 'M=32,construction_ef=200,search_ef=100'"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Veritabanını silmeden sadece yeni/değişen satırları encode et, silinenleri kaldır"
+    )
+    parser.add_argument(
+        "--in-place",
+        action="store_true",
+        help="Eski davranış: 'db/' dizinini silip yerinde yeniden oluştur (çalışan uygulama kesintiye uğrar)"
+    )
+    parser.add_argument(
+        "--keep-builds",
+        type=int,
+        default=2,
+        help="Aktif build dışında saklanacak eski build sayısı"
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Modelleri ayrı süreçlerde paralel encode et (yazma tek süreçte yapılır)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Paralel modda süreç sayısı (varsayılan: model sayısı)"
+    )
+    parser.add_argument(
+        "--threads-per-worker",
+        type=int,
+        default=0,
+        help="Paralel modda süreç başına thread sayısı (varsayılan: CPU sayısı / süreç sayısı)"
+    )
+    parser.add_argument(
+        "--report",
+        default="",
+        help="JSON build raporu yolu (varsayılan: build_reports/build_<nesil>.json)"
+    )
+    parser.add_argument(
+        "--baseline-report",
+        default="",
+        help="Karşılaştırılacak önceki build raporu; verim düşüşleri listelenir"
+    )
+    parser.add_argument(
+        "--regression-threshold",
+        type=float,
+        default=0.10,
+        help="Verim düşüşü eşiği (0.10 = %%10)"
+    )
+    parser.add_argument(
+        "--no-embedding-store",
+        action="store_true",
+        help="Kalıcı embedding deposunu kullanma, tüm metinleri yeniden encode et"
+    )
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    precision_config = parse_precision_config(args.precision)
+    max_seq_config = parse_max_seq_length_config(args.max_seq_length)
+    try:
+        hnsw_config = load_hnsw_config(args.hnsw_config, parse_hnsw_spec(args.hnsw))
+    except ValueError as e:
+        print(f"❌ HNSW ayarları geçersiz: {e}")
+        return False
+    
     print("🎯 Multi-Model ChromaDB Database Rebuild")
     print("=" * 60)
     print(f"🤖 Desteklenen modeller: {len(SUPPORTED_MODELS)}")
     for model_id, model_name in SUPPORTED_MODELS.items():
-        print(f"   • {model_id}: {model_name}")
+        print(f"   • {model_id}: {model_name} ({precision_for(model_id, precision_config)})")
+    if hnsw_config:
+        print(f"🕸️  HNSW ayarları: {hnsw_config}")
     print("=" * 60)
     
     total_start_time = time.time()
@@ -214,8 +549,30 @@ def main():
         print("❌ Gerekli dosyalar eksik. İşlem sonlandırılıyor.")
         return False
     
-    # Veritabanını temizle
-    clear_database()
+    # Tüm koleksiyonlara yazılacak nesil damgası (app.py önbelleklerini geçersiz kılar)
+    generation = new_generation_stamp()
+    print(f"🏷️  Veritabanı nesli: {generation}")
+    
+    if args.in_place:
+        # Veritabanını temizle (artımlı modda mevcut koleksiyonlar korunur)
+        db_path = "db"
+        if args.incremental:
+            os.makedirs(db_path, exist_ok=True)
+        else:
+            clear_database(db_path)
+    else:
+        # Blue/green: yeni nesil ayrı dizine yazılır, aktif veritabanına dokunulmaz
+        current_db = resolve_db_dir(".")
+        db_path = new_build_dir(".", generation, copy_from=current_db if args.incremental else None)
+        print(f"🟦 Aktif veritabanı: {current_db}")
+        print(f"🟩 Yeni build dizini: {db_path}")
+    if args.incremental:
+        print("♻️  Artımlı mod: sadece değişen satırlar işlenecek")
+    
+    # Daha önce hesaplanmış vektörlerin kalıcı deposu (veritabanı silinse de korunur)
+    store = None if args.no_embedding_store else default_store()
+    if store:
+        print(f"💾 Embedding deposu: {store.root}")
     
     # Verileri yükle
     print("\n📖 TEMEL VERİLER YÜKLENİYOR")
@@ -234,38 +591,110 @@ def main():
     # Her model için işlemleri yap
     successful_models = []
     failed_models = []
+    stage_timings = {}
+    # Artımlı modda aşama başına işlenen öğe sayısı (tam build'de tüm satırlar)
+    stage_items = {}
+    report = BuildReport(generation, options={
+        key: value for key, value in vars(args).items() if key not in ("report", "baseline_report")
+    })
     
-    for model_id, model_name in SUPPORTED_MODELS.items():
-        print(f"\n{'='*60}")
-        print(f"🚀 {model_id.upper()} MODELİ İŞLENİYOR")
-        print(f"{'='*60}")
-        
-        model_start_time = time.time()
-        
-        # Vektörleri oluştur
-        kelime_vektorleri, metin_vektorleri, success = create_vectors_for_model(
-            model_id, model_name, kelimeler, metinler
-        )
+    if args.incremental:
+        if args.parallel:
+            print("⚠️  Artımlı modda paralel encode kullanılmaz")
+        for model_id, model_name in SUPPORTED_MODELS.items():
+            print(f"\n{'='*60}")
+            print(f"🚀 {model_id.upper()} MODELİ İŞLENİYOR")
+            print(f"{'='*60}")
+            
+            model_start_time = time.time()
+            rss_before = current_rss_mb()
+            precision = precision_for(model_id, precision_config)
+            if incremental_update_for_model(model_id, model_name, kelimeler, metinler, generation, precision, store, db_path,
+                                            max_seq_length_for(model_id, max_seq_config), not args.no_length_buckets,
+                                            hnsw_config, timings=stage_timings.setdefault(model_id, {}),
+                                            items=stage_items.setdefault(model_id, {}), report=report):
+                successful_models.append(model_id)
+                print(f"✅ {model_id} güncellendi: {time.time() - model_start_time:.2f} saniye")
+            else:
+                failed_models.append(model_id)
+            report.record_memory(model_id, model_memory(rss_before))
         
-        if not success:
-            failed_models.append(model_id)
-            print(f"❌ {model_id} modeli başarısız oldu, atlanıyor...")
-            continue
+        # Kopyalanan Q&A deposu da aynı farkla güncellenir (silinen cümleler kalmasın)
+        sync_qa_documents(metinler, db_path, QA_MODEL_ID in successful_models)
+    elif args.parallel:
+        workers = max(1, min(args.workers or len(SUPPORTED_MODELS), len(SUPPORTED_MODELS)))
         
-        # Koleksiyonları oluştur
-        if rebuild_collections_for_model(model_id, kelimeler, metinler, kelime_vektorleri, metin_vektorleri):
-            model_end_time = time.time()
-            model_duration = model_end_time - model_start_time
-            successful_models.append(model_id)
-            print(f"✅ {model_id} modeli tamamlandı: {model_duration:.2f} saniye")
-        else:
-            failed_models.append(model_id)
-            print(f"❌ {model_id} koleksiyonları oluşturulamadı")
+        # Vektörler üretildikçe tek yazıcı (bu süreç) koleksiyonlara ekler
+        for model_id, kelime_vektorleri, metin_vektorleri, success, timings, memory in iter_encoded_models(
+            SUPPORTED_MODELS, kelimeler, metinler, precision_config, store, workers, args.threads_per_worker,
+            max_seq_config, not args.no_length_buckets
+        ):
+            stage_timings[model_id] = timings
+            report.record_memory(model_id, memory)
+            
+            if not success:
+                failed_models.append(model_id)
+                print(f"❌ {model_id} modeli başarısız oldu, atlanıyor...")
+                continue
+            
+            # Koleksiyonları oluştur
+            if rebuild_collections_for_model(model_id, kelimeler, metinler, kelime_vektorleri, metin_vektorleri,
+                                             generation, precision_for(model_id, precision_config), timings=timings,
+                                             db_path=db_path, report=report, hnsw_config=hnsw_config):
+                successful_models.append(model_id)
+                print(f"✅ {model_id} modeli tamamlandı: {stage_seconds(timings):.2f} saniye")
+            else:
+                failed_models.append(model_id)
+                print(f"❌ {model_id} koleksiyonları oluşturulamadı")
+    else:
+        for model_id, model_name in SUPPORTED_MODELS.items():
+            print(f"\n{'='*60}")
+            print(f"🚀 {model_id.upper()} MODELİ İŞLENİYOR")
+            print(f"{'='*60}")
+            
+            model_start_time = time.time()
+            rss_before = current_rss_mb()
+            precision = precision_for(model_id, precision_config)
+            timings = stage_timings.setdefault(model_id, {})
+            
+            # Encode ve ekleme iç içe: bir batch yazılırken sonraki batch encode edilir
+            max_seq_length = max_seq_length_for(model_id, max_seq_config)
+            encode = lazy_encoder(model_id, model_name, precision, timings, max_seq_length, not args.no_length_buckets)
+            revision = model_revision(model_name, precision, max_seq_length)
+            encode_fn = lambda texts: encode_with_store(store, model_id, revision, texts, encode)
+            
+            # Koleksiyonları oluştur
+            if rebuild_collections_for_model(model_id, kelimeler, metinler, None, None, generation, precision,
+                                             encode_fn=encode_fn, timings=timings, db_path=db_path, report=report,
+                                             hnsw_config=hnsw_config):
+                model_end_time = time.time()
+                model_duration = model_end_time - model_start_time
+                successful_models.append(model_id)
+                print(f"✅ {model_id} modeli tamamlandı: {model_duration:.2f} saniye")
+            else:
+                failed_models.append(model_id)
+                print(f"❌ {model_id} koleksiyonları oluşturulamadı")
+            # Sıralı modda model hâlâ bellekteyken ölçülen RSS farkı
+            report.record_memory(model_id, model_memory(rss_before))
     
     # Final verification
     print(f"\n{'='*60}")
     if successful_models:
-        verify_database()
+        verify_database(db_path)
+    
+    # Build eksiksizse işaretçiyi atomik olarak yeni dizine çevir (app.py arka planda geçiş yapar).
+    # Artımlı modda da aynı kural: yarıda kalan model kopyalanan koleksiyonları kısmen eşitlenmiş bırakır
+    if not args.in_place:
+        if successful_models and not failed_models:
+            activate_build(".", db_path)
+            print(f"\n🔀 Aktif veritabanı değiştirildi: {db_path}")
+            removed = prune_builds(".", args.keep_builds)
+            if removed:
+                print(f"🧹 Eski build'ler silindi: {removed}")
+        elif successful_models:
+            print(f"\n⚠️  Bazı modeller başarısız, aktif veritabanı değiştirilmedi (build: {db_path})")
+        else:
+            shutil.rmtree(db_path, ignore_errors=True)
     
     # Özet rapor
     total_end_time = time.time()
@@ -274,9 +703,35 @@ def main():
     print(f"\n🏁 İŞLEM TAMAMLANDI")
     print(f"{'='*40}")
     print(f"⏱️  Toplam süre: {total_duration:.2f} saniye")
+    if stage_timings:
+        print_stage_timings(stage_timings, total_duration)
     print(f"✅ Başarılı modeller: {len(successful_models)} - {successful_models}")
     print(f"❌ Başarısız modeller: {len(failed_models)} - {failed_models}")
     
+    # Makine tarafından okunabilir build raporu
+    for model_id, timings in stage_timings.items():
+        report.record_model(model_id, timings, len(kelimeler), len(metinler), model_id in successful_models,
+                            items=stage_items.get(model_id))
+    for model_id in successful_models + failed_models:
+        if model_id not in stage_timings:
+            report.record_model(model_id, {}, len(kelimeler), len(metinler), model_id in successful_models)
+    report.finish(db_path, total_duration, successful_models, failed_models)
+    report_path = report.save(args.report or os.path.join("build_reports", f"build_{generation}.json"))
+    print(f"📄 Build raporu: {report_path}")
+    
+    if args.baseline_report:
+        try:
+            with open(args.baseline_report, "r", encoding="utf-8") as f:
+                regressions = compare_reports(json.load(f), report.data, args.regression_threshold)
+            if regressions:
+                print(f"⚠️  {len(regressions)} metrikte verim düşüşü:")
+                for item in regressions:
+                    print(f"   • {item['metric']}: {item['baseline']} -> {item['current']} ({item['change']:+.1%})")
+            else:
+                print(f"✅ Önceki rapora göre verim düşüşü yok")
+        except Exception as e:
+            print(f"⚠️  Önceki rapor okunamadı: {e}")
+    
     if successful_models:
         print(f"\n🎉 Multi-model veritabanı başarıyla oluşturuldu!")
         print(f"🚀 Flask uygulamasını başlatabilirsiniz: python app.py")
@@ -285,14 +740,5 @@ def main():
         print(f"\n💥 Hiçbir model başarıyla yüklenemedi!")
         return False
 
-def get_directory_size(path):
-    """Dizin boyutunu MB cinsinden hesapla"""
-    total_size = 0
-    for dirpath, dirnames, filenames in os.walk(path):
-        for filename in filenames:
-            filepath = os.path.join(dirpath, filename)
-            total_size += os.path.getsize(filepath)
-    return total_size / (1024 * 1024)  # MB
-
 if __name__ == "__main__":
     main() 
\ No newline at end of file
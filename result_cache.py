@@ -0,0 +1,101 @@
+# result_cache.py - Veritabanı nesline (generation) bağlı TTL + LRU arama sonucu önbelleği
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    """Tam arama yanıtlarını saklayan, süre (TTL) ve boyut (LRU) sınırlı önbellek.
+
+    Anahtarlar veritabanı generation damgasını içerir; set_generation ile yeni
+    bir damga bildirildiğinde eski nesle ait tüm kayıtlar düşürülür. Çağıran
+    aramaya başlarken okuduğu nesli get/put'a verirse, arada geçiş olduğunda
+    eski nesle göre hesaplanan yanıt yeni nesil altında saklanmaz.
+    """
+
+    def __init__(self, max_entries=2048, ttl_seconds=600):
+        self.max_entries = max(0, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (generation, key) -> (expires_at, value)
+        self._generation = None
+        self._hits = 0
+        self._misses = 0
+        self._expirations = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._stale_puts = 0
+
+    def set_generation(self, generation):
+        """Aktif veritabanı neslini ayarla, değiştiyse önbelleği boşalt"""
+        with self._lock:
+            if generation != self._generation:
+                if self._entries:
+                    self._invalidations += 1
+                self._entries.clear()
+                self._generation = generation
+
+    def get(self, key, generation=None):
+        """Geçerli kaydı döndür; yoksa, süresi dolduysa veya nesil eskiyse None"""
+        if self.max_entries == 0:
+            return None
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                self._misses += 1
+                return None
+            full_key = (self._generation, key)
+            entry = self._entries.get(full_key)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[full_key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(full_key)
+            self._hits += 1
+            return value
+
+    def put(self, key, value, generation=None):
+        """Kaydı aktif nesil altında sakla, gerekirse en eski kaydı çıkar.
+
+        generation verilmişse ve aktif nesil o arada değiştiyse kayıt atılır.
+        """
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                self._stale_puts += 1
+                return
+            full_key = (self._generation, key)
+            self._entries[full_key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        """Tüm kayıtları sil"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Önbellek istatistiklerini döndür"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'generation': self._generation,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / total, 4) if total else 0.0,
+                'expirations': self._expirations,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+                'stale_puts': self._stale_puts
+            }
@@ -0,0 +1,171 @@
+# search_backends.py - Koleksiyon başına seçilebilen arama arka uçları (ChromaDB HNSW / NumPy exact)
+
+import os
+
+import numpy as np
+
+# Bellek eşlemeli aramada tek seferde skorlanan satır sayısı
+DEFAULT_BLOCK_ROWS = 65536
+
+
+def normalize_rows(matrix):
+    """Satırları L2 normuna böl (sıfır vektörler olduğu gibi kalır)"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k_indices(scores, k):
+    """Her satır için en yüksek k skorun indekslerini (azalan sırada) argpartition ile bul"""
+    n = scores.shape[1]
+    k = min(k, n)
+    if k <= 0:
+        return np.zeros((scores.shape[0], 0), dtype=np.int64)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.tile(np.arange(n), (scores.shape[0], 1))
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+class ExactSearchIndex:
+    """Koleksiyonun tamamını normalize float32 matris olarak bellekte tutan kesin cosine arama indeksi.
+
+    ChromaDB koleksiyonunun query/count arayüzünü taklit eder; sonuçlar
+    aynı sözlük yapısında (ids/documents/distances/metadatas) döner.
+    """
+
+    backend = "numpy"
+
+    def __init__(self, ids, documents, embeddings, metadatas=None, name=None):
+        self.name = name
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = list(metadatas) if metadatas is not None else [None] * len(self.ids)
+        if len(self.ids):
+            self.matrix = np.ascontiguousarray(normalize_rows(embeddings))
+        else:
+            self.matrix = np.zeros((0, 0), dtype=np.float32)
+
+    @classmethod
+    def from_collection(cls, collection):
+        """ChromaDB koleksiyonundaki tüm kayıtları belleğe yükle"""
+        data = collection.get(include=["embeddings", "documents", "metadatas"])
+        return cls(
+            data["ids"],
+            data["documents"],
+            data["embeddings"] if data["embeddings"] is not None else [],
+            data.get("metadatas"),
+            name=collection.name
+        )
+
+    def count(self):
+        return len(self.ids)
+
+    def query(self, query_embeddings, n_results=10, **kwargs):
+        """Tek matris çarpımı ve argpartition ile en yakın n_results kaydı bul"""
+        queries = normalize_rows(query_embeddings)
+        if not self.ids:
+            empty = [[] for _ in range(len(queries))]
+            return {"ids": empty, "documents": empty, "distances": empty, "metadatas": empty}
+
+        scores = queries @ self.matrix.T
+        top = top_k_indices(scores, n_results)
+
+        ids, documents, distances, metadatas = [], [], [], []
+        for row, indices in enumerate(top):
+            ids.append([self.ids[i] for i in indices])
+            documents.append([self.documents[i] for i in indices])
+            metadatas.append([self.metadatas[i] for i in indices])
+            # ChromaDB cosine uzayı ile aynı: distance = 1 - cosine similarity
+            distances.append((1.0 - scores[row, indices]).tolist())
+
+        return {"ids": ids, "documents": documents, "distances": distances, "metadatas": metadatas}
+
+
+def normalize_to_file(source_path, target_path, block_rows=DEFAULT_BLOCK_ROWS):
+    """.npy vektör dosyasını blok blok normalize edip float32 .npy olarak yaz.
+
+    Kaynak mmap ile okunur, hedef open_memmap ile yazılır; böylece dosyanın tamamı
+    hiçbir zaman belleğe alınmaz. Yarım kalan yazım eski dosyayı bozmasın diye
+    önce geçici dosyaya yazılır.
+    """
+    source = np.load(source_path, mmap_mode="r")
+    if source.ndim != 2:
+        raise ValueError(f"{source_path}: 2 boyutlu vektör matrisi bekleniyordu, şekil: {source.shape}")
+    tmp_path = target_path + ".tmp"
+    target = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=source.shape)
+    for start in range(0, source.shape[0], block_rows):
+        target[start:start + block_rows] = normalize_rows(source[start:start + block_rows])
+    target.flush()
+    del target
+    os.replace(tmp_path, target_path)
+    return target_path
+
+
+class MappedVectorIndex:
+    """Normalize edilmiş vektör matrisini mmap ile açan, skorları bloklar halinde hesaplayan kesin arama.
+
+    Her blokta yalnızca (sorgu x blok) boyutunda skor matrisi oluşur ve argpartition ile
+    blok başına k aday seçilir; adaylar önceki en iyilerle birleştirilir. Bellek kullanımı
+    korpus boyutundan bağımsızdır, sayfalar işletim sisteminin önbelleğinden okunur.
+    """
+
+    backend = "numpy-mmap"
+
+    def __init__(self, matrix, block_rows=DEFAULT_BLOCK_ROWS):
+        self.matrix = matrix
+        self.block_rows = max(1, int(block_rows))
+
+    @classmethod
+    def open(cls, source_path, normalized_path=None, block_rows=DEFAULT_BLOCK_ROWS):
+        """Kaynak .npy için normalize kopyayı (yoksa veya eskiyse) üret ve mmap ile aç"""
+        normalized_path = normalized_path or os.path.splitext(source_path)[0] + ".normalized.npy"
+        if (not os.path.exists(normalized_path)
+                or os.path.getmtime(normalized_path) < os.path.getmtime(source_path)):
+            normalize_to_file(source_path, normalized_path, block_rows)
+        return cls(np.load(normalized_path, mmap_mode="r"), block_rows)
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def search(self, query_embeddings, k):
+        """Her sorgu için en yüksek k cosine skorunu ve satır indekslerini (azalan sırada) döndür"""
+        queries = normalize_rows(query_embeddings)
+        k = min(int(k), len(self))
+        best_scores = np.full((len(queries), max(k, 0)), -np.inf, dtype=np.float32)
+        best_indices = np.full((len(queries), max(k, 0)), -1, dtype=np.int64)
+        if k <= 0:
+            return best_scores, best_indices
+
+        for start in range(0, len(self), self.block_rows):
+            scores = queries @ np.asarray(self.matrix[start:start + self.block_rows]).T
+            top = top_k_indices(scores, k)
+            # Blok adaylarını önceki en iyilerle birleştir; eşitlikte önceki (düşük indeks) önde kalır
+            merged_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+            merged_indices = np.concatenate([best_indices, top + start], axis=1)
+            keep = top_k_indices(merged_scores, k)
+            best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+            best_indices = np.take_along_axis(merged_indices, keep, axis=1)
+        return best_scores, best_indices
+
+
+def build_search_index(collection, max_exact_items):
+    """Koleksiyon boyutuna göre arka uç seç: küçük koleksiyonlar NumPy, büyükler ChromaDB HNSW"""
+    if max_exact_items > 0 and collection.count() <= max_exact_items:
+        return ExactSearchIndex.from_collection(collection)
+    return collection
+
+
+def backend_name(index):
+    """Arama indeksinin arka uç adını döndür"""
+    return getattr(index, "backend", "chromadb")
@@ -17,6 +17,12 @@ let searchHistory = {
 // Local storage key for caching search results
 const CACHE_KEY_PREFIX = 'semantik_arama_cache_';
 const CACHE_EXPIRY = 24 * 60 * 60 * 1000; // 24 hours in milliseconds
+// Kelime/cümle aramaları sunucu tarafında (veritabanı nesline bağlı) önbelleklenir;
+// localStorage sadece ilişki ve Q&A sonuçları için kullanılır
+const LOCAL_CACHE_TYPES = ['relationships', 'qa'];
+
+// Sayfa ?debug ile açılırsa sunucudan aşama süreleri istenir ve sonuçlarda gösterilir
+const DEBUG_TIMINGS = new URLSearchParams(window.location.search).has('debug');
 
 // Initialize cache data structure
 function initializeCache() {
@@ -463,7 +469,9 @@ function performSearch() {
     }
 
     // Check cache first
-    const cachedResults = loadSearchFromCache(query, currentSearchType, selectedModels);
+    const cachedResults = LOCAL_CACHE_TYPES.includes(currentSearchType)
+        ? loadSearchFromCache(query, currentSearchType, selectedModels)
+        : null;
     if (cachedResults) {
         console.log('🎯 Cache hit - loading from localStorage');
         const resultsDiv = document.getElementById('results');
@@ -540,7 +548,8 @@ function performSearch() {
                 'Content-Type': 'application/json',
             },
             body: JSON.stringify({
-                question: query
+                question: query,
+                debug: DEBUG_TIMINGS
             })
         })
         .then(response => response.json())
@@ -584,7 +593,8 @@ function performSearch() {
             body: JSON.stringify({
                 query: query,
                 type: currentSearchType,
-                models: selectedModels
+                models: selectedModels,
+                debug: DEBUG_TIMINGS
             })
         })
         .then(response => response.json())
@@ -599,8 +609,13 @@ function performSearch() {
                 `;
             } else {
                 displayMultiModelResults(data);
-                // Save to cache
-                saveSearchToCache(query, currentSearchType, selectedModels, data);
+                if (data.cached) {
+                    resultsDiv.insertAdjacentHTML('afterbegin', `
+                        <div class="cache-indicator">
+                            <small>⚡ Server cache hit • ${new Date().toLocaleTimeString()}</small>
+                        </div>
+                    `);
+                }
                 // Başarılı aramayı kaydet
                 searchHistory[currentSearchType] = {
                     query: query,
@@ -621,6 +636,15 @@ function performSearch() {
     }
 }
 
+// Debug modunda sunucudan gelen model aşama sürelerini (ms) kısa metin olarak göster
+function formatStageTimings(timings, groupId) {
+    if (!timings || !timings.stages || !timings.stages[groupId]) return '';
+    const stages = Object.entries(timings.stages[groupId])
+        .map(([stage, ms]) => `${stage} ${ms} ms`)
+        .join(' • ');
+    return `<small class="stage-timings">⏱️ ${stages} (toplam ${timings.total_ms} ms)</small>`;
+}
+
 // Multi-model sonuçları göster
 function displayMultiModelResults(data) {
     const resultsDiv = document.getElementById('results');
@@ -670,6 +694,7 @@ function displayMultiModelResults(data) {
                 <div class="model-header">
                     <h4>${modelName}</h4>
                     <div class="model-details">
+                        ${formatStageTimings(data.timings, modelId)}
                     </div>
                 </div>
                 <div class="model-results-list">
@@ -850,6 +875,7 @@ function displayQAResults(data) {
                 <h3>🤖 Soru-Cevap Sonucu</h3>
                 <div class="qa-method">
                     <small>📚 ${data.method} • ${data.retrieved_documents} doküman incelendi</small>
+                    ${formatStageTimings(data.timings, Object.keys((data.timings || {}).stages || {})[0])}
                 </div>
             </div>
             
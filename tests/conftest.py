@@ -0,0 +1,35 @@
+# conftest.py - Testler için ortak ayarlar ve sahte (deterministik) encoder
+
+import hashlib
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Modüller depo kökünde (paket yapısı yok)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def fake_vector(text, dim=8):
+    """Metinden kararlı, rastgele görünen bir vektör üret"""
+    seed = int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+    return np.random.default_rng(seed).normal(size=dim).astype(np.float32)
+
+
+class FakeModel:
+    """SentenceTransformer.encode arayüzünü taklit eden, çağrıları sayan model"""
+
+    def __init__(self, dim=8):
+        self.dim = dim
+        self.encoded = []
+
+    def encode(self, texts, **kwargs):
+        texts = list(texts)
+        self.encoded.extend(texts)
+        return np.array([fake_vector(text, self.dim) for text in texts], dtype=np.float32).reshape(len(texts), self.dim)
+
+
+@pytest.fixture
+def fake_model():
+    return FakeModel()
@@ -0,0 +1,96 @@
+# test_embedding_store.py - Kalıcı embedding deposu: ekleme/indeks tutarlılığı ve süreçler arası yazma
+
+import multiprocessing
+import os
+
+import numpy as np
+
+from embedding_store import EmbeddingStore, encode_with_store
+from conftest import fake_vector
+
+MODEL, REVISION = "dbmdz_bert", "abc-fp32"
+
+
+def vectors_for(texts):
+    return np.array([fake_vector(text) for text in texts], dtype=np.float32)
+
+
+def assert_store_matches(store, texts):
+    found = store.get_many(MODEL, REVISION, texts)
+    assert all(vector is not None for vector in found)
+    assert np.allclose(np.vstack(found), vectors_for(texts))
+
+
+def test_put_get_roundtrip_and_duplicates(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    texts = ["a", "b", "a", "c"]
+    assert store.put_many(MODEL, REVISION, texts, vectors_for(texts)) == 3
+    assert store.put_many(MODEL, REVISION, ["b", "d"], vectors_for(["b", "d"])) == 1
+    assert_store_matches(store, ["d", "c", "b", "a"])
+    assert store.get_many(MODEL, REVISION, ["yok"]) == [None]
+
+    # Yeni örnek diskten aynı indeksi okur
+    assert_store_matches(EmbeddingStore(str(tmp_path)), ["a", "b", "c", "d"])
+
+
+def test_stale_instances_do_not_overlap_rows(tmp_path):
+    # İki örnek aynı namespace'i farklı anda yüklemiş iki süreci temsil eder
+    first, second = EmbeddingStore(str(tmp_path)), EmbeddingStore(str(tmp_path))
+    first.put_many(MODEL, REVISION, ["x0"], vectors_for(["x0"]))
+    assert second.get_many(MODEL, REVISION, ["yok"]) == [None]  # namespace ikinci örnekte de açık
+
+    first.put_many(MODEL, REVISION, ["a1", "a2"], vectors_for(["a1", "a2"]))
+    second.put_many(MODEL, REVISION, ["b1", "b2", "a1"], vectors_for(["b1", "b2", "a1"]))
+    first.put_many(MODEL, REVISION, ["a3"], vectors_for(["a3"]))
+
+    texts = ["x0", "a1", "a2", "b1", "b2", "a3"]
+    for store in (first, second, EmbeddingStore(str(tmp_path))):
+        assert_store_matches(store, texts)
+
+    # a1 ikinci kez yazılmaz: satır sayısı = benzersiz metin sayısı
+    namespace = EmbeddingStore(str(tmp_path))._namespace_path(MODEL, REVISION)
+    assert os.path.getsize(os.path.join(namespace, "vectors.f32")) == len(texts) * 8 * 4
+
+
+def test_truncated_write_is_repaired_on_open(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    store.put_many(MODEL, REVISION, ["a", "b"], vectors_for(["a", "b"]))
+    namespace = store._namespace_path(MODEL, REVISION)
+    # Anahtar yazılmadan kesilmiş ekleme: fazladan vektör satırı
+    with open(os.path.join(namespace, "vectors.f32"), "ab") as f:
+        f.write(vectors_for(["c"]).tobytes())
+
+    reopened = EmbeddingStore(str(tmp_path))
+    assert reopened.get_many(MODEL, REVISION, ["c"]) == [None]
+    reopened.put_many(MODEL, REVISION, ["d"], vectors_for(["d"]))
+    assert_store_matches(EmbeddingStore(str(tmp_path)), ["a", "b", "d"])
+
+
+def test_encode_with_store_encodes_only_missing(tmp_path, fake_model):
+    store = EmbeddingStore(str(tmp_path))
+    encode_with_store(store, MODEL, REVISION, ["a", "b"], fake_model.encode)
+    fake_model.encoded.clear()
+    result = encode_with_store(store, MODEL, REVISION, ["b", "c", "a", "c"], fake_model.encode)
+    assert fake_model.encoded == ["c"]
+    assert np.allclose(result, vectors_for(["b", "c", "a", "c"]))
+
+
+def _writer(root, prefix, count):
+    store = EmbeddingStore(root)
+    for i in range(count):
+        texts = [f"{prefix}-{i}-{j}" for j in range(3)]
+        store.put_many(MODEL, REVISION, texts, vectors_for(texts))
+
+
+def test_concurrent_processes_keep_index_consistent(tmp_path):
+    root = str(tmp_path)
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_writer, args=(root, prefix, 20)) for prefix in ("app", "rebuild")]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+
+    texts = [f"{prefix}-{i}-{j}" for prefix in ("app", "rebuild") for i in range(20) for j in range(3)]
+    assert_store_matches(EmbeddingStore(root), texts)
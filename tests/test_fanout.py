@@ -0,0 +1,63 @@
+# test_fanout.py - Model bazlı paralel arama: süre sınırı görev başladığında işler, kuyrukta kalanlar iptal edilir,
+# hata veren modeller ayrı raporlanır
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fanout import run_fanout
+
+
+def test_results_are_keyed_by_call():
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results, timed_out, queued, errors = run_fanout(pool, {key: (str.upper, (key,)) for key in "abc"}, timeout=5)
+    assert results == {"a": "A", "b": "B", "c": "C"}
+    assert timed_out == [] and queued == [] and errors == {}
+
+
+def test_queue_wait_does_not_count_against_timeout():
+    gate = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        # Tek işçiyi meşgul eden başka bir isteğin araması
+        blocker = pool.submit(gate.wait, 5)
+        threading.Timer(0.15, gate.set).start()
+        results, timed_out, queued, errors = run_fanout(pool, {"m": (time.sleep, (0.05,))}, timeout=0.1, queue_timeout=5)
+        blocker.result()
+    # Kuyrukta 0.15 s beklemesine rağmen kendi süresi (0.05 s) sınırın altında
+    assert "m" in results
+    assert timed_out == [] and queued == []
+
+
+def test_running_call_times_out_from_its_start():
+    gate = threading.Event()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        started = time.monotonic()
+        results, timed_out, queued, errors = run_fanout(
+            pool, {"slow": (gate.wait, (5,)), "fast": (str.upper, ("x",))}, timeout=0.1)
+        elapsed = time.monotonic() - started
+        gate.set()
+    assert results == {"fast": "X"}
+    assert timed_out == ["slow"] and queued == []
+    assert elapsed < 1
+
+
+def test_calls_that_cannot_start_are_cancelled():
+    gate = threading.Event()
+    ran = []
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        blocker = pool.submit(gate.wait, 5)
+        results, timed_out, queued, errors = run_fanout(pool, {"m": (ran.append, ("çalıştı",))}, timeout=1, queue_timeout=0.05)
+        gate.set()
+        blocker.result()
+    assert results == {} and timed_out == [] and queued == ["m"]
+    assert ran == []
+
+
+def test_errors_are_reported_per_call():
+    def failing():
+        raise RuntimeError("koleksiyon yok")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results, timed_out, queued, errors = run_fanout(pool, {"ok": (str.upper, ("x",)), "bad": (failing, ())}, timeout=5)
+    assert results == {"ok": "X"}
+    assert list(errors) == ["bad"] and str(errors["bad"]) == "koleksiyon yok"
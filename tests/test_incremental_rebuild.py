@@ -0,0 +1,157 @@
+# test_incremental_rebuild.py - Artımlı rebuild: içerik farkı, silme ve qa_documents eşitlemesi
+
+import chromadb
+import numpy as np
+import pytest
+
+import rebuild_database
+from collection_sync import QA_COLLECTION_NAME, QA_MODEL_ID, content_ids, plan_qa_sync, apply_qa_sync
+from db_paths import new_build_dir
+from search_backends import normalize_rows
+
+WORDS = ["okul", "kitap", "deniz"]
+SENTENCES = [f"Bu {i}. örnek cümledir." for i in range(8)]
+
+
+@pytest.fixture
+def model(monkeypatch, fake_model):
+    monkeypatch.setattr(rebuild_database, "load_sentence_transformer", lambda *args, **kwargs: fake_model)
+    return fake_model
+
+
+def build(db_path, model, words, sentences):
+    """Tam build: dbmdz koleksiyonları ve app.py'nin dolduracağı gibi qa_documents"""
+    assert rebuild_database.rebuild_collections_for_model(
+        QA_MODEL_ID, words, sentences, model.encode(words), model.encode(sentences), "g1", db_path=db_path
+    )
+    client = chromadb.PersistentClient(path=db_path)
+    qa = client.get_or_create_collection(QA_COLLECTION_NAME)
+    apply_qa_sync(qa, sentences, plan_qa_sync(qa, sentences), normalize_rows(model.encode(sentences)))
+    return client
+
+
+def qa_documents(db_path):
+    data = chromadb.PersistentClient(path=db_path).get_collection(QA_COLLECTION_NAME).get(
+        include=["documents", "metadatas", "embeddings"])
+    return data
+
+
+def test_content_ids_stable_and_unique_for_duplicates():
+    ids = content_ids(["a", "b", "a"])
+    assert ids[0] != ids[2] and ids[2] == f"{ids[0]}-1"
+    assert content_ids(["b"]) == [ids[1]]
+    assert content_ids(["a"], prefix="qa_") == [f"qa_{ids[0]}"]
+
+
+def test_incremental_update_syncs_qa_documents(tmp_path, model):
+    old_db = str(tmp_path / "db")
+    build(old_db, model, WORDS, SENTENCES)
+
+    # Bir cümle silinir, biri eklenir, kalanların sırası değişir
+    new_sentences = SENTENCES[2:] + ["Yepyeni bir cümle."] + SENTENCES[:1]
+    db_path = new_build_dir(str(tmp_path), "g2", copy_from=old_db)
+    model.encoded.clear()
+
+    assert rebuild_database.incremental_update_for_model(
+        QA_MODEL_ID, "fake", WORDS, new_sentences, "g2", db_path=db_path, length_buckets=False)
+    # Sadece yeni satır encode edilir
+    assert model.encoded == ["Yepyeni bir cümle."]
+
+    assert rebuild_database.sync_qa_documents(new_sentences, db_path)
+    data = qa_documents(db_path)
+    assert sorted(data["documents"]) == sorted(new_sentences)
+    assert SENTENCES[1] not in data["documents"]
+    assert set(data["ids"]) == set(content_ids(new_sentences, "qa_"))
+    positions = {document: metadata["sentence_id"] for document, metadata in zip(data["documents"], data["metadatas"])}
+    assert positions == {sentence: j for j, sentence in enumerate(new_sentences)}
+
+    # Yeni cümlenin Q&A vektörü dbmdz cümle koleksiyonundakiyle aynı (normalize)
+    added = data["documents"].index("Yepyeni bir cümle.")
+    expected = normalize_rows(model.encode(["Yepyeni bir cümle."]))[0]
+    assert np.allclose(data["embeddings"][added], expected, atol=1e-6)
+
+    # Eski build'e dokunulmaz
+    assert sorted(qa_documents(old_db)["documents"]) == sorted(SENTENCES)
+
+
+def test_sync_replaces_legacy_positional_qa_ids(tmp_path, model):
+    db_path = str(tmp_path / "db")
+    rebuild_database.rebuild_collections_for_model(
+        QA_MODEL_ID, WORDS, SENTENCES, model.encode(WORDS), model.encode(SENTENCES), "g1", db_path=db_path)
+    qa = chromadb.PersistentClient(path=db_path).get_or_create_collection(QA_COLLECTION_NAME)
+    qa.add(ids=[f"qa_sentence_{i}" for i in range(len(SENTENCES))], documents=SENTENCES,
+           embeddings=normalize_rows(model.encode(SENTENCES)),
+           metadatas=[{"source": "metinler.txt", "sentence_id": i, "type": "sentence"} for i in range(len(SENTENCES))])
+
+    assert rebuild_database.sync_qa_documents(SENTENCES, db_path)
+    data = qa_documents(db_path)
+    assert len(data["ids"]) == len(SENTENCES)
+    assert set(data["ids"]) == set(content_ids(SENTENCES, "qa_"))
+
+
+def test_sync_drops_qa_documents_without_fresh_vectors(tmp_path, model):
+    db_path = str(tmp_path / "db")
+    build(db_path, model, WORDS, SENTENCES)
+
+    assert not rebuild_database.sync_qa_documents(SENTENCES + ["yeni"], db_path, vectors_available=False)
+    names = [c.name for c in chromadb.PersistentClient(path=db_path).list_collections()]
+    assert QA_COLLECTION_NAME not in names
+
+
+def test_sync_without_qa_collection_is_noop(tmp_path, model):
+    db_path = str(tmp_path / "db")
+    rebuild_database.rebuild_collections_for_model(
+        QA_MODEL_ID, WORDS, SENTENCES, model.encode(WORDS), model.encode(SENTENCES), "g1", db_path=db_path)
+    assert rebuild_database.sync_qa_documents(SENTENCES, db_path)
+    names = [c.name for c in chromadb.PersistentClient(path=db_path).list_collections()]
+    assert QA_COLLECTION_NAME not in names
+
+
+def test_incremental_update_reports_stage_timings(tmp_path, model):
+    from build_report import BuildReport
+
+    db_path = str(tmp_path / "db")
+    build(db_path, model, WORDS, SENTENCES)
+    timings, items, report = {}, {}, BuildReport("g2")
+
+    assert rebuild_database.incremental_update_for_model(
+        QA_MODEL_ID, "fake", WORDS + ["yeni"], SENTENCES[1:], "g2", db_path=db_path, length_buckets=False,
+        timings=timings, items=items, report=report)
+    assert {"model_load", "encode_words", "insert"} <= set(timings)
+    assert "encode_sentences" not in timings  # sadece silme yapıldı, encode yok
+    assert items == {"encode_words": 1, "tokenize": 1, "insert": 1 + (len(SENTENCES) - 1) + 1}
+
+    report.record_model(QA_MODEL_ID, timings, len(WORDS) + 1, len(SENTENCES) - 1, items=items)
+    stages = report.data["models"][QA_MODEL_ID]["stages"]
+    assert stages["encode_words"]["items"] == 1
+    assert set(report.data["models"][QA_MODEL_ID]["collections"]) == {
+        f"kelime_vektorleri_{QA_MODEL_ID}", f"metin_vektorleri_{QA_MODEL_ID}"}
+
+
+def test_incremental_build_with_failed_model_is_not_activated(tmp_path, monkeypatch, model):
+    from db_paths import resolve_db_dir
+
+    monkeypatch.chdir(tmp_path)
+    for name, lines in (("kelimeler.txt", WORDS), ("metinler.txt", SENTENCES), ("iliskiler.txt", [])):
+        (tmp_path / name).write_text("\n".join(lines), encoding="utf-8")
+    options = ["--no-embedding-store", "--no-length-buckets", "--hnsw-config", "yok.json"]
+    assert rebuild_database.main(options)
+    active = resolve_db_dir(".")
+
+    # Bir model artımlı güncellemenin ortasında hata verir
+    update = rebuild_database.incremental_update_for_model
+
+    def failing_update(model_id, *args, **kwargs):
+        if model_id == "turkcell_roberta":
+            return False
+        return update(model_id, *args, **kwargs)
+
+    monkeypatch.setattr(rebuild_database, "incremental_update_for_model", failing_update)
+    (tmp_path / "metinler.txt").write_text("\n".join(SENTENCES + ["Yepyeni bir cümle."]), encoding="utf-8")
+    assert rebuild_database.main(options + ["--incremental"])
+    assert resolve_db_dir(".") == active
+
+    # Tüm modeller başarılı olunca yeni build etkinleşir
+    monkeypatch.setattr(rebuild_database, "incremental_update_for_model", update)
+    assert rebuild_database.main(options + ["--incremental"])
+    assert resolve_db_dir(".") != active
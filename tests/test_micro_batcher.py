@@ -0,0 +1,150 @@
+# test_micro_batcher.py - Mikro-batch zamanlayıcısı: sonuç sırası, hata iletimi ve kapatma davranışı
+
+import threading
+
+import numpy as np
+import pytest
+
+from micro_batcher import MicroBatcher, BatcherClosedError
+from conftest import fake_vector
+
+
+class RecordingEncoder:
+    """Her encode çağrısının metinlerini kaydeden, isteğe bağlı olarak bekletilebilen encoder"""
+
+    def __init__(self, gate=None):
+        self.calls = []
+        self.gate = gate
+        self.started = threading.Event()
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        self.started.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        return np.array([fake_vector(text) for text in texts], dtype=np.float32)
+
+
+def submit_concurrently(batcher, requests):
+    """Her isteği ayrı thread'de gönder, sonuçları istek sırasıyla döndür"""
+    results = [None] * len(requests)
+
+    def worker(i):
+        results[i] = batcher.submit(requests[i])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+def test_concurrent_requests_get_their_own_vectors_in_order():
+    encoder = RecordingEncoder()
+    batcher = MicroBatcher("test", encoder, max_batch_size=64, max_wait_ms=50)
+    requests = [[f"sorgu {i}-{j}" for j in range(i % 3 + 1)] for i in range(10)]
+    try:
+        results = submit_concurrently(batcher, requests)
+    finally:
+        batcher.close()
+
+    for texts, vectors in zip(requests, results):
+        assert np.allclose(vectors, [fake_vector(text) for text in texts])
+    # İstekler tek tek değil birleştirilerek encode edildi
+    assert len(encoder.calls) < len(requests)
+    assert sorted(text for call in encoder.calls for text in call) == sorted(t for r in requests for t in r)
+
+    stats = batcher.stats()
+    assert stats['requests'] == len(requests)
+    assert stats['batches'] == len(encoder.calls)
+    assert stats['queue_depth'] == 0
+
+
+def test_batches_respect_max_batch_size():
+    gate = threading.Event()
+    encoder = RecordingEncoder(gate)
+    batcher = MicroBatcher("test", encoder, max_batch_size=4, max_wait_ms=1)
+    try:
+        # İlk istek encoder'ı meşgul tutar, kalanlar kuyrukta birikir
+        first = threading.Thread(target=batcher.submit, args=(["ilk"],))
+        first.start()
+        assert encoder.started.wait(5)
+        requests = [[f"q{i}a", f"q{i}b", f"q{i}c"] for i in range(3)] + [["tek"]]
+        pending = threading.Thread(target=lambda: submit_concurrently(batcher, requests))
+        pending.start()
+        while batcher.stats()['queue_depth'] < 10:
+            threading.Event().wait(0.001)
+        gate.set()
+        pending.join(5)
+        first.join(5)
+    finally:
+        batcher.close()
+
+    assert all(len(call) <= 4 for call in encoder.calls)
+    assert len(encoder.calls) >= 4
+
+
+def test_large_and_empty_requests_bypass_the_queue():
+    encoder = RecordingEncoder()
+    batcher = MicroBatcher("test", encoder, max_batch_size=2, max_wait_ms=1000)
+    try:
+        vectors = batcher.submit(["a", "b", "c"])
+        assert np.allclose(vectors, [fake_vector(text) for text in "abc"])
+        assert batcher.submit([]).shape == (0, 0)
+    finally:
+        batcher.close()
+    assert encoder.calls == [["a", "b", "c"]]
+    assert batcher.stats()['batches'] == 0
+
+
+def test_encode_error_is_raised_in_every_caller():
+    def failing(texts):
+        raise ValueError("encode hatası")
+
+    batcher = MicroBatcher("test", failing, max_batch_size=64, max_wait_ms=20)
+    errors = []
+
+    def worker(text):
+        try:
+            batcher.submit([text])
+        except ValueError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=worker, args=(f"q{i}",)) for i in range(4)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+    finally:
+        batcher.close()
+    assert errors == ["encode hatası"] * 4
+
+
+def test_close_drains_pending_requests_then_rejects_new_ones():
+    gate = threading.Event()
+    encoder = RecordingEncoder(gate)
+    batcher = MicroBatcher("test", encoder, max_batch_size=64, max_wait_ms=1)
+
+    first = threading.Thread(target=batcher.submit, args=(["ilk"],))
+    first.start()
+    assert encoder.started.wait(5)
+    results = {}
+    pending = threading.Thread(target=lambda: results.update(v=batcher.submit(["bekleyen"])))
+    pending.start()
+    while batcher.stats()['queue_depth'] < 1:
+        threading.Event().wait(0.001)
+
+    batcher.close()
+    gate.set()
+    pending.join(5)
+    first.join(5)
+    batcher._worker.join(5)
+
+    # Kapatmadan önce kuyruğa giren istek yine de işlenir
+    assert np.allclose(results["v"], [fake_vector("bekleyen")])
+    assert not batcher._worker.is_alive()
+    # Kapanıştan sonra gelen istek ayırt edilebilir hata alır (app.py doğrudan encode'a döner)
+    with pytest.raises(BatcherClosedError):
+        batcher.submit(["yeni"])
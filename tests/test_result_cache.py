@@ -0,0 +1,81 @@
+# test_result_cache.py - Sonuç önbelleği: generation değişiminde geçersizleştirme, TTL ve LRU
+
+import result_cache
+from result_cache import ResultCache
+
+
+def test_new_generation_invalidates_entries():
+    cache = ResultCache(max_entries=8, ttl_seconds=60)
+    cache.set_generation("g1")
+    cache.put("okul", {"results": 1})
+    assert cache.get("okul") == {"results": 1}
+
+    # Aynı damga tekrar bildirilince kayıtlar korunur
+    cache.set_generation("g1")
+    assert cache.get("okul") == {"results": 1}
+
+    cache.set_generation("g2")
+    assert cache.get("okul") is None
+    cache.put("okul", {"results": 2})
+    assert cache.get("okul") == {"results": 2}
+
+    stats = cache.stats()
+    assert stats['generation'] == "g2"
+    assert stats['invalidations'] == 1
+    assert stats['entries'] == 1
+    assert (stats['hits'], stats['misses']) == (3, 1)
+
+
+def test_generation_change_on_empty_cache_is_not_counted():
+    cache = ResultCache()
+    cache.set_generation("g1")
+    cache.set_generation("g2")
+    assert cache.stats()['invalidations'] == 0
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(result_cache.time, "monotonic", lambda: now[0])
+    cache = ResultCache(max_entries=8, ttl_seconds=10)
+    cache.put("q", "v")
+    now[0] = 109.0
+    assert cache.get("q") == "v"
+    now[0] = 110.0
+    assert cache.get("q") is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_zero_size_disables_cache():
+    cache = ResultCache(max_entries=0)
+    cache.put("q", "v")
+    assert cache.get("q") is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_response_computed_before_generation_change_is_dropped():
+    cache = ResultCache(max_entries=8, ttl_seconds=60)
+    cache.set_generation("g1")
+    generation = "g1"  # arama başlarken okunan nesil
+    assert cache.get("q", generation) is None
+
+    # Yanıt hesaplanırken veritabanı değişir
+    cache.set_generation("g2")
+    cache.put("q", "eski yanıt", generation)
+    assert cache.get("q", "g2") is None
+    assert cache.stats()['stale_puts'] == 1
+
+    cache.put("q", "yeni yanıt", "g2")
+    assert cache.get("q", "g2") == "yeni yanıt"
+    # Eski nesli okuyan istek yeni kaydı görmez
+    assert cache.get("q", "g1") is None
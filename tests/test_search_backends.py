@@ -0,0 +1,94 @@
+# test_search_backends.py - NumPy kesin arama: top-k sırası, mesafeler ve bloklu mmap aramanın tutarlılığı
+
+import numpy as np
+import pytest
+
+from search_backends import ExactSearchIndex, MappedVectorIndex, build_search_index, backend_name, top_k_indices
+
+
+def brute_force(matrix, queries, k):
+    """Beklenen sonuç: tam sıralama ile en yüksek k cosine skoru"""
+    matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ matrix.T
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    return order, np.take_along_axis(scores, order, axis=1)
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(7)
+    return rng.normal(size=(200, 16)).astype(np.float32), rng.normal(size=(5, 16)).astype(np.float32)
+
+
+def test_top_k_indices_sorted_and_clamped():
+    scores = np.array([[0.1, 0.9, 0.5, 0.7], [0.3, 0.2, 0.8, 0.1]], dtype=np.float32)
+    assert top_k_indices(scores, 2).tolist() == [[1, 3], [2, 0]]
+    assert top_k_indices(scores, 10).tolist() == [[1, 3, 2, 0], [2, 0, 1, 3]]
+    assert top_k_indices(scores, 0).shape == (2, 0)
+
+
+def test_exact_index_matches_brute_force(data):
+    matrix, queries = data
+    ids = [f"id{i}" for i in range(len(matrix))]
+    index = ExactSearchIndex(ids, [f"doc{i}" for i in range(len(matrix))], matrix,
+                             [{"index": i} for i in range(len(matrix))])
+    result = index.query(queries, n_results=7)
+
+    expected, expected_scores = brute_force(matrix, queries, 7)
+    assert result["ids"] == [[ids[i] for i in row] for row in expected]
+    assert result["documents"] == [[f"doc{i}" for i in row] for row in expected]
+    assert result["metadatas"] == [[{"index": i} for i in row] for row in expected]
+    # ChromaDB cosine uzayı: distance = 1 - similarity, artan sırada
+    assert np.allclose(result["distances"], 1.0 - expected_scores, atol=1e-5)
+    assert all(row == sorted(row) for row in result["distances"])
+
+
+def test_exact_index_n_results_larger_than_collection():
+    index = ExactSearchIndex(["a", "b"], ["A", "B"], [[1.0, 0.0], [0.0, 1.0]])
+    result = index.query([[0.2, 1.0]], n_results=10)
+    assert result["ids"] == [["b", "a"]]
+    assert result["metadatas"] == [[None, None]]
+
+
+def test_empty_exact_index_returns_empty_lists():
+    index = ExactSearchIndex([], [], [])
+    assert index.count() == 0
+    assert index.query([[1.0, 0.0], [0.0, 1.0]], n_results=3)["ids"] == [[], []]
+
+
+def test_mapped_index_blocks_match_exact_search(tmp_path, data):
+    matrix, queries = data
+    source = str(tmp_path / "vectors.npy")
+    np.save(source, matrix.astype(np.float64))
+
+    # Blok boyutu k'dan küçük ve satır sayısını tam bölmüyor
+    index = MappedVectorIndex.open(source, block_rows=3)
+    assert index.shape == matrix.shape
+    scores, indices = index.search(queries, 7)
+
+    expected, expected_scores = brute_force(matrix, queries, 7)
+    assert indices.tolist() == expected.tolist()
+    assert np.allclose(scores, expected_scores, atol=1e-5)
+
+    scores, indices = index.search(queries[:1], 500)
+    assert indices.shape == (1, len(matrix))
+    assert sorted(indices[0].tolist()) == list(range(len(matrix)))
+
+
+def test_build_search_index_picks_backend_by_size():
+    class Collection:
+        name = "kelime_vektorleri_test"
+
+        def count(self):
+            return 2
+
+        def get(self, include):
+            return {"ids": ["a", "b"], "documents": ["A", "B"],
+                    "embeddings": [[1.0, 0.0], [0.0, 1.0]], "metadatas": [None, None]}
+
+    collection = Collection()
+    assert backend_name(build_search_index(collection, 2)) == "numpy"
+    assert build_search_index(collection, 1) is collection
+    assert build_search_index(collection, 0) is collection
+    assert backend_name(collection) == "chromadb"
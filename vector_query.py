@@ -4,13 +4,15 @@ import sys
 import chromadb
 from sentence_transformers import SentenceTransformer
 
+from db_paths import resolve_db_dir
+
 # -------------------------------
 # Sabitler ve Hazırlıklar
 # -------------------------------
 
-# Proje dizininde 'db/' klasörü oluşturulur
+# Aktif veritabanı: db_builds/CURRENT işaretçisinin gösterdiği build (yoksa 'db/' klasörü oluşturulur)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_DIR = os.path.join(BASE_DIR, "db")
+DB_DIR = resolve_db_dir(BASE_DIR)
 os.makedirs(DB_DIR, exist_ok=True)
 
 # -------------------------------
@@ -2,10 +2,20 @@
 from sentence_transformers import SentenceTransformer
 import numpy as np
 
-model = SentenceTransformer("dbmdz/bert-base-turkish-cased")
+from embedding_store import default_store, encode_with_store, model_revision
+
+MODEL_NAME = "dbmdz/bert-base-turkish-cased"
+model = None
+
+def encode(texts):
+    # Model sadece depoda olmayan kelimeler için yüklenir
+    global model
+    if model is None:
+        model = SentenceTransformer(MODEL_NAME)
+    return model.encode(texts, show_progress_bar=True)
 
 with open("kelimeler.txt", encoding="utf-8") as f:
     kelimeler = [line.strip() for line in f if line.strip()]
 
-kelime_vektorleri = model.encode(kelimeler, show_progress_bar=True)
+kelime_vektorleri = encode_with_store(default_store(), "dbmdz_bert", model_revision(MODEL_NAME), kelimeler, encode)
 np.save("kelime_vektorleri.npy", kelime_vektorleri)
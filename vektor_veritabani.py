@@ -4,11 +4,14 @@ import os
 import numpy as np
 import chromadb
 
+from bulk_loader import bulk_insert
+from db_paths import resolve_db_dir
+
 print("🚀 Kelime Vektörleri ChromaDB'ye Yükleniyor...")
 
-# 1) Kalıcı DB yolunu ayarla
+# 1) Kalıcı DB yolunu ayarla (aktif blue/green build, yoksa eski db/ dizini)
 BASE_DIR = os.path.dirname(__file__)
-DB_DIR = os.path.join(BASE_DIR, "db")
+DB_DIR = resolve_db_dir(BASE_DIR)
 os.makedirs(DB_DIR, exist_ok=True)
 
 # 2) PersistentClient ile bağlantı
@@ -63,28 +66,15 @@ except Exception as e:
 # 7) ⚡ BATCH PROCESSING - Çok daha hızlı!
 print("💾 Kelimeler toplu olarak ChromaDB'ye ekleniyor...")
 try:
-    # Büyük koleksiyonlar için batch boyutu
-    batch_size = 1000  # Kelimeler için daha büyük batch boyutu kullanabiliriz
-    
-    for i in range(0, len(kelimeler), batch_size):
-        end_idx = min(i + batch_size, len(kelimeler))
-        
-        # Batch verileri hazırla
-        batch_kelimeler = kelimeler[i:end_idx]
-        batch_vektorler = kelime_vektorleri[i:end_idx]
-        batch_ids = [str(j) for j in range(i, end_idx)]
-        
-        # Vektörleri liste formatına çevir
-        batch_embeddings = [vec.tolist() for vec in batch_vektorler]
-        
-        # Toplu ekleme - tek seferde 1000 kelime!
-        collection.add(
-            embeddings=batch_embeddings,
-            documents=batch_kelimeler,
-            ids=batch_ids
-        )
-        
-        print(f"  📦 {end_idx}/{len(kelimeler)} kelime işlendi...")
+    # NumPy matrisi doğrudan, client'ın izin verdiği en büyük batch boyutuyla eklenir
+    bulk_insert(
+        collection,
+        [str(j) for j in range(len(kelimeler))],
+        kelimeler,
+        kelime_vektorleri,
+        client=client,
+        label="kelime"
+    )
 
     print(f"✅ {len(kelimeler)} kelime başarıyla ChromaDB'ye yüklendi!")
     print(f"🏁 Toplam kayıt sayısı: {collection.count()}")
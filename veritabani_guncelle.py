@@ -4,12 +4,14 @@ import os
 import numpy as np
 import chromadb
 
+from db_paths import resolve_db_dir
+
 def veritabani_guncelle():
     """Güncellenmiş kelime vektörlerini ChromaDB'ye yükle"""
     
-    # 1) Kalıcı DB yolunu ayarla
+    # 1) Kalıcı DB yolunu ayarla (aktif blue/green build, yoksa eski db/ dizini)
     BASE_DIR = os.path.dirname(__file__)
-    DB_DIR = os.path.join(BASE_DIR, "db")
+    DB_DIR = resolve_db_dir(BASE_DIR)
     os.makedirs(DB_DIR, exist_ok=True)
 
     # 2) PersistentClient ile bağlantı